@@ -1,7 +1,19 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from routes.analyze import router as analyze_router
-from db.mongo import init_mongo_client
+from routes.jobs import router as jobs_router
+from routes.scraper_cache import router as scraper_cache_router
+from routes.metrics import router as metrics_router
+from db.mongo import init_mongo_client, close_mongo_client, ensure_indexes, mongo_health
+from db.writer import get_write_queue, start_write_queue, stop_write_queue
+from services.http_client import init_http_client, close_http_client
+from services.local_sentiment import shutdown_local_sentiment
+from services.ollama_client import get_inference_breaker
+from scrapers.politeness import get_politeness_scheduler
+from services.jobs import jobs_snapshot, start_job_workers, stop_job_workers
+from services.prewarm import get_prewarmer, start_prewarmer, stop_prewarmer
+from services.metrics import HTTP_REQUEST_SECONDS, format_server_timing, get_metrics_config, server_timings
 import os
 from dotenv import load_dotenv
 
@@ -40,16 +52,63 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):  # type: ignore[no-untyped-def]
+    """Request latency histogram, plus a Server-Timing header when METRICS_SERVER_TIMING is set."""
+    timings = [] if get_metrics_config()["server_timing"] else None
+    token = server_timings.set(timings)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        server_timings.reset(token)
+    elapsed = time.perf_counter() - started
+    # Route templates (/jobs/{job_id}) rather than raw paths keep label cardinality bounded
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    HTTP_REQUEST_SECONDS.observe(elapsed, method=request.method, route=route, status=response.status_code)
+    if timings is not None:
+        # Streamed responses send headers first, so only stages finished by then appear
+        response.headers["Server-Timing"] = format_server_timing(timings + [("total", elapsed)])
+    return response
+
+
 @app.on_event("startup")
 async def on_startup() -> None:
     await init_mongo_client()
+    await init_http_client()
+    await start_write_queue()
+    # Awaited, not backgrounded: the review migration must finish before new upserts arrive
+    await ensure_indexes()
+    await start_job_workers()
+    await start_prewarmer()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await stop_prewarmer()
+    await stop_job_workers()
+    await stop_write_queue()
+    await close_mongo_client()
+    await close_http_client()
+    shutdown_local_sentiment()
 
 
 @app.get("/health")
 async def health() -> dict:
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "db": await mongo_health(),
+        "write_queue": get_write_queue().snapshot(),
+        "inference": get_inference_breaker().snapshot(),
+        "job_workers": await jobs_snapshot(),
+        "scraper_hosts": get_politeness_scheduler().snapshot(),
+        "prewarm": get_prewarmer().snapshot(),
+    }
 
 
 app.include_router(analyze_router)
+app.include_router(jobs_router)
+app.include_router(scraper_cache_router)
+app.include_router(metrics_router)
 
 
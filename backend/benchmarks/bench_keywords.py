@@ -0,0 +1,69 @@
+"""Compare the compiled keyword matcher with the previous per-keyword scan.
+
+Run from backend/:  python -m benchmarks.bench_keywords [n_reviews ...]
+"""
+
+import random
+import sys
+import time
+from typing import Callable, List
+
+from services.ollama_client import (
+    CONS_KEYWORDS,
+    KEYWORD_MATCHER,
+    NEGATIVE_KEYWORDS,
+    POSITIVE_KEYWORDS,
+    PROS_KEYWORDS,
+)
+
+SENTENCES = [
+    "Really happy with the phone.",
+    "Battery easily lasts a full day with moderate use.",
+    "The camera is decent in daylight but struggles at night.",
+    "Delivery was fast and the packaging was fine.",
+    "Build quality feels premium for the price.",
+    "Not worth it, the screen stopped working after a month.",
+    "Customer service did not know how to help.",
+    "Speakers are loud enough and calls are clear.",
+    "It heats up a little while gaming.",
+    "Would recommend to anyone on a budget.",
+    "I returned it because of a defective charger.",
+    "Software updates arrive regularly.",
+]
+
+
+def make_reviews(n: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(SENTENCES, k=rng.randint(2, 8))) for _ in range(n)]
+
+
+def naive(reviews: List[str]) -> int:
+    hits = 0
+    for review in reviews:
+        hits += any(kw in review.lower() for kw in POSITIVE_KEYWORDS)
+        hits += any(kw in review.lower() for kw in NEGATIVE_KEYWORDS)
+        for keywords in list(PROS_KEYWORDS.values()) + list(CONS_KEYWORDS.values()):
+            hits += any(kw in review.lower() for kw in keywords)
+    return hits
+
+
+def compiled(reviews: List[str]) -> int:
+    return sum(len(KEYWORD_MATCHER.categories(review)) for review in reviews)
+
+
+def timed(fn: Callable[[List[str]], int], reviews: List[str]) -> float:
+    started = time.perf_counter()
+    fn(reviews)
+    return time.perf_counter() - started
+
+
+def main(sizes: List[int]) -> None:
+    print(f"{'reviews':>8} {'naive (s)':>10} {'compiled (s)':>13} {'speedup':>8}")
+    for n in sizes:
+        reviews = make_reviews(n)
+        slow, fast = timed(naive, reviews), timed(compiled, reviews)
+        print(f"{n:>8} {slow:>10.3f} {fast:>13.3f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 50_000])
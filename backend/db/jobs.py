@@ -0,0 +1,183 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from db import mongo
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def new_job(normalized: str, product: str, platforms: Optional[List[str]], pkey: str, priority: int) -> Dict[str, Any]:
+    return {
+        "_id": uuid.uuid4().hex,
+        "normalized_name": normalized,
+        "platform_key": pkey,
+        "product": product,
+        "platforms": platforms,
+        "priority": priority,
+        "status": QUEUED,
+        "active": True,  # set while queued/running; backs the dedupe index
+        "attempts": 0,
+        "created_at": _now(),
+        "started_at": None,
+        "finished_at": None,
+        "lease_expires_at": None,
+        "expires_at": None,
+        "result": None,
+        "error": None,
+    }
+
+
+class MongoJobStore:
+    """Job queue in the ``jobs`` collection, shared by API and worker processes.
+
+    Workers claim jobs atomically with ``find_one_and_update`` (highest priority,
+    then oldest). A claim holds a lease; jobs whose worker died are reclaimed once
+    the lease expires. Finished jobs get ``expires_at`` and are removed by a TTL
+    index; a partial unique index on active jobs deduplicates submissions
+    (see ``db.mongo.ensure_indexes``).
+    """
+
+    def _jobs(self):  # type: ignore[no-untyped-def]
+        return mongo.get_collection("jobs")
+
+    async def submit(self, job: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Insert ``job`` unless an active job exists for the same product; returns (job, deduplicated)."""
+        active = {"normalized_name": job["normalized_name"], "platform_key": job["platform_key"], "active": True}
+        for _ in range(2):
+            try:
+                await self._jobs().insert_one(job)
+                return job, False
+            except DuplicateKeyError:
+                # Raise the waiting job's priority if the new request is more urgent
+                existing = await self._jobs().find_one_and_update(
+                    active, {"$max": {"priority": job["priority"]}}, return_document=ReturnDocument.AFTER
+                )
+                if existing is not None:
+                    return existing, True
+        raise RuntimeError("Could not enqueue job")
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._jobs().find_one({"_id": job_id})
+
+    async def claim(self, lease: float) -> Optional[Dict[str, Any]]:
+        now = _now()
+        return await self._jobs().find_one_and_update(
+            {"$or": [{"status": QUEUED}, {"status": RUNNING, "lease_expires_at": {"$lt": now}}]},
+            {
+                "$set": {"status": RUNNING, "started_at": now, "lease_expires_at": now + timedelta(seconds=lease)},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("priority", DESCENDING), ("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def renew(self, job_id: str, lease: float) -> bool:
+        """Extend the lease of a running job; False if the job is no longer running."""
+        result = await self._jobs().update_one(
+            {"_id": job_id, "status": RUNNING},
+            {"$set": {"lease_expires_at": _now() + timedelta(seconds=lease)}},
+        )
+        return result.matched_count == 1
+
+    async def finish(self, job_id: str, status: str, result: Any, error: Optional[str], retention: float) -> None:
+        now = _now()
+        await self._jobs().update_one(
+            {"_id": job_id},
+            {
+                "$set": {
+                    "status": status,
+                    "result": result,
+                    "error": error,
+                    "finished_at": now,
+                    "expires_at": now + timedelta(seconds=retention),
+                },
+                "$unset": {"active": "", "lease_expires_at": ""},
+            },
+        )
+
+    async def counts(self) -> Dict[str, int]:
+        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        return {doc["_id"]: doc["count"] async for doc in self._jobs().aggregate(pipeline)}
+
+
+class MemoryJobStore:
+    """In-process job queue used when MongoDB is unavailable (single API process only)."""
+
+    def __init__(self) -> None:
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+
+    def _expire(self) -> None:
+        now = _now()
+        for job_id in [i for i, job in self._jobs.items() if job["expires_at"] and job["expires_at"] <= now]:
+            del self._jobs[job_id]
+
+    async def submit(self, job: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        self._expire()
+        for existing in self._jobs.values():
+            if (
+                existing.get("active")
+                and existing["normalized_name"] == job["normalized_name"]
+                and existing["platform_key"] == job["platform_key"]
+            ):
+                existing["priority"] = max(existing["priority"], job["priority"])
+                return existing, True
+        self._jobs[job["_id"]] = job
+        return job, False
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    async def claim(self, lease: float) -> Optional[Dict[str, Any]]:
+        now = _now()
+        claimable = [
+            job for job in self._jobs.values()
+            if job["status"] == QUEUED or (job["status"] == RUNNING and job["lease_expires_at"] < now)
+        ]
+        if not claimable:
+            return None
+        job = min(claimable, key=lambda j: (-j["priority"], j["created_at"]))
+        job.update(status=RUNNING, started_at=now, lease_expires_at=now + timedelta(seconds=lease))
+        job["attempts"] += 1
+        return job
+
+    async def renew(self, job_id: str, lease: float) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] != RUNNING:
+            return False
+        job["lease_expires_at"] = _now() + timedelta(seconds=lease)
+        return True
+
+    async def finish(self, job_id: str, status: str, result: Any, error: Optional[str], retention: float) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        now = _now()
+        job.update(status=status, result=result, error=error, finished_at=now, expires_at=now + timedelta(seconds=retention))
+        job.pop("active", None)
+        job["lease_expires_at"] = None
+
+    async def counts(self) -> Dict[str, int]:
+        self._expire()
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return counts
+
+
+_mongo_store = MongoJobStore()
+_memory_store = MemoryJobStore()
+
+
+def get_job_store() -> MongoJobStore | MemoryJobStore:
+    """The MongoDB-backed queue when MongoDB is connected, otherwise the in-process one."""
+    return _mongo_store if mongo.db is not None else _memory_store
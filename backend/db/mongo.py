@@ -1,18 +1,142 @@
 import os
-from typing import Optional
+import time
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.monitoring import ConnectionPoolListener
 
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
 
 _client: Optional[AsyncIOMotorClient] = None
 db: Optional[AsyncIOMotorDatabase] = None
 
 
+def get_mongo_config():
+    """Get MongoDB connection configuration, reading env vars at runtime."""
+    return {
+        "uri": os.getenv("MONGODB_URI", "mongodb://localhost:27017"),
+        "database": os.getenv("MONGODB_DB", "product_analyzer"),
+        "max_pool_size": int(os.getenv("MONGODB_MAX_POOL_SIZE", "100")),
+        "min_pool_size": int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+        "server_selection_timeout_ms": int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "3000")),
+        "connect_timeout_ms": int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "3000")),
+        "socket_timeout_ms": int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "10000")),
+        "compressors": os.getenv("MONGODB_COMPRESSORS", "zstd,snappy,zlib"),
+        "read_preference": os.getenv("MONGODB_READ_PREFERENCE", "primary"),
+        "required": os.getenv("MONGODB_REQUIRED", "false").lower() in ("1", "true", "yes"),
+    }
+
+
+class PoolStats(ConnectionPoolListener):
+    """Tracks connection pool usage for the health endpoint."""
+
+    def __init__(self) -> None:
+        self.open = 0
+        self.checked_out = 0
+        self.checkout_failures = 0
+
+    def pool_created(self, event):  # type: ignore[no-untyped-def]
+        pass
+
+    def pool_ready(self, event):  # type: ignore[no-untyped-def]
+        pass
+
+    def pool_cleared(self, event):  # type: ignore[no-untyped-def]
+        pass
+
+    def pool_closed(self, event):  # type: ignore[no-untyped-def]
+        pass
+
+    def connection_created(self, event):  # type: ignore[no-untyped-def]
+        self.open += 1
+
+    def connection_ready(self, event):  # type: ignore[no-untyped-def]
+        pass
+
+    def connection_closed(self, event):  # type: ignore[no-untyped-def]
+        self.open = max(0, self.open - 1)
+
+    def connection_check_out_started(self, event):  # type: ignore[no-untyped-def]
+        pass
+
+    def connection_check_out_failed(self, event):  # type: ignore[no-untyped-def]
+        self.checkout_failures += 1
+
+    def connection_checked_out(self, event):  # type: ignore[no-untyped-def]
+        self.checked_out += 1
+
+    def connection_checked_in(self, event):  # type: ignore[no-untyped-def]
+        self.checked_out = max(0, self.checked_out - 1)
+
+
+pool_stats = PoolStats()
+
+
 async def init_mongo_client() -> None:
+    """Connect to MongoDB and verify it with a ping.
+
+    Short server-selection timeouts make an absent MongoDB fail fast. If the ping
+    fails the app runs without persistence (``get_collection`` raises right away),
+    unless MONGODB_REQUIRED is set, in which case startup fails.
+    """
+    global _client, db  # noqa: PLW0603
+    config = get_mongo_config()
+    _client = AsyncIOMotorClient(
+        config["uri"],
+        maxPoolSize=config["max_pool_size"],
+        minPoolSize=config["min_pool_size"],
+        serverSelectionTimeoutMS=config["server_selection_timeout_ms"],
+        connectTimeoutMS=config["connect_timeout_ms"],
+        socketTimeoutMS=config["socket_timeout_ms"],
+        compressors=config["compressors"],
+        readPreference=config["read_preference"],
+        event_listeners=[pool_stats],
+    )
+    try:
+        await _client.admin.command("ping")
+    except Exception as e:
+        _client.close()
+        _client = None
+        db = None
+        if config["required"]:
+            raise RuntimeError(f"MongoDB unavailable at startup: {e}") from e
+        logger.error(f"MongoDB unavailable, continuing without persistence: {e}")
+        return
+    db = _client[config["database"]]
+
+
+async def close_mongo_client() -> None:
     global _client, db  # noqa: PLW0603
-    uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
-    database = os.getenv("MONGODB_DB", "product_analyzer")
-    _client = AsyncIOMotorClient(uri)
-    db = _client[database]
+    if _client is not None:
+        _client.close()
+    _client = None
+    db = None
+
+
+async def mongo_health() -> Dict[str, Any]:
+    """Round-trip latency and pool usage for /health."""
+    if db is None or _client is None:
+        return {"status": "unavailable"}
+    started = time.perf_counter()
+    try:
+        await _client.admin.command("ping")
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+    return {
+        "status": "ok",
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "pool": {
+            "open": pool_stats.open,
+            "checked_out": pool_stats.checked_out,
+            "max_size": get_mongo_config()["max_pool_size"],
+            "checkout_failures": pool_stats.checkout_failures,
+        },
+    }
 
 
 def get_collection(name: str):  # type: ignore[no-untyped-def]
@@ -21,3 +145,212 @@ def get_collection(name: str):  # type: ignore[no-untyped-def]
     return db[name]
 
 
+async def _create_index(collection: str, keys: List[Tuple[str, int]], **options: Any) -> None:
+    # One index failing (e.g. a unique index over old duplicate data) must not skip the others
+    try:
+        await get_collection(collection).create_index(keys, **options)
+    except Exception as e:
+        logger.warning(f"Failed to create MongoDB index {options.get('name')} on {collection}: {e}")
+
+
+async def ensure_indexes() -> None:
+    """Migrate old review documents, then create the indexes the storage layer relies on (idempotent)."""
+    if db is None:
+        return
+    await _create_index("products", [("normalized_name", ASCENDING)], unique=True, name="uniq_normalized_name")
+    try:
+        if "uniq_product_platform_review" not in await get_collection("reviews").index_information():
+            migrated = await migrate_reviews()
+            logger.info(f"Migrated reviews for the unique review index: {migrated}")
+    except Exception as e:
+        logger.warning(f"Review migration failed: {e}")
+    await _create_index(
+        "reviews",
+        [("normalized_name", ASCENDING), ("platform", ASCENDING), ("review_hash", ASCENDING)],
+        unique=True,
+        name="uniq_product_platform_review",
+    )
+    # At most one queued/running job per product and platform set
+    await _create_index(
+        "jobs",
+        [("normalized_name", ASCENDING), ("platform_key", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"active": True},
+        name="uniq_active_job",
+    )
+    await _create_index(
+        "jobs", [("status", ASCENDING), ("priority", DESCENDING), ("created_at", ASCENDING)], name="claim_order"
+    )
+    await _create_index("jobs", [("expires_at", ASCENDING)], expireAfterSeconds=0, name="ttl_finished_jobs")
+    await _create_index(
+        "crawl_cursors", [("normalized_name", ASCENDING), ("platform", ASCENDING)], unique=True, name="uniq_crawl_cursor"
+    )
+
+
+MIGRATION_CHUNK = 1000
+
+
+async def migrate_reviews() -> Dict[str, int]:
+    """Prepare ``reviews`` documents written before review hashes existed.
+
+    Older versions inserted every scraped review without ``review_hash`` and
+    without deduplication, which would make the unique review index fail to
+    build. This backfills the hash and deletes duplicates, keeping a copy that
+    has a sentiment label when there is one.
+    """
+    reviews = get_collection("reviews")
+    projection = {field: 1 for field in ("normalized_name", "platform", "rating", "title", "content", "review_hash", "sentiment_label")}
+    kept: Dict[Tuple[Any, Any, str], Tuple[Any, bool]] = {}
+    backfill: Dict[Any, str] = {}
+    duplicates: List[Any] = []
+    async for doc in reviews.find({}, projection):
+        digest = doc.get("review_hash")
+        if digest is None:
+            digest = backfill[doc["_id"]] = review_hash(doc)
+        key = (doc.get("normalized_name"), doc.get("platform"), digest)
+        labeled = "sentiment_label" in doc
+        previous = kept.get(key)
+        if previous is None:
+            kept[key] = (doc["_id"], labeled)
+        elif labeled and not previous[1]:
+            duplicates.append(previous[0])
+            kept[key] = (doc["_id"], labeled)
+        else:
+            duplicates.append(doc["_id"])
+
+    for doc_id in duplicates:
+        backfill.pop(doc_id, None)
+    updates = [UpdateOne({"_id": doc_id}, {"$set": {"review_hash": digest}}) for doc_id, digest in backfill.items()]
+    for i in range(0, len(duplicates), MIGRATION_CHUNK):
+        await reviews.delete_many({"_id": {"$in": duplicates[i:i + MIGRATION_CHUNK]}})
+    for i in range(0, len(updates), MIGRATION_CHUNK):
+        await reviews.bulk_write(updates[i:i + MIGRATION_CHUNK], ordered=False)
+    return {"backfilled": len(updates), "removed": len(duplicates)}
+
+
+def review_hash(review: Dict[str, Any]) -> str:
+    """Stable content hash of a review, insensitive to case and whitespace."""
+    parts = [
+        str(review.get("platform") or ""),
+        str(review.get("rating") if review.get("rating") is not None else ""),
+        str(review.get("title") or ""),
+        str(review.get("content") or ""),
+    ]
+    normalized = "\x1f".join(" ".join(p.lower().split()) for p in parts)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def product_upsert(normalized: str, name: str, prices: List[Dict[str, Any]]) -> UpdateOne:
+    return UpdateOne(
+        {"normalized_name": normalized},
+        {"$set": {"name": name, "normalized_name": normalized, "prices": prices}},
+        upsert=True,
+    )
+
+
+def review_upserts(
+    normalized: str,
+    reviews: Iterable[Dict[str, Any]],
+    labels: Optional[Dict[str, str]] = None,
+) -> List[UpdateOne]:
+    """Upserts keyed by (normalized_name, platform, review_hash); repeats are no-ops.
+
+    ``labels`` maps review hashes to sentiment labels stored alongside the review.
+    """
+    labels = labels or {}
+    ops: Dict[str, UpdateOne] = {}
+    for review in reviews:
+        digest = review_hash(review)
+        key = f"{review.get('platform')}:{digest}"
+        update: Dict[str, Any] = {"$setOnInsert": review | {"normalized_name": normalized, "review_hash": digest}}
+        if digest in labels:
+            update["$set"] = {"sentiment_label": labels[digest]}
+        ops[key] = UpdateOne(
+            {"normalized_name": normalized, "platform": review.get("platform"), "review_hash": digest},
+            update,
+            upsert=True,
+        )
+    return list(ops.values())
+
+
+STORED_REVIEWS_LIMIT = 1000
+
+
+async def load_review_labels(
+    normalized: str, platforms: List[str], limit: int = STORED_REVIEWS_LIMIT
+) -> Dict[str, Dict[str, Any]]:
+    """Stored per-review sentiment for a product on ``platforms``, keyed by review hash.
+
+    Only the ``limit`` most recently stored labels are loaded, matching
+    ``load_stored_reviews``. Returns an empty mapping when MongoDB is
+    unavailable, so every review is treated as unseen.
+    """
+    if db is None or not platforms:
+        return {}
+    try:
+        cursor = get_collection("reviews").find(
+            {"normalized_name": normalized, "platform": {"$in": platforms}, "sentiment_label": {"$exists": True}},
+            {"_id": 0, "review_hash": 1, "platform": 1, "rating": 1, "sentiment_label": 1},
+        ).sort("_id", DESCENDING).limit(limit)
+        return {doc["review_hash"]: doc async for doc in cursor}
+    except Exception as e:
+        logger.warning(f"Could not load stored review labels for '{normalized}': {e}")
+        return {}
+
+
+async def load_stored_reviews(
+    normalized: str, platforms: List[str], limit: int = STORED_REVIEWS_LIMIT
+) -> List[Dict[str, Any]]:
+    """Stored reviews of a product on ``platforms``, most recently stored first.
+
+    Incremental crawls return only new reviews; these are the rest. Returns an
+    empty list when MongoDB is unavailable.
+    """
+    if db is None or not platforms:
+        return []
+    try:
+        cursor = get_collection("reviews").find(
+            {"normalized_name": normalized, "platform": {"$in": platforms}},
+            {"_id": 0, "normalized_name": 0, "sentiment_label": 0},
+        ).sort("_id", DESCENDING).limit(limit)
+        return [doc async for doc in cursor]
+    except Exception as e:
+        logger.warning(f"Could not load stored reviews for '{normalized}': {e}")
+        return []
+
+
+async def load_crawl_cursor(normalized: str, platform: str) -> Optional[Dict[str, Any]]:
+    """Where the last review crawl of a product on ``platform`` stopped.
+
+    Returns None when there is no cursor or MongoDB is unavailable, so the
+    scraper falls back to a full crawl.
+    """
+    if db is None:
+        return None
+    try:
+        return await get_collection("crawl_cursors").find_one(
+            {"normalized_name": normalized, "platform": platform}, {"_id": 0}
+        )
+    except Exception as e:
+        logger.warning(f"Could not load crawl cursor for '{normalized}' on {platform}: {e}")
+        return None
+
+
+def crawl_cursor_upsert(cursor: Dict[str, Any]) -> UpdateOne:
+    return UpdateOne(
+        {"normalized_name": cursor["normalized_name"], "platform": cursor["platform"]},
+        {"$set": cursor},
+        upsert=True,
+    )
+
+
+async def bulk_write_unordered(collection_name: str, ops: List[Any]) -> None:
+    """Unordered bulk write that tolerates duplicate-key races between concurrent upserts."""
+    if not ops:
+        return
+    try:
+        await get_collection(collection_name).bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != DUPLICATE_KEY_ERROR for err in errors):
+            raise
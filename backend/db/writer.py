@@ -0,0 +1,185 @@
+import os
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from db import mongo
+from db.mongo import bulk_write_unordered
+from services.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+
+# Writes queued only once every operation of the submit before them was written
+Then = Tuple[str, List[Any]]
+
+
+class _Chain:
+    def __init__(self, pending: int, then: Then) -> None:
+        self.pending = pending
+        self.failed = False
+        self.then = then
+
+
+def get_writer_config():
+    """Get write-behind queue configuration, reading env vars at runtime."""
+    return {
+        "max_pending": int(os.getenv("MONGO_WRITE_QUEUE_SIZE", "10000")),
+        "batch_size": int(os.getenv("MONGO_WRITE_BATCH_SIZE", "500")),
+        "flush_interval": float(os.getenv("MONGO_WRITE_FLUSH_MS", "200")) / 1000,
+    }
+
+
+class WriteBehindQueue:
+    """Takes MongoDB writes off the request path.
+
+    Callers ``submit`` write operations without awaiting; a background worker
+    drains the bounded queue and groups operations per collection into
+    unordered ``bulk_write`` calls, flushing when ``batch_size`` operations are
+    pending or ``flush_interval`` has passed. When the queue is full new
+    operations are dropped and counted rather than blocking the caller.
+
+    ``submit(..., then=(collection, ops))`` chains writes that must not land
+    without the first ones: they are queued after every first operation has
+    been written, and skipped if any was dropped or failed.
+    """
+
+    def __init__(self, max_pending: int, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "asyncio.Queue[Tuple[str, Any, Optional[_Chain]]]" = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._batch: List[Tuple[str, Any, Optional[_Chain]]] = []  # taken off the queue, not yet written
+        self.stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "written": 0,
+            "failed": 0,
+            "skipped": 0,
+            "batches": 0,
+            "high_watermark": 0,
+        }
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self.stats | {"pending": self.pending, "capacity": self._queue.maxsize, "running": self._task is not None}
+
+    def submit(self, collection: str, ops: List[Any], then: Optional[Then] = None) -> bool:
+        """Queue operations for ``collection``; returns False if any had to be dropped."""
+        if not ops:
+            return self.submit(*then) if then is not None else True
+        chain = _Chain(len(ops), then) if then is not None else None
+        accepted = True
+        for op in ops:
+            try:
+                self._queue.put_nowait((collection, op, chain))
+                self.stats["enqueued"] += 1
+            except asyncio.QueueFull:
+                self.stats["dropped"] += 1
+                accepted = False
+                self._settle(chain, ok=False)
+        self.stats["high_watermark"] = max(self.stats["high_watermark"], self.pending)
+        if not accepted:
+            logger.warning(f"MongoDB write queue full ({self._queue.maxsize}); dropped writes for {collection}")
+        return accepted
+
+    def _settle(self, chain: Optional[_Chain], ok: bool) -> None:
+        """Account for one operation of ``chain``; the last one releases or skips its ``then``."""
+        if chain is None:
+            return
+        chain.failed = chain.failed or not ok
+        chain.pending -= 1
+        if chain.pending:
+            return
+        collection, ops = chain.then
+        if chain.failed:
+            self.stats["skipped"] += len(ops)
+            logger.warning(f"Skipped {len(ops)} writes to {collection}: the writes they depend on were not stored")
+        else:
+            self.submit(collection, ops)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker and flush everything still queued (upserts make replays safe)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        batch, self._batch = self._batch, []
+        while batch or self.pending:
+            await self._flush(self._take_batch(batch))
+            batch = []
+
+    def _take_batch(self, batch: List[Tuple[str, Any, Optional[_Chain]]]) -> List[Tuple[str, Any, Optional[_Chain]]]:
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._batch = batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                self._take_batch(batch)
+                remaining = deadline - loop.time()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+            self._batch = []
+
+    async def _flush(self, batch: List[Tuple[str, Any, Optional[_Chain]]]) -> None:
+        by_collection: Dict[str, List[Tuple[Any, Optional[_Chain]]]] = defaultdict(list)
+        for collection, op, chain in batch:
+            by_collection[collection].append((op, chain))
+        for collection, entries in by_collection.items():
+            ok = True
+            try:
+                with stage_timer("mongo_write", collection):
+                    await bulk_write_unordered(collection, [op for op, _ in entries])
+                self.stats["written"] += len(entries)
+            except Exception as e:
+                ok = False
+                self.stats["failed"] += len(entries)
+                logger.warning(f"Write-behind flush to {collection} failed ({len(entries)} ops dropped): {e}")
+            for _, chain in entries:
+                self._settle(chain, ok)
+        self.stats["batches"] += 1
+
+
+_write_queue: Optional[WriteBehindQueue] = None
+
+
+def get_write_queue() -> WriteBehindQueue:
+    global _write_queue  # noqa: PLW0603
+    if _write_queue is None:
+        _write_queue = WriteBehindQueue(**get_writer_config())
+    return _write_queue
+
+
+def enqueue_writes(collection: str, ops: List[Any], then: Optional[Then] = None) -> bool:
+    """Queue writes for the background writer; a no-op returning False without MongoDB."""
+    if mongo.db is None:
+        return False
+    return get_write_queue().submit(collection, ops, then)
+
+
+async def start_write_queue() -> None:
+    get_write_queue().start()
+
+
+async def stop_write_queue() -> None:
+    await get_write_queue().stop()
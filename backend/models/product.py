@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Annotated, Optional, List
 
 
 class PriceInfo(BaseModel):
@@ -14,6 +14,8 @@ class Review(BaseModel):
     rating: Optional[float] = None
     title: Optional[str] = None
     content: str
+    review_id: Optional[str] = Field(None, description="platform's own review id, when the page has one")
+    date: Optional[str] = Field(None, description="review date as shown on the page")
 
 
 class Product(BaseModel):
@@ -36,3 +38,15 @@ class AnalyzeResponse(BaseModel):
     analysis: AnalysisResult
 
 
+
+
+class BatchAnalyzeRequest(BaseModel):
+    products: List[Annotated[str, Field(min_length=2)]] = Field(..., min_length=1)
+    platforms: Optional[List[str]] = None
+    cache: str = Field("default", pattern="^(default|bypass|refresh)$")
+
+
+class JobRequest(BaseModel):
+    product: str = Field(..., min_length=2)
+    platforms: Optional[List[str]] = None
+    priority: int = Field(0, ge=-10, le=10, description="Higher runs first")
@@ -1,15 +1,88 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from fastapi import APIRouter, HTTPException, Query
-from services.analysis_service import analyze_product
+from fastapi.responses import StreamingResponse
+from scrapers.base import UnknownPlatformError, get_scrapers
+from models.product import BatchAnalyzeRequest
+from services.analysis_service import analyze_batch, get_batch_config, get_product_analysis, stream_product_analysis
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="", tags=["analyze"])
 
 
+def parse_platforms(platforms: Optional[str]) -> Optional[List[str]]:
+    """Split a comma separated ?platforms= value; None means every enabled scraper."""
+    if platforms is None:
+        return None
+    names = [p.strip() for p in platforms.split(",") if p.strip()]
+    return names or None
+
+
 @router.get("/analyze")
-async def analyze(product: str = Query(..., min_length=2)) -> dict:
+async def analyze(
+    product: str = Query(..., min_length=2),
+    platforms: Optional[str] = Query(None, description="Comma separated platforms, e.g. amazon,flipkart"),
+    cache: str = Query("default", pattern="^(default|bypass|refresh)$"),
+) -> dict:
     try:
-        return await analyze_product(product)
+        return await get_product_analysis(product, parse_platforms(platforms), cache)
+    except UnknownPlatformError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _sse_events(stages: AsyncIterator[Tuple[str, Dict[str, Any]]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in stages:
+            yield format_sse(event, data)
+    except Exception as exc:  # noqa: BLE001
+        # Headers are already sent, so failures are reported in-band
+        logger.error(f"Streaming analysis failed: {exc}")
+        yield format_sse("error", {"detail": str(exc)})
+
+
+@router.get("/analyze/stream")
+async def analyze_stream(
+    product: str = Query(..., min_length=2),
+    platforms: Optional[str] = Query(None, description="Comma separated platforms, e.g. amazon,flipkart"),
+    cache: str = Query("default", pattern="^(default|bypass|refresh)$"),
+) -> StreamingResponse:
+    """Server-Sent Events: ``prices`` per source, ``reviews``, ``platforms``, ``analysis``, then ``done``."""
+    names = parse_platforms(platforms)
+    try:
+        get_scrapers(names)  # reject unknown platforms before the stream starts
+    except UnknownPlatformError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return StreamingResponse(
+        _sse_events(stream_product_analysis(product, names, cache)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _ndjson_lines(lines: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    async for line in lines:
+        yield json.dumps(line, default=str) + "\n"
+
+
+@router.post("/analyze/batch")
+async def analyze_batch_endpoint(request: BatchAnalyzeRequest) -> StreamingResponse:
+    """Analyze a list of products; one NDJSON line per product, in completion order."""
+    max_products = get_batch_config()["max_products"]
+    if len(request.products) > max_products:
+        raise HTTPException(status_code=400, detail=f"At most {max_products} products per batch")
+    try:
+        get_scrapers(request.platforms)
+    except UnknownPlatformError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return StreamingResponse(
+        _ndjson_lines(analyze_batch(request.products, request.platforms, request.cache)),
+        media_type="application/x-ndjson",
+    )
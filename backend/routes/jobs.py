@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException
+from models.product import JobRequest
+from scrapers.base import UnknownPlatformError, get_scrapers
+from services.jobs import get_job, submit_job
+
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.post("", status_code=202)
+async def create_job(request: JobRequest) -> dict:
+    """Queue an analysis and return its job; poll ``GET /jobs/{id}`` for the result."""
+    try:
+        get_scrapers(request.platforms)
+    except UnknownPlatformError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return await submit_job(request.product, request.platforms, request.priority)
+
+
+@router.get("/{job_id}")
+async def read_job(job_id: str) -> dict:
+    job = await get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
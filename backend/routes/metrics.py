@@ -0,0 +1,80 @@
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from db.writer import get_write_queue
+from scrapers.http_cache import get_http_cache
+from scrapers.politeness import get_politeness_scheduler
+from services.analysis_service import analysis_flight
+from services.cache import get_result_cache
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN
+from services.jobs import jobs_snapshot
+from services.metrics import registry, render_family
+from services.ollama_client import get_inference_breaker
+from services.prewarm import get_prewarmer
+
+router = APIRouter(prefix="", tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_UNSAFE = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _numeric_fields(snapshot: Dict[str, Any], path: Tuple[str, ...] = ()) -> Iterator[Tuple[str, float]]:
+    for key, value in snapshot.items():
+        if isinstance(value, dict):
+            yield from _numeric_fields(value, path + (key,))
+        elif isinstance(value, (bool, int, float)):
+            yield _UNSAFE.sub("_", "_".join(path + (key,))), float(value)
+
+
+def stats_lines(prefix: str, help_text: str, snapshot: Dict[str, Any], label: Optional[str] = None) -> List[str]:
+    """Expose a stats snapshot as gauges, one family per numeric field.
+
+    With ``label``, ``snapshot`` maps label values (e.g. hosts) to snapshots.
+    """
+    per_label = snapshot.items() if label else [("", snapshot)]
+    families: Dict[str, List[Tuple[str, Dict[str, str], float]]] = {}
+    for label_value, fields in per_label:
+        labels = {label: label_value} if label else {}
+        for field, value in _numeric_fields(fields):
+            families.setdefault(field, []).append(("", labels, value))
+    lines: List[str] = []
+    for field, samples in families.items():
+        lines += render_family(f"{prefix}_{field}", "gauge", f"{help_text}: {field}.", samples)
+    return lines
+
+
+def _ratio(part: float, total: float) -> float:
+    return part / total if total else 0.0
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of pipeline metrics and component stats."""
+    lines = registry.render()
+
+    result_cache = get_result_cache().stats
+    served = result_cache["hits"] + result_cache["stale_hits"]
+    http_cache = get_http_cache().stats
+    reused = http_cache["hits"] + http_cache["revalidated"]
+    breaker = get_inference_breaker()
+    lines += render_family("result_cache_hit_ratio", "gauge", "Share of result cache lookups served from cache (fresh or stale).", [
+        ("", {}, _ratio(served, served + result_cache["misses"])),
+    ])
+    lines += render_family("scraper_http_cache_hit_ratio", "gauge", "Share of scraper fetches answered from cache or by a 304.", [
+        ("", {}, _ratio(reused, reused + http_cache["misses"])),
+    ])
+    lines += render_family("inference_circuit_state", "gauge", "1 for the current inference circuit state.", [
+        ("", {"state": state}, 1.0 if breaker.state == state else 0.0) for state in (CLOSED, OPEN, HALF_OPEN)
+    ])
+
+    lines += stats_lines("result_cache", "Result cache", result_cache)
+    lines += stats_lines("scraper_http_cache", "Scraper HTTP cache", http_cache)
+    lines += stats_lines("analysis_singleflight", "Coalesced analyses", analysis_flight.stats)
+    lines += stats_lines("mongo_write_queue", "Write-behind queue", get_write_queue().snapshot())
+    lines += stats_lines("inference_circuit", "Inference circuit breaker", breaker.snapshot())
+    lines += stats_lines("scraper_host", "Scraper politeness per host", get_politeness_scheduler().snapshot(), label="host")
+    lines += stats_lines("job_workers", "Background jobs", await jobs_snapshot())
+    lines += stats_lines("prewarm", "Cache pre-warming", get_prewarmer().snapshot())
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=CONTENT_TYPE)
@@ -0,0 +1,23 @@
+from typing import Optional
+from fastapi import APIRouter, Query
+from scrapers.http_cache import get_http_cache
+
+
+router = APIRouter(prefix="/scraper-cache", tags=["scraper-cache"])
+
+
+@router.get("")
+async def inspect_scraper_cache(
+    url_prefix: str = Query("", description="Only entries whose URL starts with this"),
+    limit: int = Query(100, ge=0, le=1000),
+) -> dict:
+    return await get_http_cache().inspect(url_prefix, limit)
+
+
+@router.delete("")
+async def purge_scraper_cache(
+    url_prefix: str = Query("", description="Only entries whose URL starts with this"),
+    url_class: Optional[str] = Query(None, pattern="^(search|reviews|other)$"),
+    expired_only: bool = False,
+) -> dict:
+    return {"removed": await get_http_cache().purge(url_prefix, url_class, expired_only)}
@@ -1,8 +1,11 @@
 import asyncio
-from typing import Dict, Any, List
-import httpx
-from bs4 import BeautifulSoup  # type: ignore[import-not-found]
+import hashlib
+import re
+from typing import Dict, Any, List, Optional
+from urllib.parse import urljoin
 from models.product import PriceInfo, Review
+from scrapers.base import Scraper, register_scraper
+from scrapers.parsing import Node, parse_number
 
 
 # Centralized selector config (to avoid hard-coding throughout codebase)
@@ -13,48 +16,81 @@ SELECTORS = {
     "price_whole": "span.a-price-whole",
     "price_fraction": "span.a-price-fraction",
     "review_block": "div[data-hook='review']",
-    "review_title": "a[data-hook='review-title'] span",
+    "review_title": "a[data-hook='review-title'] > span:last-child",
     "review_content": "span[data-hook='review-body'] span",
     "review_rating": "i[data-hook='review-star-rating'] span",
+    "review_date": "span[data-hook='review-date']",
+    "review_id_attr": "id",
 }
 
+ASIN_PATTERN = re.compile(r"/(?:dp|gp/product)/([A-Z0-9]{10})")
 
-async def search_amazon(query: str) -> str:
-    raise NotImplementedError
 
+@register_scraper
+class AmazonScraper(Scraper):
+    name = "amazon"
+    platform = "Amazon"
+    base_url = "https://www.amazon.in"
+    selectors = SELECTORS
+    max_concurrency = 4
 
-async def scrape_amazon(query: str) -> Dict[str, Any]:
-    # NOTE: For MVP we will simulate a single result and a few reviews to avoid
-    # brittle scraping and captchas. Replace with real search + parse later.
-    await asyncio.sleep(0)  # yield control
-
-    # Generate varied mock reviews based on query (so each product gets different reviews)
-    import hashlib
-    query_hash = int(hashlib.md5(query.lower().encode()).hexdigest()[:8], 16)
-    
-    # Vary ratings and content based on query hash
-    base_rating = 3.5 + ((query_hash % 100) / 50.0)  # 3.5 to 5.5 range
-    review_variations = [
-        (min(5.0, base_rating), "Great find", f"Really happy with my {query}. Quality is excellent and delivery was fast."),
-        (max(2.0, base_rating - 1.5), "Could be better", f"{query} works okay but expected more features for the price."),
-        (min(5.0, base_rating + 0.3), "Highly recommend", f"Best {query} I've purchased. Exceeded all my expectations!"),
-        (max(1.0, base_rating - 2.0), "Disappointing", f"Not satisfied with {query}. Build quality is poor and stopped working after a week."),
-        (base_rating, "Decent product", f"{query} is average. Does the job but nothing special."),
-    ]
-    
-    prices: List[PriceInfo] = [
-        PriceInfo(
-            platform="Amazon", 
-            url="https://www.amazon.in/s?k=" + query.replace(" ", "+"), 
-            price=float(9999 + (query_hash % 50000)),
-            currency="INR"
-        ),
-    ]
-    
-    reviews: List[Review] = [
-        Review(platform="Amazon", rating=rating, title=title, content=content)
-        for rating, title, content in review_variations[:3]  # Return 3 varied reviews
-    ]
-    return {"prices": prices, "reviews": reviews}
+    async def search(self, query: str) -> str:
+        return f"{self.base_url}/s?k=" + query.replace(" ", "+")
+
+    def parse_listing(self, doc: Node, query: str) -> Optional[PriceInfo]:
+        for item in doc.select(self.selectors["result_item"]):
+            link = item.select_one(self.selectors["link"])
+            whole = item.select_one(self.selectors["price_whole"])
+            if link is None or not link.attr("href") or whole is None:
+                continue  # ads and placeholders have no link or price
+            price = parse_number(whole.text())
+            fraction = item.select_one(self.selectors["price_fraction"])
+            if price is not None and fraction is not None:
+                price += (parse_number(fraction.text()) or 0) / 100
+            return PriceInfo(platform=self.platform, url=urljoin(self.base_url, link.attr("href")), price=price)
+        return None
+
+    def review_page_url(self, product_url: str, page: int) -> Optional[str]:
+        match = ASIN_PATTERN.search(product_url)
+        if match is None:
+            # Without an ASIN only the reviews on the product page itself are reachable
+            return product_url if page == 1 else None
+        # Newest first, so incremental crawls can stop at the first known review
+        return f"{self.base_url}/product-reviews/{match.group(1)}/?pageNumber={page}&sortBy=recent"
+
+    async def mock_scrape(self, query: str) -> Dict[str, Any]:
+        # Mock mode (SCRAPER_MODE=mock, the default) simulates a single result and a
+        # few reviews, so development and tests don't hit captchas or the network.
+        await asyncio.sleep(0)  # yield control
+
+        # Generate varied mock reviews based on query (so each product gets different reviews)
+        query_hash = int(hashlib.md5(query.lower().encode()).hexdigest()[:8], 16)
 
+        # Vary ratings and content based on query hash
+        base_rating = 3.5 + ((query_hash % 100) / 50.0)  # 3.5 to 5.5 range
+        review_variations = [
+            (min(5.0, base_rating), "Great find", f"Really happy with my {query}. Quality is excellent and delivery was fast."),
+            (max(2.0, base_rating - 1.5), "Could be better", f"{query} works okay but expected more features for the price."),
+            (min(5.0, base_rating + 0.3), "Highly recommend", f"Best {query} I've purchased. Exceeded all my expectations!"),
+            (max(1.0, base_rating - 2.0), "Disappointing", f"Not satisfied with {query}. Build quality is poor and stopped working after a week."),
+            (base_rating, "Decent product", f"{query} is average. Does the job but nothing special."),
+        ]
 
+        prices: List[PriceInfo] = [
+            PriceInfo(
+                platform=self.platform,
+                url=await self.search(query),
+                price=float(9999 + (query_hash % 50000)),
+                currency="INR"
+            ),
+        ]
+
+        reviews: List[Review] = [
+            Review(platform=self.platform, rating=rating, title=title, content=content)
+            for rating, title, content in review_variations[:3]  # Return 3 varied reviews
+        ]
+        return {"prices": prices, "reviews": reviews}
+
+
+async def scrape_amazon(query: str) -> Dict[str, Any]:
+    return await AmazonScraper().run(query)
@@ -1,10 +1,407 @@
-from typing import Dict, Any
+import asyncio
+import importlib
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, ClassVar, Collection, Deque, Dict, Iterable, List, Mapping, Optional, Tuple, Type
 
+import httpx
 
-async def graceful_scrape(scrape_fn, *args, **kwargs) -> Dict[str, Any]:  # type: ignore[no-untyped-def]
+from db.mongo import load_crawl_cursor, review_hash
+from models.product import PriceInfo, Review
+from scrapers.http_cache import get_http_cache
+from scrapers.politeness import THROTTLE_STATUSES, current_flow, get_politeness_scheduler
+from scrapers.parsing import DocumentBuilder, Node, iter_reviews, parse_document
+from services.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_SCRAPER_MODULES = "scrapers.amazon,scrapers.flipkart"
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-IN,en;q=0.9",
+}
+
+
+def get_default_timeout() -> float:
+    """Per-source scrape deadline in seconds, read at runtime."""
+    return float(os.getenv("SCRAPER_TIMEOUT", "15"))
+
+
+def get_scraper_mode() -> str:
+    """``mock`` (default) serves offline sample data, ``live`` fetches and parses real pages."""
+    return os.getenv("SCRAPER_MODE", "mock").lower()
+
+
+def get_default_review_pages() -> int:
+    return int(os.getenv("SCRAPER_MAX_REVIEW_PAGES", "3"))
+
+
+def get_max_retries() -> int:
+    """Retries of a request answered with 429/503, after the host's backoff."""
+    return int(os.getenv("SCRAPER_MAX_RETRIES", "2"))
+
+
+def get_crawl_config():
+    """Get incremental review crawl configuration, reading env vars at runtime."""
+    return {
+        "incremental": os.getenv("SCRAPER_INCREMENTAL", "true").lower() in ("1", "true", "yes"),
+        # Full re-crawls pick up edited reviews, which incremental crawls never revisit
+        "full_recrawl": timedelta(hours=float(os.getenv("SCRAPER_FULL_RECRAWL_HOURS", "168"))),
+        "cursor_ids": int(os.getenv("SCRAPER_CURSOR_IDS", "20")),
+    }
+
+
+def review_key(review: Review) -> str:
+    """Identity of a review for crawl cursors: the platform's id, else the content hash."""
+    return review.review_id or review_hash(review.model_dump())
+
+
+def full_crawl_due(cursor: Optional[Dict[str, Any]], interval: timedelta) -> bool:
+    if cursor is None or cursor.get("last_full_crawl_at") is None:
+        return True
+    last = cursor["last_full_crawl_at"]
+    if last.tzinfo is None:  # MongoDB returns naive UTC datetimes
+        last = last.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - last >= interval
+
+
+async def graceful_scrape(scrape_fn, *args, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:  # type: ignore[no-untyped-def]
+    """Run a single scraper under its own deadline without ever raising.
+
+    On timeout the scraper task is cancelled and an empty result is returned, so a
+    hung source cannot stall the other sources or the request.
+    """
+    started = time.perf_counter()
+    status, error = "ok", None
     try:
-        return await scrape_fn(*args, **kwargs)
-    except Exception:
+        result = await asyncio.wait_for(scrape_fn(*args, **kwargs), timeout)
+    except asyncio.TimeoutError:
+        result, status, error = {}, "timeout", f"no response within {timeout}s"
+    except Exception as exc:  # noqa: BLE001
+        result, status, error = {}, "error", str(exc) or exc.__class__.__name__
+    return {
+        "prices": result.get("prices", []),
+        "reviews": result.get("reviews", []),
+        "crawl": result.get("crawl"),
+        "cursor": result.get("cursor"),
+        "status": status,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "error": error,
+    }
+
+
+class Scraper:
+    """Base class for marketplace scrapers.
+
+    In live mode subclasses share a ``search`` -> ``fetch`` -> ``parse_listing``
+    -> ``iter_page_reviews`` lifecycle driven by their ``selectors``; in mock mode
+    ``mock_scrape`` serves offline data. Subclasses declare their own concurrency
+    limit and deadline. Callers go through ``run``, which enforces the per-class
+    concurrency limit around ``scrape``.
+    """
+
+    name: ClassVar[str] = ""  # registry key used by ?platforms=
+    platform: ClassVar[str] = ""  # display name stored on prices/reviews
+    base_url: ClassVar[str] = ""
+    selectors: ClassVar[Dict[str, str]] = {}
+    max_concurrency: ClassVar[int] = 4
+    timeout: ClassVar[Optional[float]] = None  # falls back to SCRAPER_TIMEOUT
+    max_review_pages: ClassVar[Optional[int]] = None  # falls back to SCRAPER_MAX_REVIEW_PAGES
+    # Per-host politeness limits; None falls back to SCRAPER_HOST_RATE / SCRAPER_HOST_MAX_IN_FLIGHT
+    requests_per_second: ClassVar[Optional[float]] = None
+    max_in_flight_per_host: ClassVar[Optional[int]] = None
+    enabled: ClassVar[bool] = True  # included when no platforms are requested
+
+    _semaphore: ClassVar[Optional[asyncio.Semaphore]] = None
+
+    @classmethod
+    def semaphore(cls) -> asyncio.Semaphore:
+        # Created lazily and per class so every platform gets its own limit
+        if cls.__dict__.get("_semaphore") is None:
+            cls._semaphore = asyncio.Semaphore(cls.max_concurrency)
+        return cls._semaphore  # type: ignore[return-value]
+
+    def get_timeout(self) -> float:
+        return self.timeout if self.timeout is not None else get_default_timeout()
+
+    def get_max_review_pages(self) -> int:
+        return self.max_review_pages if self.max_review_pages is not None else get_default_review_pages()
+
+    async def search(self, query: str) -> str:
+        """Return the URL of the search results page for ``query``."""
+        raise NotImplementedError
+
+    async def fetch(self, url: str, url_class: str = "other", revalidate: bool = False) -> Node:
+        """Download a page, feeding the body to the parser as it streams in.
+
+        Goes through the HTTP cache: fresh entries skip the network, expired
+        ones (or any, with ``revalidate``) are revalidated with a conditional
+        request. ``url_class`` ("search", "reviews" or "other") selects the
+        cache TTL. Network requests wait for a slot from the host's politeness
+        scheduler and are retried after its backoff when throttled.
+        """
+        cache = get_http_cache()
+        cached = await cache.get(url)
+        if cached is not None and not revalidate and cache.is_fresh(cached):
+            cache.stats["hits"] += 1
+            return parse_document(cached.body)
+
+        headers = DEFAULT_HEADERS | cache.conditional_headers(cached)
+        scheduler = get_politeness_scheduler()
+        limits = {"rate": self.requests_per_second, "max_in_flight": self.max_in_flight_per_host}
+        retries = get_max_retries()
+        for attempt in range(retries + 1):
+            builder = DocumentBuilder()
+            chunks: List[bytes] = []
+            async with scheduler.slot(url, **limits) as host:
+                async with get_http_client().stream("GET", url, headers=headers, timeout=self.get_timeout()) as resp:
+                    host.record(resp.status_code, resp.headers.get("retry-after"))
+                    if resp.status_code in THROTTLE_STATUSES and attempt < retries:
+                        continue  # the next slot waits out the host's backoff
+                    if resp.status_code == 304 and cached is not None:
+                        cache.stats["revalidated"] += 1
+                        cache.stats["bytes_saved"] += cached.size
+                        await cache.refresh(cached)
+                        return parse_document(cached.body)
+                    resp.raise_for_status()
+                    async for chunk in resp.aiter_bytes():
+                        builder.feed(chunk)
+                        chunks.append(chunk)
+            break
+        cache.stats["misses"] += 1
+        await cache.put(url, url_class, b"".join(chunks), resp.headers)
+        return builder.close()
+
+    def parse_listing(self, doc: Node, query: str) -> Optional[PriceInfo]:
+        """Pick the product from the search results page (its ``url`` leads to the reviews)."""
+        raise NotImplementedError
+
+    def review_page_url(self, product_url: str, page: int) -> Optional[str]:
+        """URL of the ``page``-th (1-based) review page of a product; None if there is no such page."""
+        raise NotImplementedError
+
+    def iter_page_reviews(self, doc: Node) -> Iterable[Review]:
+        return iter_reviews(doc, self.selectors, self.platform)
+
+    async def iter_product_reviews(
+        self,
+        product_url: str,
+        known: Collection[str] = (),
+        progress: Optional[Dict[str, Any]] = None,
+        first_page: int = 1,
+    ) -> AsyncIterator[Review]:
+        """Yield reviews page by page, newest first, parsing pages in order.
+
+        A full crawl (no ``known`` review keys) fetches all pages concurrently.
+        An incremental crawl stops at the first known review, so it fetches one
+        page at a time and doubles the read-ahead with every page of only new
+        reviews. Either stops at the first failed or empty page and cancels the
+        fetches after it. At most the review page limit is read, starting at
+        ``first_page``. ``progress`` receives ``pages`` (the last page read) and
+        the ``stopped`` reason.
+        """
+        progress = progress if progress is not None else {}
+        progress.update(pages=0, stopped="limit")
+        max_pages = self.get_max_review_pages()
+        last_page = first_page + max_pages - 1
+        window = 1 if known else max_pages
+        pages: Deque[Tuple[int, "asyncio.Future[Node]"]] = deque()
+        next_page = first_page
+
+        def read_ahead() -> None:
+            nonlocal next_page
+            while len(pages) < window and next_page <= last_page:
+                url = self.review_page_url(product_url, next_page)
+                if url is None:  # the site has no more review pages
+                    next_page = last_page + 1
+                    progress["stopped"] = "end"
+                    return
+                # Incremental crawls look for what changed since the last one,
+                # so a page still fresh in the cache would hide new reviews
+                fetch = self.fetch(url, "reviews", revalidate=bool(known))
+                pages.append((next_page, asyncio.ensure_future(fetch)))
+                next_page += 1
+
+        try:
+            read_ahead()
+            while pages:
+                number, page = pages.popleft()
+                try:
+                    doc = await page
+                except httpx.HTTPError as e:
+                    logger.warning(f"{self.platform} review page {number} failed: {e}")
+                    progress["stopped"] = "error"
+                    return
+                progress["pages"] = number
+                found = 0
+                for review in self.iter_page_reviews(doc):
+                    found += 1
+                    if review_key(review) in known:
+                        progress["stopped"] = "known"
+                        return
+                    yield review
+                if not found:
+                    progress["stopped"] = "empty"
+                    return
+                window = min(max_pages, window * 2)
+                read_ahead()
+        finally:
+            for _, page in pages:
+                if not page.done():
+                    page.cancel()
+                elif not page.cancelled():
+                    page.exception()  # pages after a failure are not awaited
+
+    async def live_scrape(self, query: str) -> Dict[str, Any]:
+        listing = self.parse_listing(await self.fetch(await self.search(query), "search"), query)
+        if listing is None or not listing.url:
+            return {"prices": [], "reviews": []}
+        normalized = query.strip().lower()
+        config = get_crawl_config()
+        cursor = await load_crawl_cursor(normalized, self.platform) if config["incremental"] else None
+        full = full_crawl_due(cursor, config["full_recrawl"])
+        resume = None if full or cursor is None else cursor.get("resume")
+        if resume:
+            # Fill the gap left by a crawl that hit the page limit before a known review
+            known, first_page = set(resume["known_ids"]), resume["page"]
+        else:
+            known, first_page = set() if full or cursor is None else set(cursor.get("known_ids") or []), 1
+
+        progress: Dict[str, Any] = {}
+        reviews = [review async for review in self.iter_product_reviews(listing.url, known, progress, first_page)]
+        crawl = {"mode": "full" if full else "incremental", "new_reviews": len(reviews)} | progress
+        if resume:
+            crawl["resumed_at"] = first_page
+        return {
+            "prices": [listing],
+            "reviews": reviews,
+            "crawl": crawl,
+            # Written by the caller once the reviews are stored; a failed crawl keeps the old cursor
+            "cursor": self.next_cursor(normalized, cursor, reviews, full, progress, config["cursor_ids"])
+            if config["incremental"] and progress["stopped"] != "error"
+            else None,
+        }
+
+    def next_cursor(
+        self,
+        normalized: str,
+        cursor: Optional[Dict[str, Any]],
+        reviews: List[Review],
+        full: bool,
+        progress: Dict[str, Any],
+        limit: int,
+    ) -> Dict[str, Any]:
+        """Cursor after a crawl that yielded ``reviews`` (newest first).
+
+        ``known_ids`` keeps the newest ``limit`` review keys rather than just one,
+        so a deleted newest review does not turn every crawl into a full one.
+
+        An incremental crawl that hits the page limit before a known review
+        leaves a gap of unread pages. ``resume`` records the page after the last
+        one read and the keys that end the gap; the next crawl starts there
+        instead of at the front. Reviews added meanwhile only push the gap to
+        later pages, so resuming can re-read a few reviews but never skips one.
+        """
+        previous = [] if full or cursor is None else cursor.get("known_ids") or []
+        resume = None if full or cursor is None else cursor.get("resume")
+        gap_end = resume["known_ids"] if resume else previous
+        now = datetime.now(timezone.utc)
+        return {
+            "normalized_name": normalized,
+            "platform": self.platform,
+            # A resumed crawl reads older reviews; the newest ones are unchanged
+            "known_ids": previous if resume
+            else list(dict.fromkeys([review_key(r) for r in reviews[:limit]] + previous))[:limit],
+            "newest_review_date": (cursor or {}).get("newest_review_date") if resume or not reviews else reviews[0].date,
+            "resume": {"page": progress["pages"] + 1, "known_ids": gap_end}
+            if gap_end and progress["stopped"] == "limit"
+            else None,
+            "last_crawl_at": now,
+            "last_full_crawl_at": now if full else (cursor or {}).get("last_full_crawl_at"),
+        }
+
+    async def mock_scrape(self, query: str) -> Dict[str, Any]:
+        """Offline sample data for mock mode; scrapers without any return nothing."""
         return {"prices": [], "reviews": []}
 
+    async def scrape(self, query: str) -> Dict[str, Any]:
+        if get_scraper_mode() == "live":
+            return await self.live_scrape(query)
+        return await self.mock_scrape(query)
 
+    async def run(self, query: str) -> Dict[str, Any]:
+        current_flow.set(f"{self.name}:{query.strip().lower()}")
+        async with self.semaphore():
+            return await self.scrape(query)
+
+
+class UnknownPlatformError(ValueError):
+    """Raised when a request names a platform with no registered scraper."""
+
+
+SCRAPER_REGISTRY: Dict[str, Type[Scraper]] = {}
+_modules_loaded = False
+
+
+def register_scraper(cls: Type[Scraper]) -> Type[Scraper]:
+    """Class decorator that makes a scraper selectable by its ``name``."""
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} must define a name")
+    SCRAPER_REGISTRY[cls.name] = cls
+    return cls
+
+
+def load_scrapers() -> None:
+    """Import the scraper modules listed in SCRAPER_MODULES so they can register."""
+    global _modules_loaded  # noqa: PLW0603
+    if _modules_loaded:
+        return
+    modules = os.getenv("SCRAPER_MODULES", DEFAULT_SCRAPER_MODULES)
+    for module in (m.strip() for m in modules.split(",")):
+        if module:
+            importlib.import_module(module)
+    _modules_loaded = True
+
+
+def get_scrapers(platforms: Optional[Iterable[str]] = None) -> Dict[str, Scraper]:
+    """Instantiate the requested scrapers, or every enabled one if none are given."""
+    load_scrapers()
+    if platforms is None:
+        names = [name for name, cls in SCRAPER_REGISTRY.items() if cls.enabled]
+    else:
+        names = list(dict.fromkeys(p.strip().lower() for p in platforms if p.strip()))
+        unknown = [name for name in names if name not in SCRAPER_REGISTRY]
+        if unknown:
+            available = ", ".join(sorted(SCRAPER_REGISTRY))
+            raise UnknownPlatformError(f"Unknown platform(s): {', '.join(unknown)}. Available: {available}")
+    return {name: SCRAPER_REGISTRY[name]() for name in names}
+
+
+async def scrape_as_completed(scrapers: Mapping[str, Scraper], query: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Fan a query out to every scraper concurrently.
+
+    Yields ``(name, result)`` as each source finishes, where ``result`` is
+    its ``graceful_scrape`` result. Latency is bounded by the slowest source
+    (or its deadline) instead of the sum of all sources. Scrapes still left
+    when the consumer stops iterating are cancelled.
+    """
+    tasks = {
+        asyncio.ensure_future(graceful_scrape(scraper.run, query, timeout=scraper.get_timeout())): name
+        for name, scraper in scrapers.items()
+    }
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield tasks[task], task.result()
+    finally:
+        for task in pending:
+            task.cancel()
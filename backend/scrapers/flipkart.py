@@ -1,8 +1,10 @@
 import asyncio
-from typing import Dict, Any, List
-import httpx
-from bs4 import BeautifulSoup  # type: ignore[import-not-found]
+import hashlib
+from typing import Dict, Any, List, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
 from models.product import PriceInfo, Review
+from scrapers.base import Scraper, register_scraper
+from scrapers.parsing import Node, parse_number
 
 
 # Flipkart selectors (similar structure to Amazon for consistency)
@@ -13,46 +15,71 @@ SELECTORS = {
     "price": "div._30jeq3",
     "review_block": "div._27M-vq",
     "review_title": "p._2-N8zT",
-    "review_content": "div.t-ZTKy",
+    "review_content": "div.t-ZTKy > div > div",
     "review_rating": "div._3LWZlK",
 }
 
 
-async def search_flipkart(query: str) -> str:
-    raise NotImplementedError
+@register_scraper
+class FlipkartScraper(Scraper):
+    name = "flipkart"
+    platform = "Flipkart"
+    base_url = "https://www.flipkart.com"
+    selectors = SELECTORS
+    max_concurrency = 4
 
+    async def search(self, query: str) -> str:
+        return f"{self.base_url}/search?q=" + query.replace(" ", "+")
 
-async def scrape_flipkart(query: str) -> Dict[str, Any]:
-    # NOTE: For MVP we will simulate a single result and a few reviews to avoid
-    # brittle scraping and captchas. Replace with real search + parse later.
-    await asyncio.sleep(0)  # yield control
-
-    # Generate varied mock reviews based on query (so each product gets different reviews)
-    import hashlib
-    query_hash = int(hashlib.md5(query.lower().encode()).hexdigest()[:8], 16)
-    
-    # Vary ratings and content based on query hash (different pattern than Amazon)
-    base_rating = 3.8 + ((query_hash % 80) / 40.0)  # 3.8 to 5.8 range
-    review_variations = [
-        (min(5.0, base_rating + 0.2), "Excellent purchase", f"{query} is fantastic value for money. Build quality is solid."),
-        (max(2.5, base_rating - 1.0), "Average experience", f"{query} performs okay but there are better options available."),
-        (min(5.0, base_rating + 0.5), "Superb product", f"Absolutely love this {query}! Fast shipping and great customer service from Flipkart."),
-        (max(1.5, base_rating - 2.5), "Not worth it", f"Regret buying {query}. Quality issues and poor after-sales support."),
-        (base_rating, "Good value", f"{query} meets basic expectations. Nothing exceptional but gets the job done."),
-    ]
-    
-    prices: List[PriceInfo] = [
-        PriceInfo(
-            platform="Flipkart", 
-            url="https://www.flipkart.com/search?q=" + query.replace(" ", "+"), 
-            price=float(8999 + (query_hash % 45000)),  # Slightly different price than Amazon
-            currency="INR"
-        ),
-    ]
-    
-    reviews: List[Review] = [
-        Review(platform="Flipkart", rating=rating, title=title, content=content)
-        for rating, title, content in review_variations[:3]  # Return 3 varied reviews
-    ]
-    return {"prices": prices, "reviews": reviews}
+    def parse_listing(self, doc: Node, query: str) -> Optional[PriceInfo]:
+        for item in doc.select(self.selectors["result_item"]):
+            link = item.select_one(self.selectors["link"])
+            price = item.select_one(self.selectors["price"])
+            if link is None or not link.attr("href") or price is None:
+                continue
+            return PriceInfo(platform=self.platform, url=urljoin(self.base_url, link.attr("href")), price=parse_number(price.text()))
+        return None
+
+    def review_page_url(self, product_url: str, page: int) -> Optional[str]:
+        # /<slug>/p/<itm id>?pid=... -> /<slug>/product-reviews/<itm id>?pid=...&page=N, newest first
+        parts = urlsplit(product_url)
+        query = [(k, v) for k, v in parse_qsl(parts.query) if k in ("pid", "lid")]
+        query += [("page", str(page)), ("sortOrder", "MOST_RECENT")]
+        return urlunsplit(parts._replace(path=parts.path.replace("/p/", "/product-reviews/", 1), query=urlencode(query)))
+
+    async def mock_scrape(self, query: str) -> Dict[str, Any]:
+        # Mock mode (SCRAPER_MODE=mock, the default) simulates a single result and a
+        # few reviews, so development and tests don't hit captchas or the network.
+        await asyncio.sleep(0)  # yield control
+
+        # Generate varied mock reviews based on query (so each product gets different reviews)
+        query_hash = int(hashlib.md5(query.lower().encode()).hexdigest()[:8], 16)
+
+        # Vary ratings and content based on query hash (different pattern than Amazon)
+        base_rating = 3.8 + ((query_hash % 80) / 40.0)  # 3.8 to 5.8 range
+        review_variations = [
+            (min(5.0, base_rating + 0.2), "Excellent purchase", f"{query} is fantastic value for money. Build quality is solid."),
+            (max(2.5, base_rating - 1.0), "Average experience", f"{query} performs okay but there are better options available."),
+            (min(5.0, base_rating + 0.5), "Superb product", f"Absolutely love this {query}! Fast shipping and great customer service from Flipkart."),
+            (max(1.5, base_rating - 2.5), "Not worth it", f"Regret buying {query}. Quality issues and poor after-sales support."),
+            (base_rating, "Good value", f"{query} meets basic expectations. Nothing exceptional but gets the job done."),
+        ]
 
+        prices: List[PriceInfo] = [
+            PriceInfo(
+                platform=self.platform,
+                url=await self.search(query),
+                price=float(8999 + (query_hash % 45000)),  # Slightly different price than Amazon
+                currency="INR"
+            ),
+        ]
+
+        reviews: List[Review] = [
+            Review(platform=self.platform, rating=rating, title=title, content=content)
+            for rating, title, content in review_variations[:3]  # Return 3 varied reviews
+        ]
+        return {"prices": prices, "reviews": reviews}
+
+
+async def scrape_flipkart(query: str) -> Dict[str, Any]:
+    return await FlipkartScraper().run(query)
@@ -0,0 +1,212 @@
+"""On-disk HTTP cache for scraper fetches.
+
+Each URL is stored in one file: a JSON header line (URL, URL class, validators,
+sizes, timestamps) followed by the zlib-compressed body. Entries are fresh for
+the TTL of their URL class; after that they are revalidated with
+``If-None-Match`` / ``If-Modified-Since``, so an unchanged page costs a 304
+instead of a full download. File I/O runs in worker threads.
+"""
+
+import os
+import json
+import time
+import zlib
+import asyncio
+import hashlib
+import logging
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+URL_CLASSES = ("search", "reviews", "other")
+
+
+def get_http_cache_config():
+    """Get scraper HTTP cache configuration, reading env vars at runtime."""
+    return {
+        "enabled": os.getenv("SCRAPER_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+        "directory": os.getenv("SCRAPER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "product_analyzer_http_cache")),
+        "ttls": {
+            # Search results change often. Incremental review crawls revalidate
+            # regardless of the TTL, so it only applies to full crawls
+            "search": float(os.getenv("SCRAPER_CACHE_TTL_SEARCH", "900")),
+            "reviews": float(os.getenv("SCRAPER_CACHE_TTL_REVIEWS", "21600")),
+            "other": float(os.getenv("SCRAPER_CACHE_TTL_OTHER", "3600")),
+        },
+        "compression_level": int(os.getenv("SCRAPER_CACHE_COMPRESSION_LEVEL", "6")),
+    }
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    url_class: str
+    stored_at: float
+    etag: Optional[str]
+    last_modified: Optional[str]
+    size: int
+    compressed_size: int
+    body: bytes = b""
+
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def header(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("body")
+        return data
+
+
+class HttpCache:
+    """Compressed response bodies keyed by URL, with per-URL-class TTLs."""
+
+    def __init__(self, directory: str, ttls: Dict[str, float], compression_level: int, enabled: bool = True):
+        self.directory = directory
+        self.ttls = ttls
+        self.compression_level = compression_level
+        self.enabled = enabled
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "bytes_saved": 0}
+
+    def ttl(self, url_class: str) -> float:
+        return self.ttls.get(url_class, self.ttls["other"])
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".cache")
+
+    def _read(self, path: str, with_body: bool = True) -> Optional[CacheEntry]:
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                body = zlib.decompress(f.read()) if with_body else b""
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error) as e:
+            logger.warning(f"Dropping unreadable HTTP cache file {path}: {e}")
+            self._remove(path)
+            return None
+        return CacheEntry(**header, body=body)
+
+    def _write(self, entry: CacheEntry) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(entry.url)
+        compressed = zlib.compress(entry.body, self.compression_level)
+        entry.compressed_size = len(compressed)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(entry.header()).encode("utf-8") + b"\n")
+            f.write(compressed)
+        os.replace(tmp, path)  # readers never see a partial file
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    async def get(self, url: str) -> Optional[CacheEntry]:
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self._read, self._path(url))
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age() <= self.ttl(entry.url_class)
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    async def put(self, url: str, url_class: str, body: bytes, headers: Any) -> None:
+        """Store a 200 response unless it says ``no-store``."""
+        if not self.enabled or "no-store" in (headers.get("cache-control") or "").lower():
+            return
+        entry = CacheEntry(
+            url=url,
+            url_class=url_class,
+            stored_at=time.time(),
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            size=len(body),
+            compressed_size=0,
+            body=body,
+        )
+        try:
+            await asyncio.to_thread(self._write, entry)
+            self.stats["stores"] += 1
+        except OSError as e:
+            logger.warning(f"Could not cache {url}: {e}")
+
+    async def refresh(self, entry: CacheEntry) -> None:
+        """Restart the TTL of an entry the server confirmed with a 304."""
+        entry.stored_at = time.time()
+        try:
+            await asyncio.to_thread(self._write, entry)
+        except OSError as e:
+            logger.warning(f"Could not refresh cached {entry.url}: {e}")
+
+    def _scan(self) -> List[CacheEntry]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            if name.endswith(".cache"):
+                entry = self._read(os.path.join(self.directory, name), with_body=False)
+                if entry is not None:
+                    entries.append(entry)
+        return entries
+
+    async def inspect(self, url_prefix: str = "", limit: int = 100) -> Dict[str, Any]:
+        """Totals per URL class plus the most recent matching entries."""
+        entries = [e for e in await asyncio.to_thread(self._scan) if e.url.startswith(url_prefix)]
+        classes: Dict[str, Dict[str, Any]] = {}
+        for entry in entries:
+            totals = classes.setdefault(entry.url_class, {"entries": 0, "fresh": 0, "size": 0, "compressed_size": 0})
+            totals["entries"] += 1
+            totals["fresh"] += self.is_fresh(entry)
+            totals["size"] += entry.size
+            totals["compressed_size"] += entry.compressed_size
+        recent = sorted(entries, key=lambda e: e.stored_at, reverse=True)[:limit]
+        return {
+            "directory": self.directory,
+            "enabled": self.enabled,
+            "ttls": self.ttls,
+            "stats": self.stats,
+            "classes": classes,
+            "entries": [e.header() | {"age_seconds": round(e.age(), 1), "fresh": self.is_fresh(e)} for e in recent],
+        }
+
+    async def purge(self, url_prefix: str = "", url_class: Optional[str] = None, expired_only: bool = False) -> int:
+        """Delete matching entries; returns how many were removed."""
+
+        def run() -> int:
+            removed = 0
+            for entry in self._scan():
+                if not entry.url.startswith(url_prefix):
+                    continue
+                if url_class is not None and entry.url_class != url_class:
+                    continue
+                if expired_only and self.is_fresh(entry):
+                    continue
+                self._remove(self._path(entry.url))
+                removed += 1
+            return removed
+
+        return await asyncio.to_thread(run)
+
+
+_http_cache: Optional[HttpCache] = None
+
+
+def get_http_cache() -> HttpCache:
+    global _http_cache  # noqa: PLW0603
+    if _http_cache is None:
+        _http_cache = HttpCache(**get_http_cache_config())
+    return _http_cache
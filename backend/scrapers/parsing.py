@@ -0,0 +1,171 @@
+"""HTML parsing backends for the scrapers.
+
+Pages are parsed with the fastest installed backend: selectolax (Lexbor), then
+lxml (fed incrementally while the response streams in), then BeautifulSoup.
+SCRAPER_PARSER pins one. All backends are wrapped in the same small ``Node``
+interface (CSS ``select``/``select_one``, ``text``, ``attr``), so scrapers
+only deal with their selector maps.
+"""
+
+import os
+import re
+import logging
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+from models.product import Review
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("selectolax", "lxml", "bs4")
+
+
+def _available(backend: str) -> bool:
+    try:
+        if backend == "selectolax":
+            import selectolax.lexbor  # type: ignore[import-not-found]  # noqa: F401
+        elif backend == "lxml":
+            import lxml.html  # type: ignore[import-untyped]  # noqa: F401
+            import cssselect  # type: ignore[import-untyped]  # noqa: F401
+        else:
+            import bs4  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+_resolved: Dict[str, str] = {}
+
+
+def get_parser_backend() -> str:
+    """The backend named by SCRAPER_PARSER (default ``auto``: fastest installed)."""
+    requested = os.getenv("SCRAPER_PARSER", "auto").lower()
+    if requested not in _resolved:
+        candidates = BACKENDS if requested == "auto" else (requested,)
+        backend = next((b for b in candidates if b in BACKENDS and _available(b)), None)
+        if backend is None:
+            logger.warning(f"HTML parser '{requested}' is not installed; using BeautifulSoup")
+            backend = "bs4"
+        _resolved[requested] = backend
+    return _resolved[requested]
+
+
+def clean_text(text: Optional[str]) -> str:
+    return " ".join((text or "").split())
+
+
+class Node:
+    """Backend-neutral view of an element."""
+
+    def __init__(self, backend: str, node: Any):
+        self._backend = backend
+        self._node = node
+
+    def select(self, selector: str) -> List["Node"]:
+        if self._backend == "selectolax":
+            found = self._node.css(selector)
+        elif self._backend == "lxml":
+            found = self._node.cssselect(selector)
+        else:
+            found = self._node.select(selector)
+        return [Node(self._backend, n) for n in found]
+
+    def select_one(self, selector: str) -> Optional["Node"]:
+        if self._backend == "selectolax":
+            found = self._node.css_first(selector)
+        elif self._backend == "lxml":
+            matches = self._node.cssselect(selector)
+            found = matches[0] if matches else None
+        else:
+            found = self._node.select_one(selector)
+        return Node(self._backend, found) if found is not None else None
+
+    def text(self) -> str:
+        if self._backend == "selectolax":
+            return clean_text(self._node.text(deep=True, separator=" "))
+        if self._backend == "lxml":
+            return clean_text(self._node.text_content())
+        return clean_text(self._node.get_text(" "))
+
+    def attr(self, name: str) -> Optional[str]:
+        if self._backend == "selectolax":
+            return self._node.attributes.get(name)
+        return self._node.get(name)
+
+
+class DocumentBuilder:
+    """Accepts a page in chunks as it downloads and returns its root ``Node``.
+
+    lxml parses each chunk as it arrives, overlapping parsing with the network;
+    the other backends parse the buffered page on ``close``.
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = backend or get_parser_backend()
+        self._chunks: List[bytes] = []
+        self._parser: Any = None
+        if self.backend == "lxml":
+            import lxml.html  # type: ignore[import-untyped]
+
+            self._parser = lxml.html.HTMLParser(encoding="utf-8")
+
+    def feed(self, chunk: bytes) -> None:
+        if self._parser is not None:
+            self._parser.feed(chunk)
+        else:
+            self._chunks.append(chunk)
+
+    def close(self) -> Node:
+        if self._parser is not None:
+            root = self._parser.close()
+            if root is None:
+                import lxml.html  # type: ignore[import-untyped]
+
+                root = lxml.html.fromstring("<html></html>")
+            return Node(self.backend, root)
+        html = b"".join(self._chunks)
+        if self.backend == "selectolax":
+            from selectolax.lexbor import LexborHTMLParser  # type: ignore[import-not-found]
+
+            return Node(self.backend, LexborHTMLParser(html))
+        from bs4 import BeautifulSoup
+
+        return Node(self.backend, BeautifulSoup(html, "lxml" if _available("lxml") else "html.parser"))
+
+
+def parse_document(html: str | bytes, backend: Optional[str] = None) -> Node:
+    builder = DocumentBuilder(backend)
+    builder.feed(html.encode("utf-8") if isinstance(html, str) else html)
+    return builder.close()
+
+
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def parse_number(text: Optional[str]) -> Optional[float]:
+    """First number in ``text`` ("₹1,299.00" -> 1299.0, "4.0 out of 5 stars" -> 4.0)."""
+    match = _NUMBER.search(text or "")
+    return float(match.group(0).replace(",", "")) if match else None
+
+
+def iter_reviews(doc: Node, selectors: Mapping[str, str], platform: str) -> Iterator[Review]:
+    """Yield one ``Review`` per review block; blocks without text are skipped.
+
+    Optional selector keys: ``review_date`` and ``review_id_attr``, the block
+    attribute holding the platform's review id.
+    """
+    for block in doc.select(selectors["review_block"]):
+        content_node = block.select_one(selectors["review_content"])
+        content = content_node.text() if content_node is not None else ""
+        if not content:
+            continue
+        title_node = block.select_one(selectors["review_title"])
+        rating_node = block.select_one(selectors["review_rating"])
+        date_node = block.select_one(selectors["review_date"]) if "review_date" in selectors else None
+        yield Review(
+            platform=platform,
+            rating=parse_number(rating_node.text()) if rating_node is not None else None,
+            title=(title_node.text() or None) if title_node is not None else None,
+            content=content,
+            review_id=block.attr(selectors["review_id_attr"]) if "review_id_attr" in selectors else None,
+            date=(date_node.text() or None) if date_node is not None else None,
+        )
@@ -0,0 +1,192 @@
+"""Per-host politeness for scraper requests.
+
+Every outbound scraper request takes a slot from the scheduler of its host.
+A host hands out slots when all of these hold:
+
+* its token bucket has a token (``rate`` per second, bursts up to ``burst``),
+* fewer than ``max_in_flight`` requests to it are running,
+* it is not backing off after a 429/503 (``Retry-After`` if sent, otherwise
+  jittered exponential backoff).
+
+Throttling also halves the host's rate, which then climbs back towards the
+configured ``rate`` with every successful response (AIMD), so the scheduler
+settles just below what the site tolerates.
+
+Waiting requests are served round-robin across flows (one flow per scraped
+query), so one product with many review pages cannot starve other analyses.
+"""
+
+import os
+import time
+import random
+import asyncio
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+THROTTLE_STATUSES = (429, 503)
+
+# Set by Scraper.run; requests made while scraping one query share a flow
+current_flow: contextvars.ContextVar[str] = contextvars.ContextVar("scrape_flow", default="")
+
+
+def get_politeness_config():
+    """Get default per-host limits, reading env vars at runtime."""
+    return {
+        "rate": float(os.getenv("SCRAPER_HOST_RATE", "2")),
+        "burst": float(os.getenv("SCRAPER_HOST_BURST", "4")),
+        "max_in_flight": int(os.getenv("SCRAPER_HOST_MAX_IN_FLIGHT", "4")),
+        "backoff_base": float(os.getenv("SCRAPER_BACKOFF_BASE", "1")),
+        "backoff_max": float(os.getenv("SCRAPER_BACKOFF_MAX", "60")),
+    }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header (HTTP dates are ignored)."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+class HostScheduler:
+    def __init__(self, rate: float, burst: float, max_in_flight: int, backoff_base: float, backoff_max: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_in_flight = max(1, max_in_flight)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._strikes = 0
+        self._flows: "OrderedDict[str, Deque[asyncio.Future[None]]]" = OrderedDict()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {"granted": 0, "throttled": 0}
+
+    def _refill(self, now: float) -> None:
+        if self.rate <= 0:  # no rate limit
+            self._tokens = self.burst
+            return
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _next_waiter(self) -> Optional["asyncio.Future[None]"]:
+        # Round-robin: take the head of the first flow, then move that flow to the back
+        while self._flows:
+            flow, waiters = next(iter(self._flows.items()))
+            while waiters and waiters[0].done():  # cancelled while queued
+                waiters.popleft()
+            if not waiters:
+                del self._flows[flow]
+                continue
+            waiter = waiters.popleft()
+            if waiters:
+                self._flows.move_to_end(flow)
+            else:
+                del self._flows[flow]
+            return waiter
+        return None
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        loop = asyncio.get_running_loop()
+        while self._flows and self._in_flight < self.max_in_flight:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0)
+            if wait > 0:
+                self._timer = loop.call_later(wait, self._dispatch)
+                return
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self._tokens -= 1
+            self._in_flight += 1
+            self.stats["granted"] += 1
+            waiter.set_result(None)
+
+    def _schedule(self) -> None:
+        if self._timer is None:
+            self._dispatch()
+
+    async def acquire(self, flow: str) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self._flows.setdefault(flow, deque()).append(waiter)
+        self._schedule()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # granted just as the caller was cancelled
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._schedule()
+
+    def record(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        """Back off the whole host after a throttling response; reset after a success."""
+        if status_code not in THROTTLE_STATUSES:
+            self._strikes = 0
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+            return
+        self.stats["throttled"] += 1
+        self._strikes += 1
+        self.rate = max(self.max_rate / 16, self.rate / 2)
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (self._strikes - 1)) * random.uniform(0.5, 1.5)
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refill(time.monotonic())
+        return self.stats | {
+            "in_flight": self._in_flight,
+            "queued": sum(len(w) for w in self._flows.values()),
+            "flows": len(self._flows),
+            "tokens": round(self._tokens, 2),
+            "rate": round(self.rate, 3),
+            "backoff_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 1),
+        }
+
+
+class PolitenessScheduler:
+    """One ``HostScheduler`` per host, created on first use."""
+
+    def __init__(self) -> None:
+        self._hosts: Dict[str, HostScheduler] = {}
+
+    def host(self, host: str, **overrides: Any) -> HostScheduler:
+        scheduler = self._hosts.get(host)
+        if scheduler is None:
+            config = get_politeness_config() | {k: v for k, v in overrides.items() if v is not None}
+            scheduler = self._hosts[host] = HostScheduler(**config)
+        return scheduler
+
+    @asynccontextmanager
+    async def slot(self, url: str, **overrides: Any) -> AsyncIterator[HostScheduler]:
+        """Hold a request slot for ``url``'s host; report the response with ``record``."""
+        scheduler = self.host(urlsplit(url).netloc.lower(), **overrides)
+        await scheduler.acquire(current_flow.get())
+        try:
+            yield scheduler
+        finally:
+            scheduler.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {host: scheduler.snapshot() for host, scheduler in self._hosts.items()}
+
+
+_scheduler: Optional[PolitenessScheduler] = None
+
+
+def get_politeness_scheduler() -> PolitenessScheduler:
+    global _scheduler  # noqa: PLW0603
+    if _scheduler is None:
+        _scheduler = PolitenessScheduler()
+    return _scheduler
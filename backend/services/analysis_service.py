@@ -1,73 +1,323 @@
-from typing import Any, Dict, List
+import os
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
 from models.product import Product, PriceInfo, Review
-from scrapers.amazon import scrape_amazon
-from scrapers.flipkart import scrape_flipkart
+from scrapers.base import get_scrapers, scrape_as_completed
 from services.ollama_client import analyze_reviews_with_ollama, analyze_reviews_by_platform
-from db.mongo import get_collection
+from services.incremental import analyze_incrementally
+from services.metrics import record_stage, timed
+from services.cache import STALE, get_result_cache, platform_key
+from services.popularity import get_popularity_tracker
+from services.singleflight import SingleFlight, StageBroadcast
+from db.mongo import crawl_cursor_upsert, load_stored_reviews, product_upsert, review_hash, review_upserts
+from db.writer import enqueue_writes
 
+logger = logging.getLogger(__name__)
 
-async def analyze_product(product_query: str) -> Dict[str, Any]:
+# Concurrent identical analyses share one computation
+analysis_flight = SingleFlight()
+
+# Stage events of the analyses in analysis_flight, so streams can join them
+_stage_broadcasts: Dict[Tuple[str, str, bool], StageBroadcast] = {}
+
+# Strong references to background refreshes
+_background_refreshes: Set["asyncio.Task[Any]"] = set()
+
+
+async def analysis_stages(
+    product_query: str, platforms: Optional[Sequence[str]] = None
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Run an analysis, yielding ``(stage, payload)`` as each stage completes.
+
+    Stages: ``prices`` once per source as it finishes, ``reviews`` once all
+    sources are in, ``platforms`` (per-platform sentiment), ``analysis`` (the
+    overall verdict) and finally ``result``, the full response.
+    """
     normalized = product_query.strip().lower()
+    scrapers = get_scrapers(platforms)
 
     prices: List[PriceInfo] = []
     reviews: List[Review] = []
 
-    # Scrape from multiple platforms
-    try:
-        amazon_result = await scrape_amazon(product_query)
-        prices.extend(amazon_result.get("prices", []))
-        reviews.extend(amazon_result.get("reviews", []))
-    except Exception:
-        # Fail gracefully for this source
-        pass
+    # Scrape all platforms concurrently; each source has its own deadline and is
+    # reported as soon as it finishes
+    scrape_results: Dict[str, Dict[str, Any]] = {}
+    async for name, result in scrape_as_completed(scrapers, product_query):
+        scrape_results[name] = result
+        yield "prices", {
+            "source": name,
+            "platform": scrapers[name].platform,
+            "prices": [p.model_dump() for p in result["prices"]],
+            "status": result["status"],
+            "latency_ms": result["latency_ms"],
+            "error": result["error"],
+        }
 
-    try:
-        flipkart_result = await scrape_flipkart(product_query)
-        prices.extend(flipkart_result.get("prices", []))
-        reviews.extend(flipkart_result.get("reviews", []))
-    except Exception:
-        # Fail gracefully for this source
-        pass
+    sources: Dict[str, Dict[str, Any]] = {}
+    cursors: List[Dict[str, Any]] = []
+    for name in scrapers:
+        result = scrape_results[name]
+        record_stage("scrape", result["latency_ms"] / 1000, name)
+        prices.extend(result["prices"])
+        reviews.extend(result["reviews"])
+        sources[name] = {
+            "status": result["status"],
+            "latency_ms": result["latency_ms"],
+            "error": result["error"],
+        }
+        if result["crawl"] is not None:
+            sources[name]["crawl"] = result["crawl"]
+        if result["cursor"] is not None:
+            cursors.append(result["cursor"])
+
+    # Incremental crawls return only new reviews: complete them with the stored
+    # ones, so the product and the analysis still cover every known review
+    crawled = [scrapers[name].platform for name, source in sources.items() if source.get("crawl", {}).get("mode") == "incremental"]
+    scraped = {review_hash(r.model_dump()) for r in reviews}
+    stored = [
+        Review.model_validate(doc)
+        for doc in await load_stored_reviews(normalized, crawled)
+        if doc.get("review_hash") not in scraped
+    ]
+    new_reviews, reviews = reviews, reviews + stored
 
     # Build product doc
     product = Product(name=product_query, normalized_name=normalized, prices=prices, reviews=reviews)
+    yield "reviews", {"reviews": [r.model_dump() for r in reviews], "sources": sources}
 
-    # Persist to MongoDB (fail gracefully if DB is unavailable)
-    try:
-        products_col = get_collection("products")
-        reviews_col = get_collection("reviews")
-
-        await products_col.update_one(
-            {"normalized_name": normalized},
-            {
-                "$set": {
-                    "name": product.name,
-                    "normalized_name": product.normalized_name,
-                    "prices": [p.model_dump() for p in product.prices],
-                }
-            },
-            upsert=True,
-        )
-
-        if reviews:
-            await reviews_col.insert_many([r.model_dump() | {"normalized_name": normalized} for r in reviews])
-    except Exception:
-        # Proceed without DB persistence
-        pass
-
-    # Analysis via Ollama (with safe fallback)
-    # Overall analysis
-    all_review_texts = [r.content for r in reviews]
-    overall_analysis = await analyze_reviews_with_ollama(all_review_texts)
-
-    # Platform-specific sentiment analysis
-    platform_analysis = await analyze_reviews_by_platform(reviews)
-
-    response = {
+    # Persist to MongoDB via the write-behind queue: the response never waits on
+    # the DB, and both writes are idempotent upserts so repeats don't duplicate reviews
+    enqueue_writes("products", [product_upsert(normalized, product.name, [p.model_dump() for p in product.prices])])
+
+    # Per-review labels: only reviews not analyzed in earlier runs go to inference
+    requested = [scraper.platform for scraper in scrapers.values()]
+    incremental = await timed(analyze_incrementally(normalized, reviews, requested), "inference", "incremental")
+    if incremental is not None:
+        overall_analysis = incremental["overall"]
+        platform_analysis = incremental["platform"]
+        review_labels = incremental["labels"]
+        ingestion = incremental["stats"] | {"mode": "incremental"}
+        yield "platforms", platform_analysis
+    else:
+        # Backend can't label individual reviews: analyze the whole set
+        # Analysis via Ollama (with safe fallback)
+        # Overall and platform-specific analysis are dispatched together
+        all_review_texts = [r.content for r in reviews]
+        overall_task = asyncio.ensure_future(timed(analyze_reviews_with_ollama(all_review_texts), "inference", "overall"))
+        try:
+            platform_analysis = await analyze_reviews_by_platform(reviews)
+            yield "platforms", platform_analysis
+            overall_analysis = await overall_task
+        finally:
+            overall_task.cancel()
+        review_labels = {}
+        ingestion = {"mode": "full"}
+    yield "analysis", overall_analysis
+
+    # Stored reviews are only written again when they got a label this time.
+    # Crawl cursors are chained to the review writes: a cursor only moves past
+    # reviews that are stored, and stays put if they are dropped or fail
+    relabeled = [r for r in stored if review_hash(r.model_dump()) in review_labels]
+    review_ops = review_upserts(normalized, [r.model_dump() for r in new_reviews + relabeled], review_labels)
+    cursor_writes = ("crawl_cursors", [crawl_cursor_upsert(cursor) for cursor in cursors]) if cursors else None
+    if review_ops or cursor_writes:
+        enqueue_writes("reviews", review_ops, then=cursor_writes)
+
+    yield "result", {
         "product": product.model_dump(),
         "analysis": overall_analysis,
         "platform_comparison": platform_analysis,
+        "sources": sources,
+        "ingestion": ingestion,
+    }
+
+
+async def _run_analysis(
+    product_query: str, platforms: Optional[Sequence[str]], store: bool, broadcast: StageBroadcast
+) -> Dict[str, Any]:
+    try:
+        async for stage, payload in analysis_stages(product_query, platforms):
+            if stage == "result":
+                if store:
+                    await get_result_cache().set(product_query.strip().lower(), platforms, payload)
+                return payload
+            broadcast.publish((stage, payload))
+    finally:
+        broadcast.close()
+    raise RuntimeError("Analysis finished without a result")
+
+
+def _start_analysis(
+    product_query: str, platforms: Optional[Sequence[str]], store: bool
+) -> Tuple["asyncio.Task[Dict[str, Any]]", StageBroadcast]:
+    """Start (or join) the single in-flight analysis for this product and platform set.
+
+    Returns its task and the broadcast of its stage events.
+    """
+    key = (product_query.strip().lower(), platform_key(platforms), store)
+    broadcast = StageBroadcast()
+    task = analysis_flight.start(key, lambda: _run_analysis(product_query, platforms, store, broadcast))
+    if key not in _stage_broadcasts:
+        # Started by this call; dropped right after analysis_flight forgets the task
+        _stage_broadcasts[key] = broadcast
+        task.add_done_callback(lambda _: _stage_broadcasts.pop(key, None))
+    return task, _stage_broadcasts[key]
+
+
+async def _compute_analysis(product_query: str, platforms: Optional[Sequence[str]], store: bool) -> Dict[str, Any]:
+    task, _ = _start_analysis(product_query, platforms, store)
+    return await asyncio.shield(task)
+
+
+async def refresh_analysis(product_query: str, platforms: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Recompute and cache an analysis without counting it as a request."""
+    return await _compute_analysis(product_query, platforms, store=True)
+
+
+async def _refresh_cached_analysis(product_query: str, platforms: Optional[Sequence[str]]) -> None:
+    try:
+        await refresh_analysis(product_query, platforms)
+    except Exception as e:
+        logger.warning(f"Background refresh of '{product_query.strip().lower()}' failed: {e}")
+
+
+def schedule_refresh(product_query: str, platforms: Optional[Sequence[str]] = None) -> bool:
+    """Refresh a cached analysis in the background; returns False if one is already running."""
+    key = (product_query.strip().lower(), platform_key(platforms), True)
+    if analysis_flight.in_flight(key):
+        return False
+    task = asyncio.create_task(_refresh_cached_analysis(product_query, platforms))
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+    return True
+
+
+async def get_product_analysis(
+    product_query: str,
+    platforms: Optional[Sequence[str]] = None,
+    cache_mode: str = "default",
+) -> Dict[str, Any]:
+    """Serve an analysis through the result cache (stale-while-revalidate).
+
+    ``cache_mode="bypass"`` neither reads nor writes the cache, ``"refresh"``
+    recomputes and overwrites the cached entry.
+    """
+    normalized = product_query.strip().lower()
+    cache = get_result_cache()
+    get_popularity_tracker().record(product_query, platforms)
+
+    if cache_mode == "default":
+        cached, state, age = await cache.get(normalized, platforms)
+        if cached is not None:
+            if state == STALE:
+                schedule_refresh(product_query, platforms)
+            return {**cached, "cache": {"status": "hit" if state != STALE else "stale", "age_seconds": round(age, 1)}}
+
+    response = await _compute_analysis(product_query, platforms, store=cache_mode != "bypass")
+    status = "miss" if cache_mode == "default" else cache_mode
+    return {**response, "cache": {"status": status, "age_seconds": 0.0}}
+
+
+def replay_stages(response: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """The stage events of an already computed (cached) response."""
+    product = response["product"]
+    sources = response.get("sources", {})
+    scrapers = get_scrapers(list(sources))
+    events: List[Tuple[str, Dict[str, Any]]] = [
+        ("prices", {
+            "source": name,
+            "platform": scrapers[name].platform,
+            "prices": [p for p in product["prices"] if p["platform"] == scrapers[name].platform],
+            **source,
+        })
+        for name, source in sources.items()
+    ]
+    events.append(("reviews", {"reviews": product["reviews"], "sources": sources}))
+    events.append(("platforms", response["platform_comparison"]))
+    events.append(("analysis", response["analysis"]))
+    events.append(("done", response))
+    return events
+
+
+async def stream_product_analysis(
+    product_query: str,
+    platforms: Optional[Sequence[str]] = None,
+    cache_mode: str = "default",
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Streaming counterpart of ``get_product_analysis``.
+
+    Yields the ``analysis_stages`` events as they happen, ending with ``done``
+    and the same response ``/analyze`` returns. Cached results are replayed at
+    once; a stream for an analysis already in flight (streamed or not) joins
+    it, getting the stages seen so far and then the live ones.
+    """
+    normalized = product_query.strip().lower()
+    cache = get_result_cache()
+    get_popularity_tracker().record(product_query, platforms)
+
+    if cache_mode == "default":
+        cached, state, age = await cache.get(normalized, platforms)
+        if cached is not None:
+            if state == STALE:
+                schedule_refresh(product_query, platforms)
+            status = {"status": "hit" if state != STALE else "stale", "age_seconds": round(age, 1)}
+            for event in replay_stages({**cached, "cache": status}):
+                yield event
+            return
+
+    store = cache_mode != "bypass"
+    status = {"status": "miss" if cache_mode == "default" else cache_mode, "age_seconds": 0.0}
+    task, broadcast = _start_analysis(product_query, platforms, store)
+    async for event in broadcast.subscribe():
+        yield event
+    response = await asyncio.shield(task)
+    yield "done", {**response, "cache": status}
+
+
+def get_batch_config():
+    """Get /analyze/batch limits, reading env vars at runtime."""
+    return {
+        "concurrency": int(os.getenv("BATCH_CONCURRENCY", "8")),
+        "max_products": int(os.getenv("BATCH_MAX_PRODUCTS", "1000")),
     }
-    return response
 
 
+async def analyze_batch(
+    product_queries: Sequence[str],
+    platforms: Optional[Sequence[str]] = None,
+    cache_mode: str = "default",
+) -> AsyncIterator[Dict[str, Any]]:
+    """Analyze many products with bounded concurrency, yielding one line per query as it completes.
+
+    Queries that normalize to the same product are analyzed once. At most
+    BATCH_CONCURRENCY products are in flight; their per-review inference is
+    packed into shared requests by the classification batcher and their
+    MongoDB writes are grouped by the write-behind queue. A failing product
+    yields an ``error`` line without affecting the rest of the batch.
+    """
+    groups: Dict[str, List[str]] = {}
+    for query in product_queries:
+        groups.setdefault(query.strip().lower(), []).append(query)
+    semaphore = asyncio.Semaphore(max(1, get_batch_config()["concurrency"]))
+
+    async def run(normalized: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+        async with semaphore:
+            try:
+                return normalized, await get_product_analysis(groups[normalized][0], platforms, cache_mode), None
+            except Exception as e:
+                logger.warning(f"Batch analysis of '{normalized}' failed: {e}")
+                return normalized, None, str(e) or e.__class__.__name__
+
+    tasks = [asyncio.ensure_future(run(normalized)) for normalized in groups]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            normalized, response, error = await next_done
+            for query in groups[normalized]:
+                if error is None:
+                    yield {"product": query, "status": "ok", "result": response}
+                else:
+                    yield {"product": query, "status": "error", "error": error}
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,138 @@
+import os
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence, Tuple
+from pymongo import UpdateOne
+from db import mongo
+from db.mongo import get_collection
+from db.writer import enqueue_writes
+
+logger = logging.getLogger(__name__)
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+def get_cache_config():
+    """Get result cache configuration, reading env vars at runtime."""
+    return {
+        "max_entries": int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024")),
+        "ttl": float(os.getenv("RESULT_CACHE_TTL", "900")),
+        "stale_ttl": float(os.getenv("RESULT_CACHE_STALE_TTL", "86400")),
+    }
+
+
+def platform_key(platforms: Optional[Sequence[str]]) -> str:
+    if not platforms:
+        return "all"
+    return ",".join(sorted({p.strip().lower() for p in platforms if p.strip()}))
+
+
+class ResultCache:
+    """Two-tier cache for full /analyze responses.
+
+    An in-process LRU with TTL sits in front of the ``products`` collection, where
+    each product document keeps its last responses under ``cached_analyses``.
+    Entries younger than ``ttl`` are fresh; entries up to ``ttl + stale_ttl`` old
+    are served as stale so the caller can refresh them in the background.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, stale_ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "mongo_hits": 0}
+
+    def _state(self, stored_at: float) -> Optional[str]:
+        age = time.time() - stored_at
+        if age <= self.ttl:
+            return FRESH
+        if age <= self.ttl + self.stale_ttl:
+            return STALE
+        return None
+
+    def _remember(self, key: Tuple[str, str], value: Dict[str, Any], stored_at: float) -> None:
+        self._entries[key] = (value, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load_from_mongo(self, key: Tuple[str, str]) -> Optional[Tuple[Dict[str, Any], float]]:
+        normalized, platforms = key
+        if mongo.db is None:  # persistence disabled
+            return None
+        try:
+            doc = await get_collection("products").find_one(
+                {"normalized_name": normalized},
+                {f"cached_analyses.{platforms}": 1},
+            )
+        except Exception as e:
+            logger.warning(f"Result cache lookup in MongoDB failed: {e}")
+            return None
+        entry = (doc or {}).get("cached_analyses", {}).get(platforms)
+        if not entry:
+            return None
+        cached_at = entry["cached_at"]
+        if cached_at.tzinfo is None:
+            cached_at = cached_at.replace(tzinfo=timezone.utc)
+        return entry["response"], cached_at.timestamp()
+
+    async def get(self, normalized: str, platforms: Optional[Sequence[str]] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str], float]:
+        """Return ``(response, state, age_seconds)``; state is fresh, stale or None."""
+        key = (normalized, platform_key(platforms))
+        found = self._entries.get(key)
+        if found is not None:
+            self._entries.move_to_end(key)
+        else:
+            found = await self._load_from_mongo(key)
+            if found is not None:
+                self.stats["mongo_hits"] += 1
+                self._remember(key, *found)
+
+        state = self._state(found[1]) if found is not None else None
+        if found is None or state is None:
+            self.stats["misses"] += 1
+            return None, None, 0.0
+        self.stats["hits" if state == FRESH else "stale_hits"] += 1
+        return found[0], state, time.time() - found[1]
+
+    async def age(self, normalized: str, platforms: Optional[Sequence[str]] = None) -> Optional[float]:
+        """Age in seconds of a usable cached entry, or None; not counted as a lookup."""
+        key = (normalized, platform_key(platforms))
+        found = self._entries.get(key) or await self._load_from_mongo(key)
+        if found is None or self._state(found[1]) is None:
+            return None
+        return time.time() - found[1]
+
+    async def set(self, normalized: str, platforms: Optional[Sequence[str]], response: Dict[str, Any]) -> None:
+        key = (normalized, platform_key(platforms))
+        now = time.time()
+        self._remember(key, response, now)
+        # Persisted through the write-behind queue so callers never wait on MongoDB
+        enqueue_writes("products", [
+            UpdateOne(
+                {"normalized_name": normalized},
+                {
+                    "$set": {
+                        f"cached_analyses.{key[1]}": {
+                            "response": response,
+                            "cached_at": datetime.fromtimestamp(now, tz=timezone.utc),
+                        }
+                    }
+                },
+                upsert=True,
+            )
+        ])
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    global _result_cache  # noqa: PLW0603
+    if _result_cache is None:
+        _result_cache = ResultCache(**get_cache_config())
+    return _result_cache
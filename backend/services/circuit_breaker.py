@@ -0,0 +1,136 @@
+import os
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def get_breaker_config():
+    """Get inference circuit breaker configuration, reading env vars at runtime."""
+    return {
+        "failure_threshold": int(os.getenv("INFERENCE_BREAKER_FAILURES", "5")),
+        "reset_timeout": float(os.getenv("INFERENCE_BREAKER_RESET_SECONDS", "30")),
+        "half_open_probes": int(os.getenv("INFERENCE_BREAKER_PROBES", "1")),
+        "latency_window": int(os.getenv("INFERENCE_LATENCY_WINDOW", "200")),
+        "min_samples": int(os.getenv("INFERENCE_LATENCY_MIN_SAMPLES", "20")),
+        "percentile": float(os.getenv("INFERENCE_TIMEOUT_PERCENTILE", "0.99")),
+        "timeout_multiplier": float(os.getenv("INFERENCE_TIMEOUT_MULTIPLIER", "2")),
+        "min_timeout": float(os.getenv("INFERENCE_TIMEOUT_MIN", "2")),
+        "max_timeout": float(os.getenv("INFERENCE_TIMEOUT_MAX", os.getenv("HTTP_TIMEOUT", "120"))),
+    }
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker with a latency-derived request timeout.
+
+    ``failure_threshold`` consecutive failures open the circuit; while open,
+    ``allow_request`` refuses immediately so callers go straight to their
+    fallback. After ``reset_timeout`` seconds up to ``half_open_probes``
+    requests are let through: a success closes the circuit, a failure re-opens it.
+
+    ``timeout()`` is ``timeout_multiplier`` times the ``percentile`` of recent
+    successful latencies, clamped to [min_timeout, max_timeout]; until
+    ``min_samples`` latencies have been seen it is ``max_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        half_open_probes: int,
+        latency_window: int,
+        min_samples: int,
+        percentile: float,
+        timeout_multiplier: float,
+        min_timeout: float,
+        max_timeout: float,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = max(1, half_open_probes)
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the backend; callers must then record its outcome."""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self.stats["rejected"] += 1
+                return False
+            self.state = HALF_OPEN
+            self._probes = 0
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                self.stats["rejected"] += 1
+                return False
+            self._probes += 1
+        return True
+
+    def record_success(self, latency: float) -> None:
+        self.stats["successes"] += 1
+        self._latencies.append(latency)
+        self._consecutive_failures = 0
+        self._probes = 0
+        self.state = CLOSED
+
+    def record_failure(self) -> None:
+        self.stats["failures"] += 1
+        self._consecutive_failures += 1
+        if self.state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.stats["opened"] += 1
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self._probes = 0
+
+    def release(self) -> None:
+        """Give back a half-open probe slot for a call that was cancelled."""
+        if self.state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(percentile * len(ordered)) - 1)]
+
+    def timeout(self) -> float:
+        if len(self._latencies) < self.min_samples:
+            return self.max_timeout
+        observed = self.latency_percentile(self.percentile) or 0.0
+        return max(self.min_timeout, min(self.max_timeout, observed * self.timeout_multiplier))
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1)
+        p50 = self.latency_percentile(0.5)
+        p99 = self.latency_percentile(0.99)
+        return self.stats | {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "retry_in_seconds": retry_in,
+            "timeout_seconds": round(self.timeout(), 2),
+            "latency_ms": {
+                "samples": len(self._latencies),
+                "p50": round(p50 * 1000, 1) if p50 is not None else None,
+                "p99": round(p99 * 1000, 1) if p99 is not None else None,
+            },
+        }
@@ -0,0 +1,65 @@
+import os
+import logging
+from typing import Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_config():
+    """Get connection pool configuration, reading env vars at runtime."""
+    return {
+        "timeout": float(os.getenv("HTTP_TIMEOUT", "120")),
+        "max_connections": int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        "max_keepalive_connections": int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        "keepalive_expiry": float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+        "http2": os.getenv("HTTP_HTTP2", "true").lower() in ("1", "true", "yes"),
+    }
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # type: ignore[import-not-found]  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    config = get_http_config()
+    http2 = config["http2"] and _http2_available()
+    if config["http2"] and not http2:
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+    return httpx.AsyncClient(
+        timeout=config["timeout"],
+        http2=http2,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=config["max_connections"],
+            max_keepalive_connections=config["max_keepalive_connections"],
+            keepalive_expiry=config["keepalive_expiry"],
+        ),
+    )
+
+
+async def init_http_client() -> None:
+    global _client  # noqa: PLW0603
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+
+
+async def close_http_client() -> None:
+    global _client  # noqa: PLW0603
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the application-scoped client, creating it if startup was skipped."""
+    global _client  # noqa: PLW0603
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
@@ -0,0 +1,63 @@
+from typing import Any, Dict, List, Optional
+from models.product import Review
+from db.mongo import load_review_labels, review_hash
+from services.ollama_client import (
+    analyze_labels_by_platform,
+    classify_reviews,
+    sentiment_from_labels,
+    summarize_sentiment,
+)
+
+
+async def analyze_incrementally(
+    normalized: str, reviews: List[Review], platforms: List[str]
+) -> Optional[Dict[str, Any]]:
+    """Analyze a product from per-review labels, classifying only unseen reviews.
+
+    Labels already stored for ``normalized`` are reused, so inference cost is
+    proportional to the number of new reviews. The aggregate covers every
+    labeled review of the product on ``platforms`` (the requested ones),
+    including ones not scraped this time.
+
+    Returns None when nothing could be labeled (e.g. the backend is a
+    generative model without per-review output), so the caller can fall back
+    to whole-set analysis. Otherwise returns the overall and platform analysis
+    plus ``labels``: review hash -> label for newly classified reviews.
+    """
+    stored = await load_review_labels(normalized, platforms)
+
+    pending: Dict[str, Review] = {}
+    for review in reviews:
+        digest = review_hash(review.model_dump())
+        if digest not in stored:
+            pending.setdefault(digest, review)
+
+    new_labels = await classify_reviews([r.content for r in pending.values()])
+    labels = {digest: label for digest, label in zip(pending, new_labels) if label}
+    if pending and not labels:
+        return None
+    if not stored and not labels:
+        return None
+
+    entries: Dict[str, Dict[str, Any]] = dict(stored)
+    for digest, label in labels.items():
+        review = pending[digest]
+        entries[digest] = {"platform": review.platform, "rating": review.rating, "sentiment_label": label}
+
+    overall = summarize_sentiment(
+        sentiment_from_labels([e["sentiment_label"] for e in entries.values()]),
+        [r.content for r in reviews],
+    )
+    platform_analysis = analyze_labels_by_platform(entries.values())
+    overall["best_platform"] = platform_analysis["best_platform"]
+
+    return {
+        "overall": overall,
+        "platform": platform_analysis,
+        "labels": labels,
+        "stats": {
+            "stored": len(stored),
+            "classified": len(labels),
+            "unlabeled": len(pending) - len(labels),
+        },
+    }
@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBatcher:
+    """Packs review texts from concurrent callers into shared inference batches.
+
+    Texts from every caller (e.g. the products of one ``/analyze/batch`` run)
+    go into one pending batch that is sent as soon as it holds ``batch_size``
+    texts, or ``max_wait`` seconds after its first text arrived. Each caller
+    gets back the results for its own texts, in order. ``send`` must return one
+    result per text; if it fails, the affected texts resolve to None.
+    """
+
+    def __init__(self, send: Callable[[List[str]], Awaitable[List[Any]]], batch_size: int, max_wait: float):
+        self._send = send
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, "asyncio.Future[Any]"]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sending: Set["asyncio.Task[None]"] = set()
+        self.stats = {"texts": 0, "batches": 0}
+
+    async def submit(self, texts: List[str]) -> List[Any]:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _run(self, batch: List[Tuple[str, "asyncio.Future[Any]"]]) -> None:
+        self.stats["texts"] += len(batch)
+        self.stats["batches"] += 1
+        results: List[Any] = []
+        try:
+            results = await self._send([text for text, _ in batch])
+        except Exception as e:
+            logger.warning(f"Shared inference batch of {len(batch)} texts failed: {e}")
+        finally:
+            if len(results) != len(batch):
+                results = [None] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,163 @@
+import os
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+from db.jobs import DONE, FAILED, get_job_store, new_job
+from services.analysis_service import get_product_analysis
+from services.cache import platform_key
+
+logger = logging.getLogger(__name__)
+
+
+def get_job_config():
+    """Get job queue configuration, reading env vars at runtime."""
+    return {
+        # 0 makes this process API-only; jobs then run in `python worker.py` processes
+        "workers": int(os.getenv("JOB_WORKERS", "2")),
+        "poll_interval": float(os.getenv("JOB_POLL_MS", "500")) / 1000,
+        "lease": float(os.getenv("JOB_LEASE_SECONDS", "600")),
+        "retention": float(os.getenv("JOB_RESULT_TTL", "86400")),
+    }
+
+
+def job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public representation of a job document."""
+    return {
+        "id": job["_id"],
+        "product": job["product"],
+        "platforms": job["platforms"],
+        "priority": job["priority"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "expires_at": job["expires_at"],
+        "result": job["result"],
+        "error": job["error"],
+    }
+
+
+class JobWorkerPool:
+    """Worker tasks that claim queued jobs and run their analyses.
+
+    Idle workers poll the store every ``poll_interval`` seconds; jobs submitted
+    from this process wake them immediately.
+    """
+
+    def __init__(self, workers: int, poll_interval: float, lease: float, retention: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.retention = retention
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self.stats = {"completed": 0, "failed": 0}
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running are picked up again once their lease expires."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self.stats | {"workers": len(self._tasks)}
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _wait_for_work(self) -> None:
+        assert self._wakeup is not None
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                job = await get_job_store().claim(self.lease)
+            except Exception as e:
+                logger.warning(f"Claiming a job failed: {e}")
+                job = None
+            if job is None:
+                await self._wait_for_work()
+                continue
+            await self.run_job(job)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        # Renew well before expiry so a slow analysis is not reclaimed and run twice
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await get_job_store().renew(job_id, self.lease)
+            except Exception as e:
+                logger.warning(f"Renewing the lease of job {job_id} failed: {e}")
+
+    async def run_job(self, job: Dict[str, Any]) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(job["_id"]))
+        try:
+            result = await get_product_analysis(job["product"], job["platforms"])
+            status, error = DONE, None
+            self.stats["completed"] += 1
+        except Exception as e:
+            logger.warning(f"Job {job['_id']} for '{job['normalized_name']}' failed: {e}")
+            result, status, error = None, FAILED, str(e) or e.__class__.__name__
+            self.stats["failed"] += 1
+        finally:
+            heartbeat.cancel()
+        try:
+            await get_job_store().finish(job["_id"], status, result, error, self.retention)
+        except Exception as e:
+            logger.error(f"Could not record the outcome of job {job['_id']}: {e}")
+
+
+_worker_pool: Optional[JobWorkerPool] = None
+
+
+def get_worker_pool() -> JobWorkerPool:
+    global _worker_pool  # noqa: PLW0603
+    if _worker_pool is None:
+        _worker_pool = JobWorkerPool(**get_job_config())
+    return _worker_pool
+
+
+async def submit_job(product: str, platforms: Optional[Sequence[str]] = None, priority: int = 0) -> Dict[str, Any]:
+    """Queue an analysis, or return the job already queued/running for the same product."""
+    names = list(platforms) if platforms else None
+    job = new_job(product.strip().lower(), product, names, platform_key(names), priority)
+    job, deduplicated = await get_job_store().submit(job)
+    get_worker_pool().notify()
+    return job_view(job) | {"deduplicated": deduplicated}
+
+
+async def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    job = await get_job_store().get(job_id)
+    return job_view(job) if job is not None else None
+
+
+async def jobs_snapshot() -> Dict[str, Any]:
+    pool = get_worker_pool()
+    try:
+        counts = await get_job_store().counts()
+    except Exception as e:
+        counts = {"error": str(e)}
+    return pool.snapshot() | {"jobs": counts}
+
+
+async def start_job_workers() -> None:
+    if get_worker_pool().workers > 0:
+        get_worker_pool().start()
+
+
+async def stop_job_workers() -> None:
+    await get_worker_pool().stop()
@@ -0,0 +1,145 @@
+"""In-process sentiment engine used when ``HF_API_BASE=local``.
+
+A small VADER-style lexicon scorer: word valences are adjusted for boosters
+("very good"), negation ("not good", "doesn't work") and contrast ("ok but
+slow" weighs the clause after "but" more), then squashed into a compound score
+in [-1, 1]. It has no model download and no network round trip; large batches
+are spread over a process pool so scoring doesn't block the event loop.
+"""
+
+import os
+import re
+import asyncio
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+LEXICON = {
+    # positive
+    "good": 1.9, "great": 3.1, "excellent": 3.2, "amazing": 2.8, "awesome": 3.1, "fantastic": 2.6,
+    "superb": 2.9, "wonderful": 2.7, "perfect": 2.7, "best": 3.2, "love": 3.2, "loved": 2.9,
+    "like": 1.5, "happy": 2.7, "satisfied": 1.8, "recommend": 1.5, "recommended": 1.5, "nice": 1.8,
+    "solid": 1.3, "durable": 1.4, "premium": 1.3, "fast": 1.2, "quick": 1.1, "smooth": 1.3,
+    "reliable": 1.6, "worth": 1.4, "affordable": 1.2, "beautiful": 2.4, "impressive": 2.2,
+    "decent": 0.9, "fine": 0.8, "okay": 0.4, "ok": 0.4, "useful": 1.3, "value": 0.8, "exceeded": 1.7,
+    # negative
+    "bad": -2.5, "terrible": -2.9, "awful": -2.9, "horrible": -2.7, "worst": -3.1, "hate": -2.7,
+    "poor": -2.1, "disappointed": -2.2, "disappointing": -2.3, "disappointment": -2.3, "broken": -2.1,
+    "broke": -1.8, "defective": -2.2, "faulty": -2.0, "useless": -2.3, "waste": -2.2, "regret": -2.0,
+    "slow": -1.3, "laggy": -1.6, "freezes": -1.7, "cheap": -1.0, "overpriced": -1.8, "expensive": -0.9,
+    "issue": -1.0, "issues": -1.1, "problem": -1.3, "problems": -1.4, "return": -0.8, "returned": -1.0,
+    "delayed": -1.2, "damaged": -2.0, "fake": -2.4, "heats": -0.9, "overheats": -1.9, "noisy": -1.2,
+}
+
+BOOSTERS = {
+    "very": 0.293, "really": 0.293, "extremely": 0.4, "super": 0.3, "so": 0.2, "highly": 0.3,
+    "absolutely": 0.35, "totally": 0.3, "quite": 0.15, "too": 0.2,
+    "slightly": -0.293, "somewhat": -0.2, "barely": -0.3, "kinda": -0.2,
+}
+
+NEGATIONS = {
+    "not", "no", "never", "none", "nothing", "neither", "nor", "without", "hardly", "cannot",
+    "cant", "dont", "doesnt", "didnt", "isnt", "wasnt", "arent", "werent", "wont", "wouldnt",
+    "shouldnt", "couldnt",
+}
+
+NEGATION_SCALAR = -0.74
+ALPHA = 15  # normalization constant for the compound score
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+_TOKEN = re.compile(r"[a-z']+|!")
+
+
+def score_review(text: str) -> float:
+    """Compound sentiment score in [-1, 1]."""
+    tokens = [t.replace("'", "") for t in _TOKEN.findall(text.lower().replace("’", "'"))]
+    words = [t for t in tokens if t != "!"]
+    # Words after "but" carry more weight than the clause before it
+    but_index = words.index("but") if "but" in words else -1
+
+    valences: List[float] = []
+    for i, word in enumerate(words):
+        valence = LEXICON.get(word)
+        if valence is None:
+            continue
+        for distance in (1, 2, 3):
+            if i - distance < 0:
+                break
+            previous = words[i - distance]
+            boost = BOOSTERS.get(previous)
+            if boost is not None and distance == 1:
+                valence += math.copysign(boost, valence)
+            if previous in NEGATIONS:
+                valence *= NEGATION_SCALAR
+                break
+        if but_index >= 0:
+            valence *= 1.5 if i > but_index else 0.5
+        valences.append(valence)
+
+    total = sum(valences)
+    if total:
+        # Exclamation marks amplify whatever the review already says
+        total += math.copysign(min(tokens.count("!"), 4) * 0.292, total)
+    return total / math.sqrt(total * total + ALPHA)
+
+
+def label_review(text: str) -> str:
+    compound = score_review(text)
+    if compound >= POSITIVE_THRESHOLD:
+        return "positive"
+    if compound <= NEGATIVE_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
+def label_batch(texts: List[str]) -> List[str]:
+    """Label a batch of reviews (runs inside pool workers)."""
+    return [label_review(text) for text in texts]
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_local_config():
+    """Get local engine configuration, reading env vars at runtime."""
+    return {
+        "workers": int(os.getenv("LOCAL_SENTIMENT_WORKERS", str(min(4, os.cpu_count() or 1)))),
+        # Below this many reviews, IPC overhead outweighs parallelism: score inline
+        "inline_max": int(os.getenv("LOCAL_SENTIMENT_INLINE_MAX", "200")),
+    }
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor  # noqa: PLW0603
+    if _executor is None:
+        # Not fork: by now the process runs Motor monitor threads and background
+        # tasks, and forking a multi-threaded process can deadlock on their locks
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _executor = ProcessPoolExecutor(
+            max_workers=get_local_config()["workers"], mp_context=multiprocessing.get_context(method)
+        )
+    return _executor
+
+
+async def classify_local(reviews: List[str]) -> List[str]:
+    """Label reviews with the local engine, using the process pool for large batches."""
+    config = get_local_config()
+    if len(reviews) <= config["inline_max"] or config["workers"] <= 1:
+        return label_batch(reviews)
+
+    chunk = math.ceil(len(reviews) / config["workers"])
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(executor, label_batch, reviews[i:i + chunk]) for i in range(0, len(reviews), chunk))
+    )
+    return [label for batch in results for label in batch]
+
+
+def shutdown_local_sentiment() -> None:
+    global _executor  # noqa: PLW0603
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
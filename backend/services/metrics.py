@@ -0,0 +1,187 @@
+"""Prometheus metrics for the analysis pipeline.
+
+Counters and histograms live in process memory and are rendered in the
+Prometheus text exposition format by ``GET /metrics``; no client library is
+needed. Pipeline stages are timed with ``stage_timer``, which also feeds the
+optional ``Server-Timing`` header of the request that ran them.
+"""
+
+import os
+import re
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def get_metrics_config():
+    """Get metrics configuration, reading env vars at runtime."""
+    return {
+        "server_timing": os.getenv("METRICS_SERVER_TIMING", "false").lower() in ("1", "true", "yes"),
+    }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render_family(name: str, kind: str, help_text: str, samples: Iterable[Tuple[str, Dict[str, str], float]]) -> List[str]:
+    """Exposition lines for one metric family; samples are (name suffix, labels, value)."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{suffix}{format_labels(labels)} {format_value(value)}" for suffix, labels, value in samples]
+    return lines
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        for key, value in sorted(self._values.items()):
+            yield "_total", dict(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> (per-bucket counts, sum, count)
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * len(self.buckets), [0.0, 0.0])
+        counts, totals = series
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        totals[0] += value
+        totals[1] += 1
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(tuple(str(labels.get(name, "")) for name in self.labelnames))
+        return int(series[1][1]) if series is not None else 0
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        for key, (counts, (total, count)) in sorted(self._series.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield "_bucket", labels | {"le": format_value(bound)}, cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, count
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Counter | Histogram] = {}
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = self._metrics[name] = Counter(name, help_text, labelnames)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = self._metrics[name] = Histogram(name, help_text, labelnames, buckets)
+        return metric
+
+    def render(self) -> List[str]:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines += render_family(metric.name, metric.kind, metric.help, metric.samples())
+        return lines
+
+
+registry = Registry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route", "status")
+)
+STAGE_SECONDS = registry.histogram(
+    "analysis_stage_duration_seconds",
+    "Latency of analysis pipeline stages (scrape per source, inference, per-platform inference, MongoDB writes).",
+    ("stage", "target"),
+)
+FALLBACKS = registry.counter(
+    "sentiment_fallback", "Analyses answered by a fallback instead of the inference backend.", ("kind",)
+)
+INFERENCE_ERRORS = registry.counter(
+    "inference_backend_errors", "Inference responses counted as backend failures, by HTTP status.", ("status",)
+)
+PARSE_FAILURES = registry.counter(
+    "inference_parse_failures", "Inference responses whose JSON could not be extracted."
+)
+
+# Stage timings of the current request, for the Server-Timing header (None: not collected)
+server_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "server_timings", default=None
+)
+
+
+def record_stage(stage: str, seconds: float, target: str = "") -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage, target=target)
+    timings = server_timings.get()
+    if timings is not None:
+        timings.append((f"{stage}_{target}" if target else stage, seconds))
+
+
+@contextmanager
+def stage_timer(stage: str, target: str = "") -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started, target)
+
+
+async def timed(awaitable: Awaitable[T], stage: str, target: str = "") -> T:
+    with stage_timer(stage, target):
+        return await awaitable
+
+
+_TOKEN_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def format_server_timing(timings: Iterable[Tuple[str, float]]) -> str:
+    """``Server-Timing`` header value; durations in milliseconds."""
+    return ", ".join(f"{_TOKEN_UNSAFE.sub('_', name)};dur={seconds * 1000:.1f}" for name, seconds in timings)
@@ -1,10 +1,18 @@
 import os
+import asyncio
 import httpx
 import re
+import time
 import logging
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, List, Set
 from collections import defaultdict
 from models.product import Review
+from services.http_client import get_http_client
+from services.inference_batcher import InferenceBatcher
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker_config
+from services.keywords import KeywordMatcher
+from services.local_sentiment import classify_local
+from services.metrics import FALLBACKS, INFERENCE_ERRORS, PARSE_FAILURES, timed
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +25,89 @@ def get_hf_config():
         "model": os.getenv("HF_MODEL", "mistralai/Mistral-7B-Instruct-v0.2"),
     }
 
+
+def is_local_backend() -> bool:
+    """``HF_API_BASE=local`` selects the in-process engine instead of a remote API."""
+    return get_hf_config()["api_base"].strip().lower() == "local"
+
+
+def get_inference_target() -> Dict[str, Any]:
+    """Resolve the inference URL, request headers and API flavour from the HF config."""
+    config = get_hf_config()
+    model = config["model"]
+    api_base = config["api_base"]
+
+    # Check if this is a custom Hugging Face Space
+    is_custom_space = ".hf.space" in api_base or "hf.space" in api_base
+
+    if is_custom_space:
+        api_url = f"{api_base}/analyze" if not api_base.endswith("/analyze") else api_base
+    else:
+        api_url = f"{api_base}/{model}" if model else api_base
+
+    headers = {
+        "Content-Type": "application/json",
+    }
+    token = config["api_token"]
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    return {"api_url": api_url, "headers": headers, "model": model, "is_custom_space": is_custom_space}
+
+
+_inference_semaphore: asyncio.Semaphore | None = None
+
+
+def get_inference_semaphore() -> asyncio.Semaphore:
+    """Bound concurrent inference requests so parallel fan-out doesn't trip rate limits."""
+    global _inference_semaphore  # noqa: PLW0603
+    if _inference_semaphore is None:
+        _inference_semaphore = asyncio.Semaphore(int(os.getenv("INFERENCE_CONCURRENCY", "4")))
+    return _inference_semaphore
+
+
+_inference_breaker: CircuitBreaker | None = None
+
+
+def get_inference_breaker() -> CircuitBreaker:
+    global _inference_breaker  # noqa: PLW0603
+    if _inference_breaker is None:
+        _inference_breaker = CircuitBreaker(**get_breaker_config())
+    return _inference_breaker
+
+
+def _is_backend_failure(resp: httpx.Response) -> bool:
+    return resp.status_code == 429 or resp.status_code >= 500
+
+
+async def post_inference(api_url: str, headers: Dict[str, str], payload: Dict[str, Any]) -> httpx.Response:
+    """POST to the inference backend through the circuit breaker.
+
+    Raises CircuitOpenError without touching the network while the circuit is
+    open. The request timeout follows observed latency rather than HTTP_TIMEOUT.
+    5xx/429 responses, timeouts and connection errors count as failures.
+    """
+    breaker = get_inference_breaker()
+    if not breaker.allow_request():
+        raise CircuitOpenError("Inference circuit is open")
+    try:
+        async with get_inference_semaphore():
+            started = time.perf_counter()
+            resp = await get_http_client().post(api_url, headers=headers, json=payload, timeout=breaker.timeout())
+    except httpx.TransportError:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    if _is_backend_failure(resp):
+        breaker.record_failure()
+        INFERENCE_ERRORS.inc(status=resp.status_code)
+    else:
+        breaker.record_success(time.perf_counter() - started)
+    return resp
+
+
 PROMPT_TEMPLATE = (
     "You are a product review analyzer. Given raw reviews, return ONLY valid JSON (no markdown, no code blocks) with keys: "
     "sentiment (percentages for positive, neutral, negative), pros (array), cons (array), "
@@ -61,6 +152,7 @@ def extract_json_from_response(text: str) -> Dict[str, Any]:
         except Exception:
             pass
     
+    PARSE_FAILURES.inc()
     raise ValueError(f"Could not parse JSON from response: {text[:200]}")
 
 
@@ -75,6 +167,10 @@ async def analyze_reviews_with_huggingface(reviews: List[str]) -> Dict[str, Any]
             "best_platform": None,
         }
 
+    if is_local_backend():
+        labels = await classify_local(reviews)
+        return summarize_sentiment(sentiment_from_labels(labels), reviews)
+
     config = get_hf_config()
     model = config["model"]
     api_base = config["api_base"]
@@ -105,91 +201,80 @@ async def analyze_reviews_with_huggingface(reviews: List[str]) -> Dict[str, Any]
         logger.warning("No Hugging Face API token found - requests may be rate limited")
 
     try:
-        async with httpx.AsyncClient(timeout=120) as client:
-            if is_custom_space:
-                # Custom Space API - expects {"reviews": [...]}
-                resp = await client.post(
-                    api_url,
-                    headers=headers,
-                    json={"reviews": reviews[:50]},
-                )
-            elif "instruct" in model.lower() or "chat" in model.lower():
-                # For chat models (like Llama), use chat endpoint format
-                resp = await client.post(
-                    api_url,
-                    headers=headers,
-                    json={
-                        "inputs": prompt,
-                        "parameters": {
-                            "max_new_tokens": 500,
-                            "temperature": 0.7,
-                            "return_full_text": False,
-                        },
-                    },
-                )
-            else:
-                # For other models, use standard format
-                resp = await client.post(
-                    api_url,
-                    headers=headers,
-                    json={"inputs": reviews_text},
-                )
-            
-            # Handle rate limiting (model loading)
-            if resp.status_code == 503:
-                logger.warning("Model is loading, waiting...")
-                import asyncio
-                await asyncio.sleep(10)
-                resp = await client.post(api_url, headers=headers, json={"inputs": reviews_text})
-            
-            resp.raise_for_status()
-            data = resp.json()
+        if is_custom_space:
+            # Custom Space API - expects {"reviews": [...]}
+            payload: Dict[str, Any] = {"reviews": reviews[:50]}
+        elif "instruct" in model.lower() or "chat" in model.lower():
+            # For chat models (like Llama), use chat endpoint format
+            payload = {
+                "inputs": prompt,
+                "parameters": {
+                    "max_new_tokens": 500,
+                    "temperature": 0.7,
+                    "return_full_text": False,
+                },
+            }
+        else:
+            # For other models, use standard format
+            payload = {"inputs": reviews_text}
+        resp = await post_inference(api_url, headers, payload)
+
+        # Model still loading: answer from keywords now rather than waiting on it
+        if resp.status_code == 503:
+            logger.warning("Model is loading, using fallback")
+            return calculate_sentiment_fallback(reviews)
+
+        resp.raise_for_status()
+        data = resp.json()
             
-            # Handle custom Space response (direct JSON with sentiment, pros, cons, score)
-            if is_custom_space:
-                logger.info(f"Custom Space response received: {data}")
-                # Custom Space should return the expected format directly
-                if isinstance(data, dict) and "sentiment" in data:
-                    return {
-                        "sentiment": data.get("sentiment", {"positive": 0, "neutral": 0, "negative": 0}),
-                        "pros": data.get("pros", []),
-                        "cons": data.get("cons", []),
-                        "score": data.get("score", 5.0),
-                        "best_platform": data.get("best_platform"),
-                    }
+        # Handle custom Space response (direct JSON with sentiment, pros, cons, score)
+        if is_custom_space:
+            logger.info(f"Custom Space response received: {data}")
+            # Custom Space should return the expected format directly
+            if isinstance(data, dict) and "sentiment" in data:
+                return {
+                    "sentiment": data.get("sentiment", {"positive": 0, "neutral": 0, "negative": 0}),
+                    "pros": data.get("pros", []),
+                    "cons": data.get("cons", []),
+                    "score": data.get("score", 5.0),
+                    "best_platform": data.get("best_platform"),
+                }
             
-            # Handle different response formats for Inference API
-            if isinstance(data, list) and len(data) > 0:
-                # Standard HF response: [{"generated_text": "..."}]
-                text = data[0].get("generated_text", "")
-            elif isinstance(data, dict):
-                text = data.get("generated_text", "") or data.get("text", "") or str(data)
-            else:
-                text = str(data)
+        # Handle different response formats for Inference API
+        if isinstance(data, list) and len(data) > 0:
+            # Standard HF response: [{"generated_text": "..."}]
+            text = data[0].get("generated_text", "")
+        elif isinstance(data, dict):
+            text = data.get("generated_text", "") or data.get("text", "") or str(data)
+        else:
+            text = str(data)
             
-            logger.info(f"Hugging Face response received: {text[:200]}...")
+        logger.info(f"Hugging Face response received: {text[:200]}...")
             
-            try:
-                parsed = extract_json_from_response(text)
-                logger.info("Successfully parsed JSON from Hugging Face response")
-                return parsed
-            except Exception as parse_err:
-                logger.warning(f"Failed to parse JSON from Hugging Face response: {parse_err}. Response: {text[:500]}")
-                return {
-                    "sentiment": {"positive": 33, "neutral": 34, "negative": 33},
-                    "pros": [],
-                    "cons": [],
-                    "score": 6.5,
-                    "best_platform": None,
-                    "raw": text[:500],
-                    "parse_error": str(parse_err),
-                }
+        try:
+            parsed = extract_json_from_response(text)
+            logger.info("Successfully parsed JSON from Hugging Face response")
+            return parsed
+        except Exception as parse_err:
+            logger.warning(f"Failed to parse JSON from Hugging Face response: {parse_err}. Response: {text[:500]}")
+            return {
+                "sentiment": {"positive": 33, "neutral": 34, "negative": 33},
+                "pros": [],
+                "cons": [],
+                "score": 6.5,
+                "best_platform": None,
+                "raw": text[:500],
+                "parse_error": str(parse_err),
+            }
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error from Hugging Face API: {e.response.status_code} - {e.response.text[:200]}")
         return calculate_sentiment_fallback(reviews)
     except httpx.TimeoutException:
         logger.error("Hugging Face request timed out. Using fallback.")
         return calculate_sentiment_fallback(reviews)
+    except CircuitOpenError:
+        logger.info("Inference circuit open. Using fallback.")
+        return calculate_sentiment_fallback(reviews)
     except Exception as e:
         logger.error(f"Error querying Hugging Face API: {e}. Using fallback.")
         return calculate_sentiment_fallback(reviews)
@@ -198,58 +283,60 @@ async def analyze_reviews_with_huggingface(reviews: List[str]) -> Dict[str, Any]
 analyze_reviews_with_ollama = analyze_reviews_with_huggingface
 
 
-def calculate_sentiment_fallback(reviews: List[str]) -> Dict[str, Any]:
-    """Calculate basic sentiment from review keywords when Hugging Face is unavailable."""
-    positive_keywords = ["good", "great", "excellent", "love", "amazing", "perfect", "best", "satisfied", "happy", "recommend", "fantastic", "superb", "awesome", "wonderful"]
-    negative_keywords = ["bad", "terrible", "worst", "hate", "disappointed", "poor", "awful", "broken", "defective", "return", "regret", "disappointing", "horrible"]
-    
-    # Extract pros and cons from reviews
-    pros_keywords = {
-        "quality": ["excellent quality", "build quality", "solid build", "durable", "well built", "premium"],
-        "performance": ["fast", "performance", "powerful", "smooth", "responsive", "quick"],
-        "value": ["value for money", "worth it", "affordable", "great price", "budget friendly"],
-        "features": ["features", "functionality", "versatile", "useful"],
-        "service": ["fast shipping", "delivery", "customer service", "support"],
-    }
-    
-    cons_keywords = {
-        "quality": ["poor quality", "cheap", "broke", "stopped working", "defective"],
-        "performance": ["slow", "laggy", "freezes", "doesn't work", "issues"],
-        "price": ["overpriced", "expensive", "not worth", "too costly"],
-        "features": ["missing features", "lack of", "no", "without"],
-        "service": ["poor service", "delayed", "shipping issues", "no support"],
-    }
-    
-    positive_count = sum(1 for review in reviews if any(kw in review.lower() for kw in positive_keywords))
-    negative_count = sum(1 for review in reviews if any(kw in review.lower() for kw in negative_keywords))
-    total = len(reviews)
-    neutral_count = total - positive_count - negative_count
-    
-    if total > 0:
-        pos_pct = int((positive_count / total) * 100)
-        neg_pct = int((negative_count / total) * 100)
-        neu_pct = 100 - pos_pct - neg_pct
-    else:
-        pos_pct = neg_pct = 33
-        neu_pct = 34
-    
-    # Extract actual pros and cons from reviews
+POSITIVE_KEYWORDS = ["good", "great", "excellent", "love", "amazing", "perfect", "best", "satisfied", "happy", "recommend", "fantastic", "superb", "awesome", "wonderful"]
+NEGATIVE_KEYWORDS = ["bad", "terrible", "worst", "hate", "disappointed", "poor", "awful", "broken", "defective", "return", "regret", "disappointing", "horrible"]
+
+# Keywords used to extract pros and cons from reviews
+PROS_KEYWORDS = {
+    "quality": ["excellent quality", "build quality", "solid build", "durable", "well built", "premium"],
+    "performance": ["fast", "performance", "powerful", "smooth", "responsive", "quick"],
+    "value": ["value for money", "worth it", "affordable", "great price", "budget friendly"],
+    "features": ["features", "functionality", "versatile", "useful"],
+    "service": ["fast shipping", "delivery", "customer service", "support"],
+}
+
+CONS_KEYWORDS = {
+    "quality": ["poor quality", "cheap", "broke", "stopped working", "defective"],
+    "performance": ["slow", "laggy", "freezes", "doesn't work", "issues"],
+    "price": ["overpriced", "expensive", "not worth", "too costly"],
+    "features": ["missing features", "lack of", "no", "without"],
+    "service": ["poor service", "delayed", "shipping issues", "no support"],
+}
+
+
+KEYWORD_MATCHER = KeywordMatcher({
+    "positive": POSITIVE_KEYWORDS,
+    "negative": NEGATIVE_KEYWORDS,
+    **{f"pro:{category}": keywords for category, keywords in PROS_KEYWORDS.items()},
+    **{f"con:{category}": keywords for category, keywords in CONS_KEYWORDS.items()},
+})
+
+
+def summarize_sentiment(
+    sentiment: Dict[str, int],
+    reviews: List[str],
+    review_hits: List[Set[str]] | None = None,
+) -> Dict[str, Any]:
+    """Build the analysis payload (pros, cons, score) around sentiment percentages.
+
+    ``review_hits`` are the keyword categories per review, if already computed.
+    """
+    pos_pct = sentiment["positive"]
+    neg_pct = sentiment["negative"]
+    if review_hits is None:
+        review_hits = [KEYWORD_MATCHER.categories(review) for review in reviews]
+
+    # Extract actual pros and cons from reviews, in order of first mention
     pros = []
     cons = []
     
-    for review in reviews:
-        review_lower = review.lower()
-        # Check for pros
-        for category, keywords in pros_keywords.items():
-            if any(kw in review_lower for kw in keywords):
-                if category.capitalize() not in pros:
-                    pros.append(category.capitalize())
-        
-        # Check for cons
-        for category, keywords in cons_keywords.items():
-            if any(kw in review_lower for kw in keywords):
-                if category.capitalize() not in cons:
-                    cons.append(category.capitalize())
+    for hits in review_hits:
+        for category in PROS_KEYWORDS:
+            if f"pro:{category}" in hits and category.capitalize() not in pros:
+                pros.append(category.capitalize())
+        for category in CONS_KEYWORDS:
+            if f"con:{category}" in hits and category.capitalize() not in cons:
+                cons.append(category.capitalize())
     
     # Fallback pros/cons if none found
     if not pros and pos_pct > neg_pct:
@@ -262,7 +349,7 @@ def calculate_sentiment_fallback(reviews: List[str]) -> Dict[str, Any]:
     score = max(1.0, min(10.0, score))
     
     return {
-        "sentiment": {"positive": pos_pct, "neutral": neu_pct, "negative": neg_pct},
+        "sentiment": sentiment,
         "pros": pros if pros else ["Positive aspects identified from reviews"],
         "cons": cons if cons else ["No major concerns identified"],
         "score": round(score, 1),
@@ -270,8 +357,39 @@ def calculate_sentiment_fallback(reviews: List[str]) -> Dict[str, Any]:
     }
 
 
+def calculate_sentiment_fallback(reviews: List[str]) -> Dict[str, Any]:
+    """Calculate basic sentiment from review keywords when Hugging Face is unavailable."""
+    FALLBACKS.inc(kind="keywords")
+    # One keyword pass per review feeds both the sentiment counts and pros/cons
+    review_hits = [KEYWORD_MATCHER.categories(review) for review in reviews]
+    positive_count = sum(1 for hits in review_hits if "positive" in hits)
+    negative_count = sum(1 for hits in review_hits if "negative" in hits)
+    total = len(reviews)
+    
+    if total > 0:
+        pos_pct = int((positive_count / total) * 100)
+        neg_pct = int((negative_count / total) * 100)
+        neu_pct = 100 - pos_pct - neg_pct
+    else:
+        pos_pct = neg_pct = 33
+        neu_pct = 34
+
+    return summarize_sentiment({"positive": pos_pct, "neutral": neu_pct, "negative": neg_pct}, reviews, review_hits)
+
+
+def sentiment_from_labels(labels: List[str]) -> Dict[str, int]:
+    """Sentiment percentages from per-review labels."""
+    total = len(labels)
+    if total == 0:
+        return {"positive": 0, "neutral": 100, "negative": 0}
+    pos_pct = int((labels.count("positive") / total) * 100)
+    neg_pct = int((labels.count("negative") / total) * 100)
+    return {"positive": pos_pct, "neutral": 100 - pos_pct - neg_pct, "negative": neg_pct}
+
+
 def calculate_rating_sentiment(avg_rating: float | None) -> Dict[str, int]:
     """Calculate sentiment percentages based on average rating."""
+    FALLBACKS.inc(kind="ratings")
     if avg_rating is None:
         return {"positive": 0, "neutral": 0, "negative": 0}
     if avg_rating >= 4.0:
@@ -282,6 +400,104 @@ def calculate_rating_sentiment(avg_rating: float | None) -> Dict[str, int]:
         return {"positive": 10, "neutral": 30, "negative": 60}
 
 
+def _rating_fallback_result(avg_rating: float | None, review_count: int) -> Dict[str, Any]:
+    """Platform result derived from star ratings when inference is unavailable."""
+    return {
+        "sentiment": calculate_rating_sentiment(avg_rating),
+        "average_rating": avg_rating or 0.0,
+        "review_count": review_count,
+        "overall_sentiment": "positive" if avg_rating and avg_rating >= 4.0 else ("negative" if avg_rating and avg_rating < 3.0 else "neutral"),
+    }
+
+
+async def _analyze_platform(
+    platform: str,
+    review_texts: List[str],
+    avg_rating: float | None,
+    api_url: str,
+    headers: Dict[str, str],
+    model: str,
+    is_custom_space: bool,
+) -> Dict[str, Any]:
+    """Run sentiment inference for a single platform, falling back to ratings on failure."""
+    # Get sentiment analysis from Hugging Face
+    prompt = PLATFORM_PROMPT_TEMPLATE.format(
+        platform=platform,
+        reviews="\n---\n".join(review_texts[:30])  # Limit to 30 reviews per platform
+    )
+
+    logger.info(f"Querying Hugging Face for {platform} platform with {len(review_texts)} reviews")
+
+    try:
+        if is_custom_space:
+            # Custom Space API
+            payload: Dict[str, Any] = {"reviews": review_texts[:30]}
+        elif "instruct" in model.lower() or "chat" in model.lower():
+            # For chat models
+            payload = {
+                "inputs": prompt,
+                "parameters": {
+                    "max_new_tokens": 300,
+                    "temperature": 0.7,
+                    "return_full_text": False,
+                },
+            }
+        else:
+            payload = {"inputs": "\n---\n".join(review_texts[:30])}
+        resp = await post_inference(api_url, headers, payload)
+
+        # Handle rate limiting
+        if resp.status_code == 503:
+            logger.warning(f"Model loading for {platform}, using fallback")
+            return _rating_fallback_result(avg_rating, len(review_texts))
+
+        resp.raise_for_status()
+        data = resp.json()
+
+        # Handle custom Space response
+        if is_custom_space and isinstance(data, dict) and "sentiment" in data:
+            logger.info(f"Successfully processed custom Space response for {platform}")
+            return {
+                "sentiment": data.get("sentiment", {"positive": 0, "neutral": 0, "negative": 0}),
+                "average_rating": avg_rating or 0.0,
+                "review_count": len(review_texts),
+                "overall_sentiment": "positive" if data.get("sentiment", {}).get("positive", 0) > 50 else ("negative" if data.get("sentiment", {}).get("negative", 0) > 50 else "neutral"),
+            }
+
+        # Handle different response formats for Inference API
+        if isinstance(data, list) and len(data) > 0:
+            text = data[0].get("generated_text", "")
+        elif isinstance(data, dict):
+            text = data.get("generated_text", "") or data.get("text", "") or str(data)
+        else:
+            text = str(data)
+
+        logger.info(f"Hugging Face response for {platform}: {text[:200]}...")
+
+        try:
+            parsed = extract_json_from_response(text)
+            logger.info(f"Successfully parsed Hugging Face response for {platform}")
+            return {
+                "sentiment": parsed.get("sentiment", {"positive": 0, "neutral": 0, "negative": 0}),
+                "average_rating": avg_rating or parsed.get("average_rating", 0.0),
+                "review_count": len(review_texts),
+                "overall_sentiment": parsed.get("overall_sentiment", "neutral"),
+            }
+        except Exception as parse_err:
+            logger.warning(f"Failed to parse JSON for {platform}: {parse_err}")
+            # Fallback: calculate sentiment from ratings if available
+            return _rating_fallback_result(avg_rating, len(review_texts))
+    except (httpx.HTTPStatusError, httpx.TimeoutException) as e:
+        logger.warning(f"Hugging Face unavailable for {platform}: {e}. Using rating-based fallback.")
+        return _rating_fallback_result(avg_rating, len(review_texts))
+    except CircuitOpenError:
+        logger.info(f"Inference circuit open for {platform}. Using rating-based fallback.")
+        return _rating_fallback_result(avg_rating, len(review_texts))
+    except Exception as e:
+        logger.error(f"Unexpected error querying Hugging Face for {platform}: {e}")
+        return _rating_fallback_result(avg_rating, len(review_texts))
+
+
 async def analyze_reviews_by_platform(reviews: List[Review]) -> Dict[str, Any]:
     """Analyze reviews grouped by platform to compare sentiment across platforms."""
     if not reviews:
@@ -290,6 +506,13 @@ async def analyze_reviews_by_platform(reviews: List[Review]) -> Dict[str, Any]:
             "comparison": {},
         }
 
+    if is_local_backend():
+        labels = await classify_local([r.content for r in reviews])
+        return analyze_labels_by_platform(
+            {"platform": r.platform, "rating": r.rating, "sentiment_label": label}
+            for r, label in zip(reviews, labels)
+        )
+
     # Group reviews by platform
     platform_reviews: Dict[str, List[str]] = defaultdict(list)
     platform_ratings: Dict[str, List[float]] = defaultdict(list)
@@ -299,146 +522,39 @@ async def analyze_reviews_by_platform(reviews: List[Review]) -> Dict[str, Any]:
         if review.rating:
             platform_ratings[review.platform].append(review.rating)
 
-    # Analyze each platform
-    platform_results: Dict[str, Dict[str, Any]] = {}
-    config = get_hf_config()
-    model = config["model"]
-    api_base = config["api_base"]
-    
-    # Check if this is a custom Hugging Face Space
-    is_custom_space = ".hf.space" in api_base or "hf.space" in api_base
-    
-    if is_custom_space:
-        api_url = f"{api_base}/analyze" if not api_base.endswith("/analyze") else api_base
-    else:
-        api_url = f"{api_base}/{model}" if model else api_base
-    
-    headers = {
-        "Content-Type": "application/json",
-    }
-    token = config["api_token"]
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-
-    for platform, review_texts in platform_reviews.items():
-        # Calculate average rating if available
-        avg_rating = None
-        if platform_ratings[platform]:
-            avg_rating = sum(platform_ratings[platform]) / len(platform_ratings[platform])
+    target = get_inference_target()
 
-        # Get sentiment analysis from Hugging Face
-        prompt = PLATFORM_PROMPT_TEMPLATE.format(
-            platform=platform,
-            reviews="\n---\n".join(review_texts[:30])  # Limit to 30 reviews per platform
+    # Analyze every platform concurrently (bounded by the inference semaphore)
+    platforms = list(platform_reviews)
+    results = await asyncio.gather(
+        *(
+            timed(
+                _analyze_platform(
+                    platform,
+                    platform_reviews[platform],
+                    sum(platform_ratings[platform]) / len(platform_ratings[platform]) if platform_ratings[platform] else None,
+                    target["api_url"],
+                    target["headers"],
+                    target["model"],
+                    target["is_custom_space"],
+                ),
+                "platform_inference",
+                platform,
+            )
+            for platform in platforms
         )
+    )
+    platform_results: Dict[str, Dict[str, Any]] = dict(zip(platforms, results))
+
+    return {
+        "platforms": list(platform_results.keys()),
+        "comparison": platform_results,
+        "best_platform": pick_best_platform(platform_results),
+    }
 
-        logger.info(f"Querying Hugging Face for {platform} platform with {len(review_texts)} reviews")
-        
-        try:
-            async with httpx.AsyncClient(timeout=120) as client:
-                if is_custom_space:
-                    # Custom Space API
-                    resp = await client.post(
-                        api_url,
-                        headers=headers,
-                        json={"reviews": review_texts[:30]},
-                    )
-                elif "instruct" in model.lower() or "chat" in model.lower():
-                    # For chat models
-                    resp = await client.post(
-                        api_url,
-                        headers=headers,
-                        json={
-                            "inputs": prompt,
-                            "parameters": {
-                                "max_new_tokens": 300,
-                                "temperature": 0.7,
-                                "return_full_text": False,
-                            },
-                        },
-                    )
-                else:
-                    resp = await client.post(
-                        api_url,
-                        headers=headers,
-                        json={"inputs": "\n---\n".join(review_texts[:30])},
-                    )
-                
-                # Handle rate limiting
-                if resp.status_code == 503:
-                    logger.warning(f"Model loading for {platform}, using fallback")
-                    sentiment = calculate_rating_sentiment(avg_rating)
-                    platform_results[platform] = {
-                        "sentiment": sentiment,
-                        "average_rating": avg_rating or 0.0,
-                        "review_count": len(review_texts),
-                        "overall_sentiment": "positive" if avg_rating and avg_rating >= 4.0 else ("negative" if avg_rating and avg_rating < 3.0 else "neutral"),
-                    }
-                    continue
-                
-                resp.raise_for_status()
-                data = resp.json()
-                
-                # Handle custom Space response
-                if is_custom_space and isinstance(data, dict) and "sentiment" in data:
-                    platform_results[platform] = {
-                        "sentiment": data.get("sentiment", {"positive": 0, "neutral": 0, "negative": 0}),
-                        "average_rating": avg_rating or 0.0,
-                        "review_count": len(review_texts),
-                        "overall_sentiment": "positive" if data.get("sentiment", {}).get("positive", 0) > 50 else ("negative" if data.get("sentiment", {}).get("negative", 0) > 50 else "neutral"),
-                    }
-                    logger.info(f"Successfully processed custom Space response for {platform}")
-                    continue
-                
-                # Handle different response formats for Inference API
-                if isinstance(data, list) and len(data) > 0:
-                    text = data[0].get("generated_text", "")
-                elif isinstance(data, dict):
-                    text = data.get("generated_text", "") or data.get("text", "") or str(data)
-                else:
-                    text = str(data)
-                
-                logger.info(f"Hugging Face response for {platform}: {text[:200]}...")
-                
-                try:
-                    parsed = extract_json_from_response(text)
-                    platform_results[platform] = {
-                        "sentiment": parsed.get("sentiment", {"positive": 0, "neutral": 0, "negative": 0}),
-                        "average_rating": avg_rating or parsed.get("average_rating", 0.0),
-                        "review_count": len(review_texts),
-                        "overall_sentiment": parsed.get("overall_sentiment", "neutral"),
-                    }
-                    logger.info(f"Successfully parsed Hugging Face response for {platform}")
-                except Exception as parse_err:
-                    logger.warning(f"Failed to parse JSON for {platform}: {parse_err}")
-                    # Fallback: calculate sentiment from ratings if available
-                    sentiment = calculate_rating_sentiment(avg_rating)
-                    platform_results[platform] = {
-                        "sentiment": sentiment,
-                        "average_rating": avg_rating or 0.0,
-                        "review_count": len(review_texts),
-                        "overall_sentiment": "positive" if avg_rating and avg_rating >= 4.0 else ("negative" if avg_rating and avg_rating < 3.0 else "neutral"),
-                    }
-        except (httpx.HTTPStatusError, httpx.TimeoutException) as e:
-            logger.warning(f"Hugging Face unavailable for {platform}: {e}. Using rating-based fallback.")
-            sentiment = calculate_rating_sentiment(avg_rating)
-            platform_results[platform] = {
-                "sentiment": sentiment,
-                "average_rating": avg_rating or 0.0,
-                "review_count": len(review_texts),
-                "overall_sentiment": "positive" if avg_rating and avg_rating >= 4.0 else ("negative" if avg_rating and avg_rating < 3.0 else "neutral"),
-            }
-        except Exception as e:
-            logger.error(f"Unexpected error querying Hugging Face for {platform}: {e}")
-            sentiment = calculate_rating_sentiment(avg_rating)
-            platform_results[platform] = {
-                "sentiment": sentiment,
-                "average_rating": avg_rating or 0.0,
-                "review_count": len(review_texts),
-                "overall_sentiment": "positive" if avg_rating and avg_rating >= 4.0 else ("negative" if avg_rating and avg_rating < 3.0 else "neutral"),
-            }
 
-    # Determine best platform based on sentiment and ratings
+def pick_best_platform(platform_results: Dict[str, Dict[str, Any]]) -> str | None:
+    """Determine best platform based on sentiment and ratings."""
     best_platform = None
     best_score = -1
     for platform, data in platform_results.items():
@@ -446,11 +562,118 @@ async def analyze_reviews_by_platform(reviews: List[Review]) -> Dict[str, Any]:
         if score > best_score:
             best_score = score
             best_platform = platform
+    return best_platform
+
+
+def analyze_labels_by_platform(entries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Platform comparison built from per-review labels instead of per-platform inference.
+
+    ``entries`` carry ``platform``, ``rating`` and ``sentiment_label``; the result
+    has the same schema as ``analyze_reviews_by_platform``.
+    """
+    platform_labels: Dict[str, List[str]] = defaultdict(list)
+    platform_ratings: Dict[str, List[float]] = defaultdict(list)
+    for entry in entries:
+        platform_labels[entry["platform"]].append(entry["sentiment_label"])
+        if entry.get("rating"):
+            platform_ratings[entry["platform"]].append(entry["rating"])
+
+    platform_results: Dict[str, Dict[str, Any]] = {}
+    for platform, labels in platform_labels.items():
+        ratings = platform_ratings[platform]
+        avg_rating = sum(ratings) / len(ratings) if ratings else None
+        sentiment = sentiment_from_labels(labels)
+        platform_results[platform] = {
+            "sentiment": sentiment,
+            "average_rating": avg_rating or 0.0,
+            "review_count": len(labels),
+            "overall_sentiment": "positive" if sentiment["positive"] > 50 else ("negative" if sentiment["negative"] > 50 else "neutral"),
+        }
 
     return {
         "platforms": list(platform_results.keys()),
         "comparison": platform_results,
-        "best_platform": best_platform,
+        "best_platform": pick_best_platform(platform_results),
     }
 
 
+LABEL_ALIASES = {
+    "positive": "positive", "pos": "positive", "label_2": "positive",
+    "neutral": "neutral", "neu": "neutral", "label_1": "neutral",
+    "negative": "negative", "neg": "negative", "label_0": "negative",
+}
+
+
+def normalize_label(label: Any) -> str | None:
+    if not isinstance(label, str):
+        return None
+    return LABEL_ALIASES.get(label.strip().lower())
+
+
+def _extract_labels(data: Any, is_custom_space: bool, expected: int) -> List[str | None]:
+    """Pull one label per input out of a Space or text-classification response."""
+    if is_custom_space:
+        raw = data.get("labels") if isinstance(data, dict) else None
+    elif isinstance(data, list):
+        # Text-classification API: one list of {label, score} candidates per input
+        raw = []
+        for item in data:
+            if isinstance(item, list) and item and all(isinstance(c, dict) for c in item):
+                raw.append(max(item, key=lambda c: c.get("score", 0)).get("label"))
+            elif isinstance(item, dict):
+                raw.append(item.get("label"))
+            else:
+                raw.append(None)
+    else:
+        raw = None
+    if not raw or len(raw) != expected:
+        return [None] * expected
+    return [normalize_label(label) for label in raw]
+
+
+async def _classify_batch(texts: List[str], target: Dict[str, Any]) -> List[str | None]:
+    payload = {"reviews": texts} if target["is_custom_space"] else {"inputs": texts}
+    try:
+        resp = await post_inference(target["api_url"], target["headers"], payload)
+        resp.raise_for_status()
+        return _extract_labels(resp.json(), target["is_custom_space"], len(texts))
+    except Exception as e:
+        logger.warning(f"Per-review classification failed for {len(texts)} reviews: {e}")
+        return [None] * len(texts)
+
+
+_classification_batcher: InferenceBatcher | None = None
+
+
+def get_classification_batcher() -> InferenceBatcher:
+    """Batcher shared by all concurrent ``classify_reviews`` calls, so small
+    per-product requests are merged into full INFERENCE_BATCH_SIZE requests."""
+    global _classification_batcher  # noqa: PLW0603
+    if _classification_batcher is None:
+        _classification_batcher = InferenceBatcher(
+            lambda texts: _classify_batch(texts, get_inference_target()),
+            batch_size=int(os.getenv("INFERENCE_BATCH_SIZE", "32")),
+            max_wait=float(os.getenv("INFERENCE_BATCH_WAIT_MS", "10")) / 1000,
+        )
+    return _classification_batcher
+
+
+async def classify_reviews(reviews: List[str]) -> List[str | None]:
+    """Label each review positive/neutral/negative, in order.
+
+    Reviews from concurrent calls are packed into shared INFERENCE_BATCH_SIZE
+    requests (waiting at most INFERENCE_BATCH_WAIT_MS to fill one), which run
+    concurrently under the inference semaphore. ``None`` marks reviews the
+    backend could not label (errors, or generative models that don't return
+    per-input labels).
+    """
+    if not reviews:
+        return []
+    if is_local_backend():
+        return await classify_local(reviews)
+    target = get_inference_target()
+    model = target["model"].lower()
+    if not target["is_custom_space"] and ("instruct" in model or "chat" in model):
+        return [None] * len(reviews)
+
+    return await get_classification_batcher().submit(reviews)
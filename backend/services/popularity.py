@@ -0,0 +1,83 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+from services.cache import platform_key
+
+
+def get_popularity_config():
+    """Get request popularity tracking configuration, reading env vars at runtime."""
+    return {
+        "half_life": float(os.getenv("PREWARM_HALF_LIFE", "3600")),
+        "max_tracked": int(os.getenv("PREWARM_MAX_TRACKED", "10000")),
+    }
+
+
+@dataclass
+class PopularityEntry:
+    product: str  # query as first requested, used to re-run the analysis
+    platforms: Optional[List[str]]
+    score: float
+    updated_at: float
+
+    @property
+    def normalized(self) -> str:
+        return self.product.strip().lower()
+
+
+class PopularityTracker:
+    """Exponentially decayed request counts per product and platform set.
+
+    Each request adds 1 to its product's score, and scores halve every
+    ``half_life`` seconds, so the ranking follows current demand. At most
+    ``max_tracked`` products are kept; the coldest are dropped first.
+    """
+
+    def __init__(self, half_life: float, max_tracked: int):
+        self.half_life = half_life
+        self.max_tracked = max_tracked
+        self._entries: Dict[Tuple[str, str], PopularityEntry] = {}
+
+    def _decayed(self, entry: PopularityEntry, now: float) -> float:
+        if self.half_life <= 0:
+            return entry.score
+        return entry.score * 0.5 ** ((now - entry.updated_at) / self.half_life)
+
+    def record(self, product_query: str, platforms: Optional[Sequence[str]] = None) -> None:
+        now = time.monotonic()
+        key = (product_query.strip().lower(), platform_key(platforms))
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = PopularityEntry(product_query, list(platforms) if platforms else None, 0.0, now)
+        entry.score = self._decayed(entry, now) + 1
+        entry.updated_at = now
+        # Pruning sorts every entry, so let the table overshoot before trimming it
+        if len(self._entries) > self.max_tracked * 2:
+            for key, _ in self._ranked(now)[self.max_tracked:]:
+                del self._entries[key]
+
+    def score(self, product_query: str, platforms: Optional[Sequence[str]] = None) -> float:
+        entry = self._entries.get((product_query.strip().lower(), platform_key(platforms)))
+        return self._decayed(entry, time.monotonic()) if entry is not None else 0.0
+
+    def _ranked(self, now: float) -> List[Tuple[Tuple[str, str], float]]:
+        scores = [(key, self._decayed(entry, now)) for key, entry in self._entries.items()]
+        return sorted(scores, key=lambda item: item[1], reverse=True)
+
+    def top(self, k: int, min_score: float = 0.0) -> List[Tuple[PopularityEntry, float]]:
+        """The ``k`` hottest products with a current score of at least ``min_score``."""
+        now = time.monotonic()
+        return [(self._entries[key], score) for key, score in self._ranked(now)[:k] if score >= min_score]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_tracker: Optional[PopularityTracker] = None
+
+
+def get_popularity_tracker() -> PopularityTracker:
+    global _tracker  # noqa: PLW0603
+    if _tracker is None:
+        _tracker = PopularityTracker(**get_popularity_config())
+    return _tracker
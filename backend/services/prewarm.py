@@ -0,0 +1,120 @@
+import os
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+from services.analysis_service import analysis_flight, refresh_analysis
+from services.cache import get_result_cache, platform_key
+from services.popularity import PopularityEntry, get_popularity_tracker
+
+logger = logging.getLogger(__name__)
+
+
+def get_prewarm_config():
+    """Get pre-warming configuration, reading env vars at runtime."""
+    return {
+        "enabled": os.getenv("PREWARM_ENABLED", "true").lower() in ("1", "true", "yes"),
+        "interval": float(os.getenv("PREWARM_INTERVAL", "60")),
+        "top_k": int(os.getenv("PREWARM_TOP_K", "20")),
+        "min_score": float(os.getenv("PREWARM_MIN_SCORE", "3")),
+        # Budget: pre-warm refreshes running at once, on top of user traffic
+        "concurrency": int(os.getenv("PREWARM_CONCURRENCY", "2")),
+        # Refresh once an entry has used this fraction of RESULT_CACHE_TTL
+        "refresh_at": float(os.getenv("PREWARM_REFRESH_AT", "0.8")),
+    }
+
+
+class Prewarmer:
+    """Keeps the result cache warm for the most requested products.
+
+    Every ``interval`` seconds the ``top_k`` products of the popularity tracker
+    whose cached analysis is missing or older than ``refresh_at`` of the cache
+    TTL are recomputed in the background, hottest first, with at most
+    ``concurrency`` refreshes running. Hot products are then served fresh from
+    the cache instead of the first request after expiry paying for a full
+    scrape and inference.
+    """
+
+    def __init__(self, enabled: bool, interval: float, top_k: int, min_score: float, concurrency: int, refresh_at: float):
+        self.enabled = enabled
+        self.interval = interval
+        self.top_k = top_k
+        self.min_score = min_score
+        self.concurrency = concurrency
+        self.refresh_at = refresh_at
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._running: Dict[Tuple[str, str], "asyncio.Task[None]"] = {}
+        self.stats = {"ticks": 0, "refreshed": 0, "failed": 0, "skipped_fresh": 0}
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [t for t in [self._task, *self._running.values()] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._running = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self.stats | {
+            "enabled": self.enabled,
+            "running": len(self._running),
+            "tracked": len(get_popularity_tracker()),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.warning(f"Pre-warm pass failed: {e}")
+
+    async def tick(self) -> int:
+        """Start refreshes for hot products that are about to go stale; returns how many."""
+        self.stats["ticks"] += 1
+        cache = get_result_cache()
+        started = 0
+        for entry, _ in get_popularity_tracker().top(self.top_k, self.min_score):
+            if len(self._running) >= self.concurrency:
+                break
+            key = (entry.normalized, platform_key(entry.platforms))
+            if key in self._running or analysis_flight.in_flight(key + (True,)):
+                continue
+            age = await cache.age(entry.normalized, entry.platforms)
+            if age is not None and age < cache.ttl * self.refresh_at:
+                self.stats["skipped_fresh"] += 1
+                continue
+            task = asyncio.create_task(self._refresh(entry))
+            self._running[key] = task
+            task.add_done_callback(lambda _, key=key: self._running.pop(key, None))
+            started += 1
+        return started
+
+    async def _refresh(self, entry: PopularityEntry) -> None:
+        try:
+            await refresh_analysis(entry.product, entry.platforms)
+            self.stats["refreshed"] += 1
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.warning(f"Pre-warming '{entry.normalized}' failed: {e}")
+
+
+_prewarmer: Optional[Prewarmer] = None
+
+
+def get_prewarmer() -> Prewarmer:
+    global _prewarmer  # noqa: PLW0603
+    if _prewarmer is None:
+        _prewarmer = Prewarmer(**get_prewarm_config())
+    return _prewarmer
+
+
+async def start_prewarmer() -> None:
+    get_prewarmer().start()
+
+
+async def stop_prewarmer() -> None:
+    await get_prewarmer().stop()
@@ -0,0 +1,75 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one in-flight computation.
+
+    The first caller for a key starts the work as a task; callers that arrive
+    while it is running await the same task and get the same result (or
+    exception). A caller being cancelled does not cancel the shared work.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+        """The running task for ``key``, starting ``fn()`` if there is none."""
+        self.stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["executions"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+        return task
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        return await asyncio.shield(self.start(key, fn))
+
+
+class StageBroadcast:
+    """Fans the events of one in-flight computation out to any number of readers.
+
+    Readers that subscribe late first get every event published so far, then
+    the live ones, until the computation closes the broadcast.
+    """
+
+    def __init__(self) -> None:
+        self._events: List[Any] = []
+        self._closed = False
+        self._changed: Optional["asyncio.Future[None]"] = None
+
+    def publish(self, event: Any) -> None:
+        self._events.append(event)
+        self._wake()
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._changed is not None and not self._changed.done():
+            self._changed.set_result(None)
+        self._changed = None
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            while index < len(self._events):
+                yield self._events[index]
+                index += 1
+            if self._closed:
+                return
+            if self._changed is None:
+                self._changed = asyncio.get_running_loop().create_future()
+            # Shielded: one reader going away must not cancel the others' wait
+            await asyncio.shield(self._changed)
@@ -0,0 +1,10 @@
+import os
+import pytest
+
+# Keep the suite offline: sentiment runs in-process unless a test points it elsewhere
+os.environ.setdefault("HF_API_BASE", "local")
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
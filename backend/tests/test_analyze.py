@@ -0,0 +1,77 @@
+import json
+from fastapi.testclient import TestClient
+from app import app
+
+
+client = TestClient(app)
+
+
+def test_analyze_rejects_unknown_platform():
+    resp = client.get("/analyze", params={"product": "phone", "platforms": "ebay"})
+    assert resp.status_code == 400
+
+
+def test_analyze_serves_repeat_requests_from_cache():
+    first = client.get("/analyze", params={"product": "cache probe", "platforms": "amazon"})
+    second = client.get("/analyze", params={"product": "Cache Probe ", "platforms": "amazon"})
+    bypass = client.get("/analyze", params={"product": "cache probe", "platforms": "amazon", "cache": "bypass"})
+
+    assert first.json()["cache"]["status"] == "miss"
+    assert second.json()["cache"]["status"] == "hit"
+    assert second.json()["product"] == first.json()["product"]
+    assert bypass.json()["cache"]["status"] == "bypass"
+
+
+def _read_events(resp) -> list:  # type: ignore[no-untyped-def]
+    events = []
+    for block in resp.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_analyze_stream_emits_stages_in_order():
+    resp = client.get("/analyze/stream", params={"product": "stream probe", "cache": "bypass"})
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _read_events(resp)
+    names = [name for name, _ in events]
+
+    assert sorted(names[:2]) == ["prices", "prices"]
+    assert {data["source"] for _, data in events[:2]} == {"amazon", "flipkart"}
+    assert names[2:] == ["reviews", "platforms", "analysis", "done"]
+    done = events[-1][1]
+    assert done["cache"]["status"] == "bypass"
+    assert done["analysis"] == events[4][1]
+
+
+def test_analyze_stream_replays_cached_result():
+    client.get("/analyze", params={"product": "stream cache probe", "platforms": "amazon"})
+    events = _read_events(client.get("/analyze/stream", params={"product": "stream cache probe", "platforms": "amazon"}))
+
+    assert [name for name, _ in events] == ["prices", "reviews", "platforms", "analysis", "done"]
+    assert events[0][1]["prices"] and events[0][1]["platform"] == "Amazon"
+    assert events[-1][1]["cache"]["status"] == "hit"
+
+
+def test_analyze_stream_rejects_unknown_platform():
+    resp = client.get("/analyze/stream", params={"product": "phone", "platforms": "ebay"})
+    assert resp.status_code == 400
+
+
+def test_analyze_batch_streams_one_line_per_product():
+    resp = client.post(
+        "/analyze/batch",
+        json={"products": ["batch probe a", "Batch Probe A", "batch probe b"], "platforms": ["amazon"], "cache": "bypass"},
+    )
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+
+    assert sorted(line["product"] for line in lines) == ["Batch Probe A", "batch probe a", "batch probe b"]
+    assert all(line["status"] == "ok" for line in lines)
+    by_product = {line["product"]: line["result"] for line in lines}
+    assert by_product["batch probe a"] == by_product["Batch Probe A"]
+
+
+def test_analyze_batch_validates_request():
+    assert client.post("/analyze/batch", json={"products": []}).status_code == 422
+    assert client.post("/analyze/batch", json={"products": ["phone"], "platforms": ["ebay"]}).status_code == 400
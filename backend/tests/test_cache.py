@@ -0,0 +1,40 @@
+import pytest
+
+from services.cache import FRESH, STALE, ResultCache
+
+
+@pytest.mark.anyio
+async def test_entries_go_stale_then_expire(monkeypatch):
+    cache = ResultCache(max_entries=10, ttl=10, stale_ttl=20)
+    now = [1000.0]
+    monkeypatch.setattr("services.cache.time.time", lambda: now[0])
+
+    await cache.set("phone", None, {"score": 7})
+    assert (await cache.get("phone"))[:2] == ({"score": 7}, FRESH)
+
+    now[0] += 15
+    assert (await cache.get("phone"))[:2] == ({"score": 7}, STALE)
+
+    now[0] += 30
+    assert (await cache.get("phone"))[:2] == (None, None)
+
+
+@pytest.mark.anyio
+async def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2, ttl=60, stale_ttl=0)
+    await cache.set("a", None, {"n": 1})
+    await cache.set("b", None, {"n": 2})
+    await cache.get("a")
+    await cache.set("c", None, {"n": 3})
+
+    assert (await cache.get("b"))[0] is None
+    assert (await cache.get("a"))[0] == {"n": 1}
+    assert (await cache.get("c", ["amazon"]))[0] is None
+
+
+@pytest.mark.anyio
+async def test_lookups_without_mongodb_do_not_warn(caplog):
+    cache = ResultCache(max_entries=2, ttl=60, stale_ttl=0)
+    with caplog.at_level("WARNING"):
+        assert (await cache.get("phone"))[0] is None
+    assert not caplog.records
@@ -0,0 +1,39 @@
+from services.circuit_breaker import CircuitBreaker
+
+
+def _breaker(**overrides) -> CircuitBreaker:  # type: ignore[no-untyped-def]
+    config = dict(
+        failure_threshold=3, reset_timeout=10, half_open_probes=1, latency_window=50,
+        min_samples=5, percentile=0.99, timeout_multiplier=2, min_timeout=0.5, max_timeout=120,
+    )
+    return CircuitBreaker(**(config | overrides))
+
+
+def test_half_open_allows_one_probe_and_failure_reopens(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("services.circuit_breaker.time.monotonic", lambda: now[0])
+    breaker = _breaker()
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+
+    now[0] = 11
+    assert breaker.allow_request()
+    assert breaker.state == "half_open"
+    assert not breaker.allow_request()  # only one probe in flight
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.snapshot()["opened"] == 2
+
+
+def test_timeout_tracks_latency_percentile():
+    breaker = _breaker()
+    assert breaker.timeout() == 120  # not enough samples yet
+    for latency in (0.1, 0.2, 0.2, 0.3, 1.5):
+        breaker.record_success(latency)
+    assert breaker.timeout() == 3.0
+    for _ in range(50):
+        breaker.record_success(0.01)
+    assert breaker.timeout() == 0.5  # clamped to min_timeout
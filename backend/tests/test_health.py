@@ -11,3 +11,9 @@ def test_health():
     assert resp.json()["status"] == "ok"
 
 
+def test_health_reports_db_and_write_queue():
+    body = client.get("/health").json()
+    assert body["db"]["status"] in ("ok", "unavailable", "error")
+    assert "pending" in body["write_queue"]
+    assert body["inference"]["state"] in ("closed", "open", "half_open")
+    assert "running" in body["prewarm"]
@@ -0,0 +1,16 @@
+import pytest
+
+from services import http_client
+
+
+@pytest.mark.anyio
+async def test_client_is_shared_until_closed(monkeypatch):
+    monkeypatch.setenv("HTTP_MAX_CONNECTIONS", "7")
+    await http_client.close_http_client()
+    await http_client.init_http_client()
+    client = http_client.get_http_client()
+    assert http_client.get_http_client() is client
+    assert client._transport._pool._max_connections == 7
+
+    await http_client.close_http_client()
+    assert client.is_closed
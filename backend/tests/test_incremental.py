@@ -0,0 +1,126 @@
+import pytest
+
+from db import mongo
+from db.mongo import review_hash
+from models.product import Review
+from services import analysis_service, incremental
+
+
+@pytest.fixture
+def reviews():
+    return [
+        Review(platform="Amazon", rating=5.0, content="Love it"),
+        Review(platform="Amazon", rating=1.0, content="Broke in a week"),
+        Review(platform="Flipkart", rating=4.0, content="Good value"),
+    ]
+
+
+@pytest.mark.anyio
+async def test_only_unseen_reviews_are_classified(monkeypatch, reviews):
+    known = reviews[0]
+    stored = {
+        review_hash(known.model_dump()): {"platform": "Amazon", "rating": 5.0, "sentiment_label": "positive"},
+        "old-review": {"platform": "Flipkart", "rating": 2.0, "sentiment_label": "negative"},
+    }
+    sent: list = []
+
+    async def fake_load(normalized, platforms):  # type: ignore[no-untyped-def]
+        return stored
+
+    async def fake_classify(texts):  # type: ignore[no-untyped-def]
+        sent.extend(texts)
+        return ["negative" if "Broke" in t else "positive" for t in texts]
+
+    monkeypatch.setattr(incremental, "load_review_labels", fake_load)
+    monkeypatch.setattr(incremental, "classify_reviews", fake_classify)
+
+    result = await incremental.analyze_incrementally("phone", reviews, ["Amazon", "Flipkart"])
+
+    assert sent == ["Broke in a week", "Good value"]
+    assert result["stats"] == {"stored": 2, "classified": 2, "unlabeled": 0}
+    assert result["overall"]["sentiment"] == {"positive": 50, "neutral": 0, "negative": 50}
+    assert result["platform"]["comparison"]["Flipkart"]["review_count"] == 2
+    assert set(result["labels"].values()) == {"positive", "negative"}
+
+
+class _FakeLabels:
+    """The stored-label query of ``load_review_labels`` against a list of documents."""
+
+    def __init__(self, docs):  # type: ignore[no-untyped-def]
+        self.docs = docs
+        self.limit_to = None
+
+    def find(self, query, projection):  # type: ignore[no-untyped-def]
+        self.docs = [d for d in self.docs if d["platform"] in query["platform"]["$in"]]
+        return self
+
+    def sort(self, key, direction):  # type: ignore[no-untyped-def]
+        return self
+
+    def limit(self, count):  # type: ignore[no-untyped-def]
+        self.limit_to = count
+        return self
+
+    async def __aiter__(self):  # type: ignore[no-untyped-def]
+        for doc in self.docs[:self.limit_to]:
+            yield doc
+
+
+@pytest.mark.anyio
+async def test_labels_of_platforms_not_requested_are_ignored(monkeypatch, reviews):
+    amazon = [r for r in reviews if r.platform == "Amazon"]
+    fake = _FakeLabels([
+        {"review_hash": f"flipkart-{i}", "platform": "Flipkart", "rating": 1.0, "sentiment_label": "negative"}
+        for i in range(4)
+    ] + [{"review_hash": review_hash(amazon[0].model_dump()), "platform": "Amazon", "rating": 5.0, "sentiment_label": "positive"}])
+
+    async def fake_classify(texts):  # type: ignore[no-untyped-def]
+        return ["negative" for _ in texts]
+
+    monkeypatch.setattr(mongo, "db", object())
+    monkeypatch.setattr(mongo, "get_collection", lambda name: fake)
+    monkeypatch.setattr(incremental, "classify_reviews", fake_classify)
+
+    result = await incremental.analyze_incrementally("phone", amazon, ["Amazon"])
+
+    assert fake.limit_to == mongo.STORED_REVIEWS_LIMIT
+    assert result["stats"] == {"stored": 1, "classified": 1, "unlabeled": 0}
+    assert list(result["platform"]["comparison"]) == ["Amazon"]
+    assert result["overall"]["sentiment"] == {"positive": 50, "neutral": 0, "negative": 50}
+
+
+@pytest.mark.anyio
+async def test_returns_none_when_backend_cannot_label(monkeypatch, reviews):
+    async def fake_load(normalized, platforms):  # type: ignore[no-untyped-def]
+        return {}
+
+    async def fake_classify(texts):  # type: ignore[no-untyped-def]
+        return [None] * len(texts)
+
+    monkeypatch.setattr(incremental, "load_review_labels", fake_load)
+    monkeypatch.setattr(incremental, "classify_reviews", fake_classify)
+
+    assert await incremental.analyze_incrementally("phone", reviews, ["Amazon", "Flipkart"]) is None
+
+
+@pytest.mark.anyio
+async def test_incremental_crawls_are_completed_with_stored_reviews(monkeypatch, reviews):
+    new, known = reviews[0], reviews[1]
+
+    async def fake_scrape(scrapers, query):  # type: ignore[no-untyped-def]
+        for name in scrapers:
+            yield name, {
+                "prices": [], "reviews": [new] if name == "amazon" else [], "status": "ok", "latency_ms": 1.0,
+                "error": None, "crawl": {"mode": "incremental", "new_reviews": 1}, "cursor": None,
+            }
+
+    async def fake_stored(normalized, platforms):  # type: ignore[no-untyped-def]
+        assert sorted(platforms) == ["Amazon", "Flipkart"]
+        return [r.model_dump() | {"review_hash": review_hash(r.model_dump())} for r in (known, new)]
+
+    monkeypatch.setattr(analysis_service, "scrape_as_completed", fake_scrape)
+    monkeypatch.setattr(analysis_service, "load_stored_reviews", fake_stored)
+    result = [payload async for stage, payload in analysis_service.analysis_stages("phone") if stage == "result"][0]
+
+    assert [r["content"] for r in result["product"]["reviews"]] == ["Love it", "Broke in a week"]
+    assert result["analysis"]["sentiment"]["negative"] > 0
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from db import jobs as job_db
+from services import jobs
+
+
+@pytest.fixture
+def memory_jobs(monkeypatch):
+    monkeypatch.setattr(job_db, "_memory_store", job_db.MemoryJobStore())
+    monkeypatch.setattr(jobs, "_worker_pool", None)
+
+
+def test_jobs_are_deduplicated_per_product(memory_jobs):
+    client = TestClient(app)
+    first = client.post("/jobs", json={"product": "Job Probe"})
+    second = client.post("/jobs", json={"product": "job probe ", "priority": 5})
+
+    assert first.status_code == 202
+    assert first.json()["status"] == "queued" and not first.json()["deduplicated"]
+    assert second.json()["id"] == first.json()["id"] and second.json()["deduplicated"]
+    assert client.get(f"/jobs/{first.json()['id']}").json()["priority"] == 5
+    assert client.get("/jobs/unknown").status_code == 404
+    assert client.post("/jobs", json={"product": "phone", "platforms": ["ebay"]}).status_code == 400
+
+
+@pytest.mark.anyio
+async def test_workers_run_jobs_by_priority_and_results_expire(memory_jobs, monkeypatch):
+    monkeypatch.setenv("JOB_WORKERS", "1")
+    monkeypatch.setenv("JOB_RESULT_TTL", "0.2")
+    order: list = []
+
+    async def fake_analysis(product, platforms=None):  # type: ignore[no-untyped-def]
+        order.append(product)
+        return {"product": {"name": product}}
+
+    monkeypatch.setattr(jobs, "get_product_analysis", fake_analysis)
+    low = await jobs.submit_job("low priority", priority=-1)
+    high = await jobs.submit_job("high priority", priority=3)
+
+    pool = jobs.get_worker_pool()
+    pool.start()
+    try:
+        for _ in range(50):
+            if pool.stats["completed"] == 2:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await pool.stop()
+
+    assert order == ["high priority", "low priority"]
+    done = await jobs.get_job(low["id"])
+    assert done is not None and done["status"] == "done" and done["result"] == {"product": {"name": "low priority"}}
+
+    await asyncio.sleep(0.25)
+    assert await jobs.get_job(high["id"]) is None
+
+
+@pytest.mark.anyio
+async def test_long_jobs_keep_their_lease(memory_jobs, monkeypatch):
+    monkeypatch.setenv("JOB_LEASE_SECONDS", "0.06")
+
+    async def slow_analysis(product, platforms=None):  # type: ignore[no-untyped-def]
+        await asyncio.sleep(0.2)
+        return {}
+
+    monkeypatch.setattr(jobs, "get_product_analysis", slow_analysis)
+    await jobs.submit_job("slow product")
+    store = job_db.get_job_store()
+    pool = jobs.get_worker_pool()
+    job = await store.claim(pool.lease)
+
+    running = asyncio.create_task(pool.run_job(job))
+    await asyncio.sleep(0.15)  # past the original lease
+    assert await store.claim(pool.lease) is None  # not reclaimed by another worker
+    await running
+    assert (await jobs.get_job(job["_id"]))["attempts"] == 1
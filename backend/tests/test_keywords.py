@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest
+
+from services.keywords import KeywordMatcher
+from services.ollama_client import calculate_sentiment_fallback
+
+
+def test_keywords_match_whole_words_only():
+    matcher = KeywordMatcher({"features": ["no", "lack of"], "perf": ["doesn't work"]})
+
+    assert matcher.count("I know it's not bad") == {}
+    assert matcher.count("No charger, NO case, lack   of manuals") == {"features": 3}
+    assert matcher.categories("It doesn’t work") == {"perf"}
+
+
+def test_longer_keyword_credits_contained_keywords():
+    matcher = KeywordMatcher({"negative": ["poor"], "con:quality": ["poor quality"]})
+
+    assert matcher.count("Poor quality overall") == {"negative": 1, "con:quality": 1}
+
+
+def test_fallback_uses_single_pass_hits():
+    result = calculate_sentiment_fallback(["Great value for money", "Not what I expected", "Terrible, no support"])
+
+    assert result["sentiment"] == {"positive": 33, "neutral": 34, "negative": 33}
+    assert result["pros"] == ["Value", "Service"]
+    assert result["cons"] == ["Features", "Service"]
+
+
+def test_space_copy_is_identical():
+    space_copy = Path(__file__).resolve().parents[2] / "hf_space_files" / "keywords.py"
+    if not space_copy.exists():
+        pytest.skip("hf_space_files not present")
+    assert space_copy.read_text() == (Path(__file__).resolve().parents[1] / "services" / "keywords.py").read_text()
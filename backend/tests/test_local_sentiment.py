@@ -0,0 +1,43 @@
+import pytest
+from models.product import Review
+from services import ollama_client
+from services.local_sentiment import classify_local, label_review, score_review, shutdown_local_sentiment
+
+
+def test_lexicon_handles_negation_boosters_and_contrast():
+    assert label_review("Great phone, love it!") == "positive"
+    assert label_review("Not good, battery is terrible") == "negative"
+    assert label_review("It arrived on Tuesday") == "neutral"
+    assert score_review("very good") > score_review("good") > 0
+    assert label_review("Looks nice but it is really slow and laggy") == "negative"
+
+
+@pytest.mark.anyio
+async def test_process_pool_matches_inline_scoring(monkeypatch):
+    texts = ["excellent value", "broken on arrival", "okay I guess", "doesn't work"] * 10
+    monkeypatch.setenv("LOCAL_SENTIMENT_INLINE_MAX", "0")
+    monkeypatch.setenv("LOCAL_SENTIMENT_WORKERS", "2")
+    try:
+        assert await classify_local(texts) == [label_review(t) for t in texts]
+    finally:
+        shutdown_local_sentiment()
+
+
+@pytest.mark.anyio
+async def test_local_backend_keeps_output_schema(monkeypatch):
+    monkeypatch.setenv("HF_API_BASE", "local")
+    monkeypatch.setattr(ollama_client, "get_http_client", lambda: pytest.fail("no network in local mode"))
+    reviews = [
+        Review(platform="Amazon", rating=5, content="Great battery, fast and smooth"),
+        Review(platform="Flipkart", rating=2, content="Terrible, broke in a week"),
+    ]
+
+    overall = await ollama_client.analyze_reviews_with_huggingface([r.content for r in reviews])
+    assert set(overall) == {"sentiment", "pros", "cons", "score", "best_platform"}
+    assert overall["sentiment"] == {"positive": 50, "neutral": 0, "negative": 50}
+
+    by_platform = await ollama_client.analyze_reviews_by_platform(reviews)
+    assert by_platform["best_platform"] == "Amazon"
+    assert by_platform["comparison"]["Flipkart"]["overall_sentiment"] == "negative"
+
+    assert await ollama_client.classify_reviews([r.content for r in reviews]) == ["positive", "negative"]
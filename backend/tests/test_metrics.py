@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from services.metrics import FALLBACKS, PARSE_FAILURES, Counter, Histogram, render_family
+from services.ollama_client import calculate_sentiment_fallback, extract_json_from_response
+
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("stage_seconds", "Stage latency.", ("stage",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.7, 3):
+        histogram.observe(value, stage="scrape")
+    counter = Counter("fallbacks", "Fallbacks.", ("kind",))
+    counter.inc(kind="ratings")
+
+    lines = render_family(histogram.name, histogram.kind, histogram.help, histogram.samples())
+    lines += render_family(counter.name, counter.kind, counter.help, counter.samples())
+
+    assert lines == [
+        "# HELP stage_seconds Stage latency.",
+        "# TYPE stage_seconds histogram",
+        'stage_seconds_bucket{stage="scrape",le="0.1"} 1',
+        'stage_seconds_bucket{stage="scrape",le="1"} 3',
+        'stage_seconds_bucket{stage="scrape",le="+Inf"} 4',
+        'stage_seconds_sum{stage="scrape"} 4.25',
+        'stage_seconds_count{stage="scrape"} 4',
+        "# HELP fallbacks Fallbacks.",
+        "# TYPE fallbacks counter",
+        'fallbacks_total{kind="ratings"} 1',
+    ]
+
+
+def test_fallbacks_and_parse_failures_are_counted():
+    fallbacks = FALLBACKS.value(kind="keywords")
+    failures = PARSE_FAILURES.value()
+
+    calculate_sentiment_fallback(["Great phone"])
+    with pytest.raises(ValueError):
+        extract_json_from_response("no json here")
+
+    assert FALLBACKS.value(kind="keywords") == fallbacks + 1
+    assert PARSE_FAILURES.value() == failures + 1
+
+
+def test_analyze_reports_stage_timings(monkeypatch):
+    monkeypatch.setenv("METRICS_SERVER_TIMING", "true")
+
+    resp = client.get("/analyze", params={"product": "metrics phone", "cache": "bypass"})
+    assert resp.status_code == 200
+    timing = resp.headers["Server-Timing"]
+    assert "scrape_amazon;dur=" in timing and "inference_incremental;dur=" in timing
+    assert timing.split(", ")[-1].startswith("total;dur=")
+
+    body = client.get("/metrics")
+    assert body.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'analysis_stage_duration_seconds_count{stage="scrape",target="flipkart"}' in body.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/analyze",status="200"}' in body.text
+    assert 'inference_circuit_state{state="closed"}' in body.text
+    assert "result_cache_hit_ratio " in body.text
+
+
+def test_server_timing_is_off_by_default():
+    resp = client.get("/health")
+    assert "Server-Timing" not in resp.headers
@@ -0,0 +1,58 @@
+import pytest
+
+from db import mongo
+from db.mongo import review_hash, review_upserts
+
+
+def test_review_hash_ignores_case_and_whitespace():
+    a = {"platform": "Amazon", "rating": 4.0, "title": "Great", "content": "Works  well"}
+    b = {"platform": "Amazon", "rating": 4.0, "title": "great ", "content": "works well"}
+    c = {"platform": "Flipkart", "rating": 4.0, "title": "Great", "content": "Works well"}
+
+    assert review_hash(a) == review_hash(b)
+    assert review_hash(a) != review_hash(c)
+
+
+def test_review_upserts_are_deduplicated_and_insert_only():
+    review = {"platform": "Amazon", "rating": 5.0, "title": None, "content": "Love it"}
+
+    ops = review_upserts("phone", [review, dict(review)])
+
+    assert len(ops) == 1
+    doc = ops[0]._doc
+    assert set(ops[0]._filter) == {"normalized_name", "platform", "review_hash"}
+    assert doc["$setOnInsert"]["normalized_name"] == "phone"
+    assert ops[0]._upsert is True
+
+
+class _FakeReviews:
+    def __init__(self, docs):  # type: ignore[no-untyped-def]
+        self.docs = {doc["_id"]: doc for doc in docs}
+
+    async def find(self, query, projection):  # type: ignore[no-untyped-def]
+        for doc in list(self.docs.values()):
+            yield dict(doc)
+
+    async def delete_many(self, query):  # type: ignore[no-untyped-def]
+        for doc_id in query["_id"]["$in"]:
+            del self.docs[doc_id]
+
+    async def bulk_write(self, ops, ordered):  # type: ignore[no-untyped-def]
+        for op in ops:
+            self.docs[op._filter["_id"]].update(op._doc["$set"])
+
+
+@pytest.mark.anyio
+async def test_migrate_reviews_backfills_hashes_and_removes_duplicates(monkeypatch):
+    review = {"normalized_name": "phone", "platform": "Amazon", "rating": 5.0, "title": None, "content": "Love it"}
+    fake = _FakeReviews([
+        {"_id": 1, **review},
+        {"_id": 2, **review, "review_hash": review_hash(review), "sentiment_label": "positive"},
+        {"_id": 3, **review},
+        {"_id": 4, **review, "content": "Broke in a week"},
+    ])
+    monkeypatch.setattr(mongo, "get_collection", lambda name: fake)
+
+    assert await mongo.migrate_reviews() == {"backfilled": 1, "removed": 2}
+    assert sorted(fake.docs) == [2, 4]
+    assert fake.docs[4]["review_hash"] == review_hash(fake.docs[4])
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from models.product import Review
+from services import ollama_client
+
+
+def _mock_client(handler) -> httpx.AsyncClient:  # type: ignore[no-untyped-def]
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture
+def space_backend(monkeypatch):
+    monkeypatch.setenv("HF_API_BASE", "https://example.hf.space")
+    monkeypatch.setattr(ollama_client, "_inference_semaphore", None)
+    monkeypatch.setattr(ollama_client, "_inference_breaker", None)
+    monkeypatch.setattr(ollama_client, "_classification_batcher", None)
+
+
+@pytest.mark.anyio
+async def test_platforms_are_analyzed_concurrently(space_backend, monkeypatch):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"sentiment": {"positive": 80, "neutral": 10, "negative": 10}})
+
+    monkeypatch.setattr(ollama_client, "get_http_client", lambda: _mock_client(handler))
+    reviews = [Review(platform=p, rating=4.5, content="great") for p in ("Amazon", "Flipkart", "Croma")]
+
+    started = time.perf_counter()
+    result = await ollama_client.analyze_reviews_by_platform(reviews)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert result["platforms"] == ["Amazon", "Flipkart", "Croma"]
+    assert result["comparison"]["Amazon"]["overall_sentiment"] == "positive"
+
+
+@pytest.mark.anyio
+async def test_platform_falls_back_to_ratings_on_503(space_backend, monkeypatch):
+    monkeypatch.setattr(ollama_client, "get_http_client", lambda: _mock_client(lambda request: httpx.Response(503)))
+    reviews = [Review(platform="Amazon", rating=2.0, content="bad")]
+
+    result = await ollama_client.analyze_reviews_by_platform(reviews)
+
+    assert result["comparison"]["Amazon"] == {
+        "sentiment": {"positive": 10, "neutral": 30, "negative": 60},
+        "average_rating": 2.0,
+        "review_count": 1,
+        "overall_sentiment": "negative",
+    }
+
+
+@pytest.mark.anyio
+async def test_classify_reviews_batches_and_reads_space_labels(space_backend, monkeypatch):
+    monkeypatch.setenv("INFERENCE_BATCH_SIZE", "2")
+    batches: list = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        reviews = json.loads(request.content)["reviews"]
+        batches.append(reviews)
+        return httpx.Response(200, json={"sentiment": {}, "labels": ["positive" if "good" in r else "negative" for r in reviews]})
+
+    monkeypatch.setattr(ollama_client, "get_http_client", lambda: _mock_client(handler))
+
+    labels = await ollama_client.classify_reviews(["good", "bad", "good too"])
+
+    assert labels == ["positive", "negative", "positive"]
+    assert sorted(map(len, batches)) == [1, 2]
+
+
+@pytest.mark.anyio
+async def test_open_circuit_skips_backend_until_probe_succeeds(space_backend, monkeypatch):
+    monkeypatch.setenv("INFERENCE_BREAKER_FAILURES", "2")
+    now = [1000.0]
+    monkeypatch.setattr("services.circuit_breaker.time.monotonic", lambda: now[0])
+    status = [503]
+    calls: list = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(status[0], json={"sentiment": {"positive": 90, "neutral": 10, "negative": 0}})
+
+    monkeypatch.setattr(ollama_client, "get_http_client", lambda: _mock_client(handler))
+
+    for _ in range(3):
+        result = await ollama_client.analyze_reviews_with_huggingface(["great phone"])
+        assert result["sentiment"] == {"positive": 100, "neutral": 0, "negative": 0}  # keyword fallback
+    assert len(calls) == 2
+    assert ollama_client.get_inference_breaker().state == "open"
+
+    now[0] += 31
+    status[0] = 200
+    result = await ollama_client.analyze_reviews_with_huggingface(["great phone"])
+    assert result["sentiment"]["positive"] == 90
+    assert ollama_client.get_inference_breaker().state == "closed"
+
+
+@pytest.mark.anyio
+async def test_concurrent_classifications_share_batches(space_backend, monkeypatch):
+    monkeypatch.setenv("INFERENCE_BATCH_SIZE", "4")
+    batches: list = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        reviews = json.loads(request.content)["reviews"]
+        batches.append(reviews)
+        return httpx.Response(200, json={"labels": ["positive"] * len(reviews)})
+
+    monkeypatch.setattr(ollama_client, "get_http_client", lambda: _mock_client(handler))
+
+    results = await asyncio.gather(*(ollama_client.classify_reviews([f"p{i} a", f"p{i} b"]) for i in range(3)))
+
+    assert results == [["positive", "positive"]] * 3
+    assert sorted(map(len, batches)) == [2, 4]
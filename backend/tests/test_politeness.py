@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from scrapers import http_cache, politeness
+from scrapers.base import Scraper
+from scrapers.politeness import HostScheduler, current_flow
+
+
+def _host(**overrides) -> HostScheduler:  # type: ignore[no-untyped-def]
+    config = dict(rate=0, burst=1, max_in_flight=1, backoff_base=0.05, backoff_max=1)
+    return HostScheduler(**(config | overrides))
+
+
+async def _request(host: HostScheduler, flow: str, served: list) -> None:
+    await host.acquire(flow)
+    served.append(flow)
+    await asyncio.sleep(0.01)
+    host.release()
+
+
+@pytest.mark.anyio
+async def test_waiting_flows_are_served_round_robin():
+    host = _host()
+    served: list = []
+    big = [asyncio.ensure_future(_request(host, "big", served)) for _ in range(4)]
+    await asyncio.sleep(0)
+    small = [asyncio.ensure_future(_request(host, "small", served)) for _ in range(2)]
+    await asyncio.gather(*big, *small)
+
+    assert served == ["big", "big", "small", "big", "small", "big"]
+
+
+@pytest.mark.anyio
+async def test_token_bucket_limits_rate():
+    host = _host(rate=50, burst=2, max_in_flight=10)
+    started = time.perf_counter()
+    await asyncio.gather(*(_request(host, "f", []) for _ in range(6)))
+    # 2 from the burst, then 4 more at 50/s
+    assert time.perf_counter() - started >= 0.07
+
+
+@pytest.mark.anyio
+async def test_throttled_fetch_backs_off_and_retries(monkeypatch, tmp_path):
+    monkeypatch.setenv("SCRAPER_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(http_cache, "_http_cache", None)
+    monkeypatch.setattr(politeness, "_scheduler", None)
+    responses = [httpx.Response(429, headers={"Retry-After": "0.1"}), httpx.Response(200, text="<p>ok</p>")]
+    sent: list = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(time.perf_counter())
+        return responses.pop(0)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("scrapers.base.get_http_client", lambda: client)
+    current_flow.set("test")
+
+    doc = await Scraper().fetch("https://shop.example/item")
+
+    assert doc.select_one("p").text() == "ok"
+    assert sent[1] - sent[0] >= 0.1
+    host = politeness.get_politeness_scheduler().snapshot()["shop.example"]
+    assert host["throttled"] == 1 and host["in_flight"] == 0
+    assert host["rate"] < politeness.get_politeness_config()["rate"]
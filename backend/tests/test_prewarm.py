@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from services import cache as cache_module, popularity
+from services.cache import ResultCache
+from services.popularity import PopularityTracker
+from services.prewarm import Prewarmer
+
+
+def test_scores_decay_by_half_life(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("services.popularity.time.monotonic", lambda: now[0])
+    tracker = PopularityTracker(half_life=60, max_tracked=10)
+
+    for _ in range(4):
+        tracker.record("Pixel 8")
+    tracker.record("iphone 15", ["amazon"])
+    assert tracker.score("pixel 8") == 4
+
+    now[0] += 60
+    tracker.record("iphone 15", ["amazon"])
+    assert tracker.score("pixel 8") == pytest.approx(2)
+    assert tracker.score("iphone 15", ["amazon"]) == pytest.approx(1.5)
+    assert [(e.product, round(s, 2)) for e, s in tracker.top(5, min_score=1.6)] == [("Pixel 8", 2.0)]
+
+
+def test_tracker_keeps_the_hottest_products(monkeypatch):
+    monkeypatch.setattr("services.popularity.time.monotonic", lambda: 1000.0)
+    tracker = PopularityTracker(half_life=60, max_tracked=2)
+    for name, hits in [("a", 3), ("b", 1), ("c", 2), ("d", 1), ("e", 1)]:
+        for _ in range(hits):
+            tracker.record(name)
+
+    assert len(tracker) == 2
+    assert [e.product for e, _ in tracker.top(5)] == ["a", "c"]
+
+
+@pytest.fixture
+def prewarm_state(monkeypatch):
+    monkeypatch.setattr(popularity, "_tracker", PopularityTracker(half_life=3600, max_tracked=100))
+    result_cache = ResultCache(max_entries=10, ttl=100, stale_ttl=1000)
+    monkeypatch.setattr(cache_module, "_result_cache", result_cache)
+    return popularity._tracker, result_cache
+
+
+async def _settle(prewarmer: Prewarmer) -> None:
+    while prewarmer._running:
+        await asyncio.gather(*prewarmer._running.values())
+
+
+@pytest.mark.anyio
+async def test_tick_refreshes_hot_products_before_they_go_stale(prewarm_state, monkeypatch):
+    tracker, result_cache = prewarm_state
+    for _ in range(3):
+        tracker.record("pixel 8")
+    tracker.record("rarely asked phone")
+    prewarmer = Prewarmer(enabled=True, interval=60, top_k=5, min_score=2, concurrency=2, refresh_at=0.8)
+
+    assert await prewarmer.tick() == 1
+    await _settle(prewarmer)
+    assert prewarmer.stats["refreshed"] == 1
+    assert await result_cache.age("pixel 8") is not None
+    assert await result_cache.age("rarely asked phone") is None
+
+    assert await prewarmer.tick() == 0
+    assert prewarmer.stats["skipped_fresh"] == 1
+
+    later = time.time() + 85  # past 80% of the 100s TTL
+    monkeypatch.setattr("services.cache.time.time", lambda: later)
+    assert await prewarmer.tick() == 1
+    await _settle(prewarmer)
+    assert prewarmer.stats["refreshed"] == 2
+
+
+@pytest.mark.anyio
+async def test_tick_respects_the_concurrency_budget(prewarm_state):
+    tracker, _ = prewarm_state
+    for name in ("pixel 8", "iphone 15", "galaxy s24"):
+        for _ in range(3):
+            tracker.record(name)
+    prewarmer = Prewarmer(enabled=True, interval=60, top_k=5, min_score=1, concurrency=2, refresh_at=0.8)
+
+    assert await prewarmer.tick() == 2
+    assert await prewarmer.tick() == 0  # budget still in use
+    await _settle(prewarmer)
+    assert await prewarmer.tick() == 1
+    await prewarmer.stop()
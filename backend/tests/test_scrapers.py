@@ -0,0 +1,304 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import pytest
+
+from scrapers.amazon import AmazonScraper
+from scrapers.flipkart import FlipkartScraper
+from scrapers import http_cache, politeness
+from scrapers.parsing import BACKENDS, _available, iter_reviews, parse_document
+from scrapers.base import Scraper, UnknownPlatformError, get_scrapers, graceful_scrape, scrape_as_completed
+
+
+class _OkScraper(Scraper):
+    name = "ok"
+
+    async def scrape(self, query: str) -> dict:
+        await asyncio.sleep(0.05)
+        return {"prices": [query], "reviews": []}
+
+
+class _HangingScraper(Scraper):
+    name = "hangs"
+    timeout = 0.1
+
+    async def scrape(self, query: str) -> dict:
+        await asyncio.sleep(10)
+        return {"prices": [query], "reviews": []}
+
+
+async def _fails(query: str) -> dict:
+    raise RuntimeError("blocked")
+
+
+@pytest.mark.anyio
+async def test_graceful_scrape_reports_timeout_and_error():
+    timed_out = await graceful_scrape(_HangingScraper().run, "phone", timeout=0.05)
+    assert timed_out["status"] == "timeout"
+    assert timed_out["prices"] == []
+
+    failed = await graceful_scrape(_fails, "phone", timeout=1)
+    assert failed["status"] == "error"
+    assert failed["error"] == "blocked"
+
+
+@pytest.mark.anyio
+async def test_scrape_as_completed_runs_sources_concurrently():
+    started = time.perf_counter()
+    results = {}
+    async for name, result in scrape_as_completed(
+        {"a": _OkScraper(), "b": _OkScraper(), "slow": _HangingScraper()},
+        "phone",
+    ):
+        results[name] = result
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert list(results)[-1] == "slow"  # finished sources are not held back by the slow one
+    assert results["a"]["prices"] == ["phone"]
+    assert results["b"]["status"] == "ok"
+    assert results["slow"]["status"] == "timeout"
+
+
+def test_get_scrapers_filters_registered_platforms():
+    assert set(get_scrapers()) >= {"amazon", "flipkart"}
+    assert list(get_scrapers(["Flipkart"])) == ["flipkart"]
+    with pytest.raises(UnknownPlatformError):
+        get_scrapers(["ebay"])
+
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _fixture_client(routes: dict) -> httpx.AsyncClient:
+    """Serve saved pages by path and query; anything else is a 404."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        key = request.url.path + (f"?{request.url.query.decode()}" if request.url.query else "")
+        for prefix, fixture in routes.items():
+            if key.startswith(prefix):
+                return httpx.Response(200, content=(FIXTURES / fixture).read_bytes(), headers={"Content-Type": "text/html"})
+        return httpx.Response(404)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture
+def live_mode(monkeypatch, tmp_path):
+    monkeypatch.setenv("SCRAPER_MODE", "live")
+    monkeypatch.setenv("SCRAPER_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(http_cache, "_http_cache", None)
+    monkeypatch.setattr(politeness, "_scheduler", None)
+
+
+@pytest.mark.anyio
+async def test_amazon_live_scrape_paginates_review_pages(live_mode, monkeypatch):
+    client = _fixture_client({
+        "/s?k=pixel+8": "amazon_search.html",
+        "/product-reviews/B0CHX1W1XY/?pageNumber=1": "amazon_reviews_page1.html",
+        "/product-reviews/B0CHX1W1XY/?pageNumber=2": "amazon_reviews_page2.html",
+        "/product-reviews/B0CHX1W1XY/?pageNumber=3": "amazon_reviews_empty.html",
+    })
+    monkeypatch.setattr("scrapers.base.get_http_client", lambda: client)
+
+    result = await AmazonScraper().run("pixel 8")
+
+    assert result["prices"][0].price == 52999.5
+    assert result["prices"][0].url.startswith("https://www.amazon.in/Google-Pixel-8-Obsidian-128GB/dp/B0CHX1W1XY")
+    assert [(r.title, r.rating) for r in result["reviews"]] == [
+        ("Best camera phone", 5.0),
+        ("Battery drains fast", 2.0),
+        ("Good value", 4.0),
+    ]
+    assert result["reviews"][0].content == "Photos are excellent and the display is smooth."
+
+
+@pytest.mark.anyio
+async def test_flipkart_live_scrape_stops_at_missing_page(live_mode, monkeypatch):
+    client = _fixture_client({
+        "/search?q=pixel+8": "flipkart_search.html",
+        "/google-pixel-8-obsidian-128-gb/product-reviews/itm1234567890ab?pid=MOBGT5F2XYZ&lid=LSTMOBGT5F2XYZ&page=1": "flipkart_reviews_page1.html",
+    })
+    monkeypatch.setattr("scrapers.base.get_http_client", lambda: client)
+
+    result = await FlipkartScraper().run("pixel 8")
+
+    assert result["prices"][0].price == 51999
+    assert [(r.rating, r.content) for r in result["reviews"]] == [
+        (5.0, "Great display and camera. Fast delivery too."),
+        (1.0, "Stopped working after a week, no support."),
+    ]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_parser_backends_extract_the_same_reviews(backend):
+    if not _available(backend):
+        pytest.skip(f"{backend} not installed")
+    doc = parse_document((FIXTURES / "amazon_reviews_page1.html").read_bytes(), backend)
+    reviews = list(iter_reviews(doc, AmazonScraper.selectors, "Amazon"))
+    assert [r.title for r in reviews] == ["Best camera phone", "Battery drains fast"]
+    assert [r.review_id for r in reviews] == ["R1", "R2"]
+    assert reviews[0].date == "Reviewed in India on 12 March 2024"
+
+
+@pytest.mark.anyio
+async def test_fetches_are_cached_and_revalidated(live_mode, monkeypatch):
+    body = (FIXTURES / "amazon_search.html").read_bytes()
+    requests: list = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=body, headers={"ETag": '"v1"'})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("scrapers.base.get_http_client", lambda: client)
+    scraper = AmazonScraper()
+    url = await scraper.search("pixel 8")
+
+    first = scraper.parse_listing(await scraper.fetch(url, "search"), "pixel 8")
+    second = scraper.parse_listing(await scraper.fetch(url, "search"), "pixel 8")
+    assert len(requests) == 1 and first == second
+
+    monkeypatch.setenv("SCRAPER_CACHE_TTL_SEARCH", "0")
+    monkeypatch.setattr(http_cache, "_http_cache", None)
+    revalidated = scraper.parse_listing(await scraper.fetch(url, "search"), "pixel 8")
+    assert len(requests) == 2 and requests[1].headers["If-None-Match"] == '"v1"'
+    assert revalidated == first
+
+    cache = http_cache.get_http_cache()
+    report = await cache.inspect()
+    assert cache.stats["revalidated"] == 1
+    assert report["classes"]["search"]["entries"] == 1
+    assert report["classes"]["search"]["compressed_size"] < len(body)
+    assert await cache.purge(url_class="reviews") == 0
+    assert await cache.purge(url_prefix="https://www.amazon.in/s") == 1
+    assert await cache.get(url) is None
+
+
+@pytest.mark.anyio
+async def test_amazon_without_asin_reads_the_product_page_once(live_mode, monkeypatch):
+    seen: list = []
+    monkeypatch.setattr("scrapers.base.get_http_client", lambda: _recording_client({"/item": "amazon_reviews_page1.html"}, seen))
+
+    reviews = [r async for r in AmazonScraper().iter_product_reviews("https://www.amazon.in/item")]
+
+    assert [r.review_id for r in reviews] == ["R1", "R2"]
+    assert len(seen) == 1
+
+
+AMAZON_ROUTES = {
+    "/s?k=pixel+8": "amazon_search.html",
+    "/product-reviews/B0CHX1W1XY/?pageNumber=1": "amazon_reviews_page1.html",
+    "/product-reviews/B0CHX1W1XY/?pageNumber=2": "amazon_reviews_page2.html",
+    "/product-reviews/B0CHX1W1XY/?pageNumber=3": "amazon_reviews_empty.html",
+}
+
+
+def _recording_client(routes: dict, seen: list) -> httpx.AsyncClient:
+    client = _fixture_client(routes)
+
+    async def record(request: httpx.Request) -> None:
+        seen.append(request.url.path + "?" + request.url.query.decode())
+
+    client.event_hooks["request"].append(record)
+    return client
+
+
+def _stored_cursor(known_ids: list, last_full: datetime, resume: Optional[dict] = None):
+    async def load(normalized: str, platform: str) -> dict:
+        assert (normalized, platform) == ("pixel 8", "Amazon")
+        return {
+            "normalized_name": normalized,
+            "platform": platform,
+            "known_ids": known_ids,
+            "resume": resume,
+            "last_full_crawl_at": last_full.replace(tzinfo=None),  # as MongoDB returns it
+        }
+
+    return load
+
+
+@pytest.mark.anyio
+async def test_first_crawl_is_full_and_returns_a_cursor(live_mode, monkeypatch):
+    monkeypatch.setattr("scrapers.base.get_http_client", lambda: _fixture_client(AMAZON_ROUTES))
+
+    result = await AmazonScraper().run("pixel 8")
+
+    assert result["crawl"] == {"mode": "full", "new_reviews": 3, "pages": 3, "stopped": "empty"}
+    cursor = result["cursor"]
+    assert cursor["known_ids"] == ["R1", "R2", "R4"]
+    assert cursor["newest_review_date"] == "Reviewed in India on 12 March 2024"
+    assert cursor["last_full_crawl_at"] == cursor["last_crawl_at"]
+
+
+@pytest.mark.anyio
+async def test_incremental_crawl_stops_at_first_known_review(live_mode, monkeypatch):
+    seen: list = []
+    monkeypatch.setattr("scrapers.base.get_http_client", lambda: _recording_client(AMAZON_ROUTES, seen))
+    last_full = datetime.now(timezone.utc) - timedelta(hours=1)
+    monkeypatch.setattr("scrapers.base.load_crawl_cursor", _stored_cursor(["R2", "R4"], last_full))
+
+    result = await AmazonScraper().run("pixel 8")
+
+    assert [r.review_id for r in result["reviews"]] == ["R1"]
+    assert result["crawl"] == {"mode": "incremental", "new_reviews": 1, "pages": 1, "stopped": "known"}
+    assert not any("pageNumber=2" in url for url in seen)  # later pages are never fetched
+    assert result["cursor"]["known_ids"] == ["R1", "R2", "R4"]
+    assert result["cursor"]["last_full_crawl_at"] == last_full.replace(tzinfo=None)
+
+
+@pytest.mark.anyio
+async def test_incremental_crawls_revalidate_cached_review_pages(live_mode, monkeypatch):
+    seen: list = []
+    monkeypatch.setattr("scrapers.base.get_http_client", lambda: _recording_client(AMAZON_ROUTES, seen))
+    await AmazonScraper().run("pixel 8")  # full crawl, caches every page
+    monkeypatch.setattr("scrapers.base.load_crawl_cursor", _stored_cursor(["R2"], datetime.now(timezone.utc)))
+
+    result = await AmazonScraper().run("pixel 8")
+
+    assert result["crawl"]["mode"] == "incremental"
+    assert sum("pageNumber=1" in url for url in seen) == 2
+    assert sum("/s?" in url for url in seen) == 1  # search results still come from the cache
+
+
+@pytest.mark.anyio
+async def test_crawl_stopped_by_the_page_limit_resumes_at_the_gap(live_mode, monkeypatch):
+    monkeypatch.setenv("SCRAPER_MAX_REVIEW_PAGES", "1")
+    seen: list = []
+    monkeypatch.setattr("scrapers.base.get_http_client", lambda: _recording_client(AMAZON_ROUTES, seen))
+    last_full = datetime.now(timezone.utc) - timedelta(hours=1)
+    monkeypatch.setattr("scrapers.base.load_crawl_cursor", _stored_cursor(["R4"], last_full))
+
+    first = await AmazonScraper().run("pixel 8")
+
+    assert first["crawl"]["stopped"] == "limit"
+    assert first["cursor"]["known_ids"] == ["R1", "R2", "R4"]
+    assert first["cursor"]["resume"] == {"page": 2, "known_ids": ["R4"]}
+
+    monkeypatch.setattr("scrapers.base.load_crawl_cursor", _stored_cursor(["R1", "R2", "R4"], last_full, first["cursor"]["resume"]))
+    seen.clear()
+    second = await AmazonScraper().run("pixel 8")
+
+    assert second["crawl"] == {"mode": "incremental", "new_reviews": 0, "pages": 2, "stopped": "known", "resumed_at": 2}
+    assert [url for url in seen if "product-reviews" in url] == ["/product-reviews/B0CHX1W1XY/?pageNumber=2&sortBy=recent"]
+    assert second["cursor"]["known_ids"] == ["R1", "R2", "R4"] and second["cursor"]["resume"] is None
+
+
+@pytest.mark.anyio
+async def test_periodic_full_recrawl_ignores_the_cursor(live_mode, monkeypatch):
+    monkeypatch.setenv("SCRAPER_FULL_RECRAWL_HOURS", "24")
+    monkeypatch.setattr("scrapers.base.get_http_client", lambda: _fixture_client(AMAZON_ROUTES))
+    stale = datetime.now(timezone.utc) - timedelta(days=2)
+    monkeypatch.setattr("scrapers.base.load_crawl_cursor", _stored_cursor(["R1"], stale))
+
+    result = await AmazonScraper().run("pixel 8")
+
+    assert result["crawl"]["mode"] == "full"
+    assert [r.review_id for r in result["reviews"]] == ["R1", "R2", "R4"]
+    assert result["cursor"]["last_full_crawl_at"] > stale
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from services import analysis_service
+from services.singleflight import SingleFlight
+
+
+@pytest.mark.anyio
+async def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return 42
+
+    results = await asyncio.gather(*(flight.do("phone", work) for _ in range(5)))
+
+    assert results == [42] * 5
+    assert calls == 1
+    assert flight.stats == {"calls": 5, "executions": 1, "coalesced": 4}
+    assert not flight.in_flight("phone")
+
+
+@pytest.mark.anyio
+async def test_errors_reach_every_caller_and_are_not_cached():
+    flight = SingleFlight()
+
+    async def boom() -> int:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("scrape failed")
+
+    results = await asyncio.gather(flight.do("k", boom), flight.do("k", boom), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def ok() -> int:
+        return 1
+
+    assert await flight.do("k", ok) == 1
+
+
+@pytest.mark.anyio
+async def test_streams_and_callers_join_one_analysis(monkeypatch):
+    calls = 0
+
+    async def fake_stages(product_query, platforms=None):  # type: ignore[no-untyped-def]
+        nonlocal calls
+        calls += 1
+        yield "prices", {"source": "amazon"}
+        await asyncio.sleep(0.05)
+        yield "reviews", {"reviews": []}
+        yield "result", {"product": {"name": product_query}}
+
+    async def collect(stream):  # type: ignore[no-untyped-def]
+        return [event async for event in stream]
+
+    monkeypatch.setattr(analysis_service, "analysis_stages", fake_stages)
+    first = asyncio.ensure_future(collect(analysis_service.stream_product_analysis("joined phone", cache_mode="bypass")))
+    await asyncio.sleep(0.01)  # first stage already published
+    second, result = await asyncio.gather(
+        collect(analysis_service.stream_product_analysis("Joined Phone", cache_mode="bypass")),
+        analysis_service.get_product_analysis("joined phone", cache_mode="bypass"),
+    )
+
+    assert calls == 1
+    assert await first == second
+    assert [name for name, _ in second] == ["prices", "reviews", "done"]
+    assert second[-1][1]["product"] == result["product"] == {"name": "joined phone"}
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from db import writer
+from db.writer import WriteBehindQueue
+
+
+@pytest.fixture
+def written(monkeypatch):
+    calls: list = []
+
+    async def fake_bulk_write(collection, ops):  # type: ignore[no-untyped-def]
+        calls.append((collection, list(ops)))
+
+    monkeypatch.setattr(writer, "bulk_write_unordered", fake_bulk_write)
+    return calls
+
+
+@pytest.mark.anyio
+async def test_worker_groups_writes_per_collection(written):
+    queue = WriteBehindQueue(max_pending=100, batch_size=10, flush_interval=0.02)
+    queue.start()
+    queue.submit("products", ["p1"])
+    queue.submit("reviews", ["r1", "r2"])
+    queue.submit("products", ["p2"])
+    await asyncio.sleep(0.1)
+    await queue.stop()
+
+    assert written == [("products", ["p1", "p2"]), ("reviews", ["r1", "r2"])]
+    assert queue.stats["written"] == 4
+    assert queue.stats["batches"] == 1
+
+
+@pytest.mark.anyio
+async def test_full_queue_drops_and_stop_flushes_backlog(written):
+    queue = WriteBehindQueue(max_pending=2, batch_size=10, flush_interval=0.02)
+
+    assert queue.submit("reviews", ["r1", "r2", "r3"]) is False
+    assert queue.stats["dropped"] == 1
+    assert queue.stats["high_watermark"] == 2
+
+    await queue.stop()
+    assert written == [("reviews", ["r1", "r2"])]
+    assert queue.pending == 0
+
+
+@pytest.mark.anyio
+async def test_chained_writes_wait_for_the_first_ones(written, monkeypatch):
+    queue = WriteBehindQueue(max_pending=100, batch_size=2, flush_interval=0.02)
+    queue.submit("reviews", ["r1", "r2", "r3"], then=("crawl_cursors", ["c1"]))
+    await queue.stop()
+    assert written == [("reviews", ["r1", "r2"]), ("reviews", ["r3"]), ("crawl_cursors", ["c1"])]
+
+    async def failing_bulk_write(collection, ops):  # type: ignore[no-untyped-def]
+        if collection == "reviews":
+            raise RuntimeError("write failed")
+        written.append((collection, list(ops)))
+
+    monkeypatch.setattr(writer, "bulk_write_unordered", failing_bulk_write)
+    queue.submit("reviews", ["r4"], then=("crawl_cursors", ["c2"]))
+    await queue.stop()
+    assert written[-1] == ("crawl_cursors", ["c1"]) and queue.stats["skipped"] == 1
+
+    small = WriteBehindQueue(max_pending=1, batch_size=10, flush_interval=0.02)
+    assert small.submit("reviews", ["r5", "r6"], then=("crawl_cursors", ["c3"])) is False
+    await small.stop()
+    assert small.stats["skipped"] == 1 and small.pending == 0
@@ -0,0 +1,43 @@
+"""Standalone job worker: ``python worker.py``.
+
+Runs JOB_WORKERS analysis workers against the MongoDB job queue, so API pods can
+set JOB_WORKERS=0 and only accept and report jobs.
+"""
+
+import asyncio
+import logging
+from dotenv import load_dotenv
+from db import mongo
+from db.mongo import init_mongo_client, close_mongo_client, ensure_indexes
+from db.writer import start_write_queue, stop_write_queue
+from services.http_client import init_http_client, close_http_client
+from services.jobs import get_worker_pool
+from services.local_sentiment import shutdown_local_sentiment
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    await init_mongo_client()
+    if mongo.db is None:
+        raise SystemExit("The job worker needs MongoDB: jobs are shared through the 'jobs' collection")
+    await init_http_client()
+    await start_write_queue()
+    await ensure_indexes()
+    pool = get_worker_pool()
+    pool.start()
+    logger.info(f"Job worker running with {pool.workers} workers")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        await stop_write_queue()
+        await close_mongo_client()
+        await close_http_client()
+        shutdown_local_sentiment()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
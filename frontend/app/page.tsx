@@ -1,7 +1,6 @@
 'use client';
 
-import React, { useState } from 'react';
-import axios from 'axios';
+import React, { useEffect, useRef, useState } from 'react';
 
 type PriceRow = { platform: string; price?: number | null; currency?: string; url?: string | null };
 
@@ -10,22 +9,54 @@ export default function HomePage() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [result, setResult] = useState<any>(null);
+  const streamRef = useRef<EventSource | null>(null);
 
   const apiBase = process.env.NEXT_PUBLIC_API_BASE || 'http://localhost:8000';
 
-  async function onSearch(e: React.FormEvent) {
+  useEffect(() => () => streamRef.current?.close(), []);
+
+  function onSearch(e: React.FormEvent) {
     e.preventDefault();
+    streamRef.current?.close();
     setError(null);
-    setResult(null);
+    setResult({ product: { name: query, prices: [], reviews: [] } });
     setLoading(true);
-    try {
-      const res = await axios.get(`${apiBase}/analyze`, { params: { product: query } });
-      setResult(res.data);
-    } catch (err: any) {
-      setError(err?.message || 'Failed to analyze');
-    } finally {
+
+    // Each stage is rendered as soon as the backend emits it: prices first, sentiment last
+    const params = new URLSearchParams({ product: query });
+    const stream = new EventSource(`${apiBase}/analyze/stream?${params}`);
+    streamRef.current = stream;
+    const on = (event: string, handler: (data: any) => void) =>
+      stream.addEventListener(event, (msg) => {
+        // Connection errors also arrive as 'error' events, without data
+        const { data } = msg as MessageEvent;
+        if (data) handler(JSON.parse(data));
+      });
+    const finish = () => {
+      stream.close();
       setLoading(false);
-    }
+    };
+
+    on('prices', (data) =>
+      setResult((prev: any) => ({ ...prev, product: { ...prev.product, prices: [...prev.product.prices, ...data.prices] } }))
+    );
+    on('reviews', (data) => setResult((prev: any) => ({ ...prev, product: { ...prev.product, reviews: data.reviews } })));
+    on('platforms', (data) => setResult((prev: any) => ({ ...prev, platform_comparison: data })));
+    on('analysis', (data) => setResult((prev: any) => ({ ...prev, analysis: data })));
+    on('done', (data) => {
+      setResult(data);
+      finish();
+    });
+    on('error', (data) => {
+      setError(data.detail || 'Failed to analyze');
+      finish();
+    });
+    stream.onerror = () => {
+      if (stream.readyState !== EventSource.CLOSED) {
+        setError('Failed to analyze');
+        finish();
+      }
+    };
   }
 
   const prices: PriceRow[] = result?.product?.prices || [];
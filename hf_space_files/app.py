@@ -3,10 +3,12 @@ FastAPI app for Hugging Face Space deployment.
 This provides a sentiment analysis API endpoint.
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from transformers import pipeline
+from keywords import KeywordMatcher
+import asyncio
 import logging
 import os
 
@@ -26,17 +28,244 @@ app.add_middleware(
 model_name = "cardiffnlp/twitter-roberta-base-sentiment-latest"
 sentiment_pipeline = None
 
-@app.on_event("startup")
-async def load_model():
-    """Load the sentiment analysis model on startup."""
-    global sentiment_pipeline
+# Model lifecycle: "loading" -> "ready" | "failed"
+model_status = "loading"
+model_error: str | None = None
+
+# "background" serves / immediately and loads the model in a worker thread;
+# "blocking" finishes loading (and warmup) before the app accepts traffic.
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "background").lower()
+WARMUP_BATCHES = int(os.getenv("WARMUP_BATCHES", "1"))
+READY_RETRY_AFTER = int(os.getenv("READY_RETRY_AFTER", "10"))  # seconds
+WARMUP_TEXTS = [
+    "Great product, works perfectly.",
+    "Terrible quality, stopped working after a week.",
+    "It's okay, nothing special.",
+]
+
+# Inference backend: "torch" (fp32), "int8" (dynamic-quantized torch) or "onnx" (ONNX Runtime)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch").lower()
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))  # 0 lets ONNX Runtime decide
+# Where the ONNX export is kept; the Dockerfile fills it at build time for SENTIMENT_BACKEND=onnx
+ONNX_MODEL_DIR = os.getenv(
+    "ONNX_MODEL_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "onnx", model_name.replace("/", "--")),
+)
+
+# Batching configuration
+MAX_REVIEWS = int(os.getenv("MAX_REVIEWS", "50"))
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "16"))
+MAX_LENGTH = int(os.getenv("MAX_LENGTH", "512"))  # tokens, truncated by the tokenizer
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "false").lower() in ("1", "true", "yes")
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "10"))
+
+
+def export_onnx(directory: str = ONNX_MODEL_DIR) -> str:
+    """Export the model to ONNX unless ``directory`` already holds an export; returns it.
+
+    Exporting takes longer than loading, so it runs once (at image build time,
+    or on the first cold start) instead of on every start.
+    """
+    if not os.path.exists(os.path.join(directory, "model.onnx")):
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        logger.info(f"Exporting {model_name} to ONNX in {directory}")
+        ORTModelForSequenceClassification.from_pretrained(model_name, export=True).save_pretrained(directory)
+    return directory
+
+
+def build_pipeline(backend: str = SENTIMENT_BACKEND):
+    """Build the sentiment pipeline for the selected backend.
+
+    Every backend returns a transformers text-classification pipeline, so the
+    rest of the app (and the response schema) is identical across backends.
+    """
+    # Imported lazily: transformers/torch dominate import time
+    from transformers import pipeline
+
+    if backend == "torch":
+        return pipeline("sentiment-analysis", model=model_name, device=-1)
+
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    if backend == "int8":
+        import torch
+        from transformers import AutoModelForSequenceClassification
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, device=-1)
+
+    if backend == "onnx":
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        session_options = onnxruntime.SessionOptions()
+        if ONNX_THREADS > 0:
+            session_options.intra_op_num_threads = ONNX_THREADS
+            session_options.inter_op_num_threads = 1
+        model = ORTModelForSequenceClassification.from_pretrained(
+            export_onnx(), session_options=session_options
+        )
+        return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+    raise ValueError(f"Unknown SENTIMENT_BACKEND: {backend} (expected torch, int8 or onnx)")
+
+
+def normalize_label(label: str) -> str:
+    # 3-class models (negative/neutral/positive): LABEL_1 is neutral, as in the backend's LABEL_ALIASES
+    label = label.upper()
+    if label in ['POSITIVE', 'LABEL_2']:
+        return "positive"
+    if label in ['NEGATIVE', 'LABEL_0']:
+        return "negative"
+    return "neutral"
+
+
+def classify_reviews(reviews: list[str]) -> list[dict]:
+    """Run reviews through the pipeline in batches (blocking, call from a worker thread)."""
+    if not reviews:
+        return []
+    return sentiment_pipeline(reviews, batch_size=BATCH_SIZE, truncation=True, max_length=MAX_LENGTH)
+
+
+class MicroBatcher:
+    """Merges reviews from concurrent /analyze calls into shared pipeline batches.
+
+    Requests queue up for at most ``max_wait`` seconds (or until ``max_size`` reviews
+    are pending); the combined batch runs in one worker thread call and each caller
+    gets back the slice of results for its own reviews.
+    """
+
+    def __init__(self, classify_fn, max_size: int, max_wait: float):
+        self._classify = classify_fn
+        self._max_size = max_size
+        self._max_wait = max_wait
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, reviews: list[str]) -> list[dict]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((reviews, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self._max_wait
+            while size < self._max_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            texts = [text for reviews, _ in pending for text in reviews]
+            try:
+                results = await asyncio.to_thread(self._classify, texts)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            offset = 0
+            for reviews, future in pending:
+                if not future.done():
+                    future.set_result(results[offset:offset + len(reviews)])
+                offset += len(reviews)
+
+
+micro_batcher: MicroBatcher | None = None
+
+
+def load_and_warm_model() -> None:
+    """Load the pipeline and run warmup batches (blocking, call from a worker thread)."""
+    global sentiment_pipeline, model_status, model_error
     try:
-        logger.info(f"Loading model: {model_name}")
-        sentiment_pipeline = pipeline("sentiment-analysis", model=model_name, device=-1)
+        logger.info(f"Loading model: {model_name} (backend={SENTIMENT_BACKEND})")
+        loaded = build_pipeline(SENTIMENT_BACKEND)
+        # Warmup allocates kernels/buffers so the first real request isn't slow
+        warmup_batch = (WARMUP_TEXTS * BATCH_SIZE)[:BATCH_SIZE]
+        for _ in range(WARMUP_BATCHES):
+            loaded(warmup_batch, batch_size=BATCH_SIZE, truncation=True, max_length=MAX_LENGTH)
+        sentiment_pipeline = loaded
+        model_status = "ready"
         logger.info("Model loaded successfully")
     except Exception as e:
         logger.error(f"Failed to load model: {e}")
         sentiment_pipeline = None
+        model_status = "failed"
+        model_error = str(e)
+
+
+@app.on_event("startup")
+async def load_model():
+    """Start loading the sentiment analysis model."""
+    global micro_batcher
+    if MICROBATCH_ENABLED:
+        micro_batcher = MicroBatcher(classify_reviews, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS / 1000)
+        micro_batcher.start()
+        logger.info(f"Micro-batching enabled (max_size={MICROBATCH_MAX_SIZE}, max_wait={MICROBATCH_MAX_WAIT_MS}ms)")
+
+    if MODEL_LOAD_MODE == "blocking":
+        await asyncio.to_thread(load_and_warm_model)
+    else:
+        app.state.model_loader = asyncio.create_task(asyncio.to_thread(load_and_warm_model))
+
+
+def not_ready_detail() -> dict:
+    detail = {"status": model_status, "retry_after": READY_RETRY_AFTER}
+    if model_error:
+        detail["error"] = model_error
+    return detail
+
+
+@app.on_event("shutdown")
+async def stop_micro_batcher():
+    if micro_batcher is not None:
+        await micro_batcher.stop()
+
+# Keywords used to extract pros/cons
+PROS_KEYWORDS = {
+    "Quality": ["excellent quality", "build quality", "solid build", "durable", "well built", "premium", "great quality"],
+    "Performance": ["fast", "performance", "powerful", "smooth", "responsive", "quick", "works well"],
+    "Value": ["value for money", "worth it", "affordable", "great price", "budget friendly", "good value"],
+    "Features": ["features", "functionality", "versatile", "useful", "convenient"],
+    "Service": ["fast shipping", "delivery", "customer service", "support", "quick delivery"],
+}
+
+CONS_KEYWORDS = {
+    "Quality Issues": ["poor quality", "cheap", "broke", "stopped working", "defective", "broken"],
+    "Performance Problems": ["slow", "laggy", "freezes", "doesn't work", "issues", "problems"],
+    "Pricing Concerns": ["overpriced", "expensive", "not worth", "too costly", "pricey"],
+    "Missing Features": ["missing features", "lack of", "no", "without"],
+    "Service Issues": ["poor service", "delayed", "shipping issues", "no support", "slow delivery"],
+}
+
+KEYWORD_MATCHER = KeywordMatcher({
+    **{f"pro:{category}": keywords for category, keywords in PROS_KEYWORDS.items()},
+    **{f"con:{category}": keywords for category, keywords in CONS_KEYWORDS.items()},
+})
+
 
 class AnalyzeRequest(BaseModel):
     reviews: list[str]
@@ -47,41 +276,51 @@ class SentimentResponse(BaseModel):
     cons: list[str]
     score: float
     best_platform: str | None = None
+    labels: list[str] = []  # per-review "positive" / "neutral" / "negative", in request order
 
 @app.get("/")
 def read_root():
     return {
-        "status": "ready", 
+        "status": model_status,
         "model": "cardiffnlp/twitter-roberta-base-sentiment-latest",
+        "backend": SENTIMENT_BACKEND,
         "endpoint": "/analyze"
     }
 
+@app.get("/ready")
+def readiness():
+    """Readiness probe: 200 once the model is loaded and warmed up, 503 until then."""
+    if model_status == "ready":
+        return {"status": "ready", "backend": SENTIMENT_BACKEND}
+    return JSONResponse(
+        status_code=503,
+        content=not_ready_detail(),
+        headers={"Retry-After": str(READY_RETRY_AFTER)},
+    )
+
 @app.post("/analyze", response_model=SentimentResponse)
 async def analyze_reviews(request: AnalyzeRequest):
     """Analyze reviews and return sentiment + pros/cons"""
     if not sentiment_pipeline:
-        raise Exception("Model not loaded")
+        raise HTTPException(
+            status_code=503,
+            detail=not_ready_detail(),
+            headers={"Retry-After": str(READY_RETRY_AFTER)},
+        )
     
-    reviews = request.reviews[:50]  # Limit to 50 reviews
-    reviews_text = "\n".join(reviews)
+    reviews = request.reviews[:MAX_REVIEWS]
     
-    # Analyze sentiment for each review (limit text length)
+    # Analyze sentiment in batches; the tokenizer truncates long reviews
     try:
-        # Process reviews in batches to avoid token limits
-        all_results = []
-        for review in reviews:
-            if len(review) > 512:
-                review = review[:512]
-            try:
-                result = sentiment_pipeline(review)
-                all_results.append(result[0] if isinstance(result, list) else result)
-            except Exception as e:
-                logger.warning(f"Error analyzing review: {e}")
-                continue
+        if micro_batcher is not None:
+            all_results = await micro_batcher.submit(reviews)
+        else:
+            all_results = await asyncio.to_thread(classify_reviews, reviews)
         
         # Calculate percentages
-        positive = sum(1 for r in all_results if r.get('label', '').upper() in ['POSITIVE', 'LABEL_2', 'LABEL_1'])
-        negative = sum(1 for r in all_results if r.get('label', '').upper() in ['NEGATIVE', 'LABEL_0'])
+        labels = [normalize_label(r.get('label', '')) for r in all_results]
+        positive = labels.count("positive")
+        negative = labels.count("negative")
         neutral = len(all_results) - positive - negative
         
         total = len(all_results) if all_results else 1
@@ -91,42 +330,22 @@ async def analyze_reviews(request: AnalyzeRequest):
         
     except Exception as e:
         logger.error(f"Error in sentiment analysis: {e}")
+        labels = []
         pos_pct = neg_pct = 33
         neu_pct = 34
     
-    # Extract pros/cons using keyword matching
-    pros_keywords = {
-        "Quality": ["excellent quality", "build quality", "solid build", "durable", "well built", "premium", "great quality"],
-        "Performance": ["fast", "performance", "powerful", "smooth", "responsive", "quick", "works well"],
-        "Value": ["value for money", "worth it", "affordable", "great price", "budget friendly", "good value"],
-        "Features": ["features", "functionality", "versatile", "useful", "convenient"],
-        "Service": ["fast shipping", "delivery", "customer service", "support", "quick delivery"],
-    }
-    
-    cons_keywords = {
-        "Quality Issues": ["poor quality", "cheap", "broke", "stopped working", "defective", "broken"],
-        "Performance Problems": ["slow", "laggy", "freezes", "doesn't work", "issues", "problems"],
-        "Pricing Concerns": ["overpriced", "expensive", "not worth", "too costly", "pricey"],
-        "Missing Features": ["missing features", "lack of", "no", "without"],
-        "Service Issues": ["poor service", "delayed", "shipping issues", "no support", "slow delivery"],
-    }
-    
+    # Extract pros/cons with a single keyword pass per review
     pros = []
     cons = []
     
     for review in reviews:
-        review_lower = review.lower()
-        # Check for pros
-        for category, keywords in pros_keywords.items():
-            if any(kw in review_lower for kw in keywords):
-                if category not in pros:
-                    pros.append(category)
-        
-        # Check for cons
-        for category, keywords in cons_keywords.items():
-            if any(kw in review_lower for kw in keywords):
-                if category not in cons:
-                    cons.append(category)
+        hits = KEYWORD_MATCHER.categories(review)
+        for category in PROS_KEYWORDS:
+            if f"pro:{category}" in hits and category not in pros:
+                pros.append(category)
+        for category in CONS_KEYWORDS:
+            if f"con:{category}" in hits and category not in cons:
+                cons.append(category)
     
     # Fallback pros/cons if none found
     if not pros and pos_pct > neg_pct:
@@ -147,7 +366,8 @@ async def analyze_reviews(request: AnalyzeRequest):
         pros=pros[:5],  # Limit to 5 pros
         cons=cons[:5],  # Limit to 5 cons
         score=round(score, 1),
-        best_platform=None
+        best_platform=None,
+        labels=labels,
     )
 
 # The app will be run by uvicorn command in Dockerfile
@@ -0,0 +1,103 @@
+"""Single-pass keyword matching for review heuristics.
+
+Shared by the backend fallback (``services/ollama_client.py``) and the Hugging
+Face Space (``hf_space_files/keywords.py`` is a verbatim copy, since the Space is
+deployed on its own; keep the two files identical).
+
+All keywords of all categories are compiled into one trie-shaped regular
+expression with word boundaries, so each review is scanned once regardless of
+how many keywords there are, and short keywords such as ``"no"`` no longer match
+inside ``"not"`` or ``"know"``.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Set
+
+# Straight and typographic apostrophes are interchangeable in reviews
+_APOSTROPHES = "'’"
+
+
+def _normalize(phrase: str) -> str:
+    phrase = " ".join(phrase.lower().split())
+    for apostrophe in _APOSTROPHES[1:]:
+        phrase = phrase.replace(apostrophe, "'")
+    return phrase
+
+
+def _token_pattern(char: str) -> str:
+    if char == " ":
+        return r"\s+"
+    if char == "'":
+        return f"[{_APOSTROPHES}]"
+    return re.escape(char)
+
+
+def _trie_regex(phrases: Iterable[str]) -> str:
+    """Build a prefix-factored alternation so shared prefixes are matched once."""
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        branches = [_token_pattern(char) + render(child) for char, child in sorted(node.items()) if char]
+        optional = "" in node
+        if not branches:
+            return ""
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if optional else body
+
+    return render(trie)
+
+
+class KeywordMatcher:
+    """Counts keyword hits per category in a single regex pass per text.
+
+    ``categories`` maps a category name to its keywords. When a longer keyword
+    contains shorter ones (``"poor quality"`` contains ``"poor"``), a match of
+    the longer keyword counts for every category of the keywords it contains.
+    """
+
+    def __init__(self, categories: Mapping[str, Iterable[str]]):
+        phrase_categories: Dict[str, Set[str]] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                phrase_categories.setdefault(_normalize(keyword), set()).add(category)
+
+        # Credit contained keywords (at word boundaries) to the longer phrase
+        self._categories: Dict[str, List[str]] = {}
+        for phrase in phrase_categories:
+            hits = set()
+            padded = f" {phrase} "
+            for other, other_categories in phrase_categories.items():
+                if f" {other} " in padded:
+                    hits |= other_categories
+            self._categories[phrase] = sorted(hits)
+
+        # Matched against lowercased text. Optional trie branches are greedy, so
+        # the longest keyword at a position wins.
+        self._pattern = re.compile(r"\b" + _trie_regex(phrase_categories) + r"\b")
+
+    def _phrase_categories(self, phrase: str) -> List[str]:
+        found = self._categories.get(phrase)
+        # Only matches with unusual whitespace or apostrophes need normalizing
+        return found if found is not None else self._categories[_normalize(phrase)]
+
+    def count(self, text: str) -> Counter:
+        """Per-category hit counts for ``text``."""
+        counts: Counter = Counter()
+        for phrase in self._pattern.findall(text.lower()):
+            counts.update(self._phrase_categories(phrase))
+        return counts
+
+    def categories(self, text: str) -> Set[str]:
+        """Categories with at least one hit in ``text``."""
+        hits: Set[str] = set()
+        for phrase in self._pattern.findall(text.lower()):
+            hits.update(self._phrase_categories(phrase))
+        return hits
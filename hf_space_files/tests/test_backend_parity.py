@@ -0,0 +1,45 @@
+"""Label agreement between the fp32 pipeline and the faster backends.
+
+Downloads the model on first run, so it only runs where transformers/torch
+(and optimum for ONNX) are installed.
+"""
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+import app  # noqa: E402
+
+SAMPLE_REVIEWS = [
+    "Absolutely love this phone, the camera is fantastic.",
+    "Stopped working after a week. Total waste of money.",
+    "It's okay. Does the job, nothing special.",
+    "Delivery was late and the box was damaged.",
+    "Best purchase I've made this year, highly recommend!",
+    "Battery life is poor and it heats up while charging.",
+    "Decent value for the price.",
+    "Terrible customer service, never buying again.",
+    "Sound quality is great but the build feels cheap.",
+    "Works as described.",
+]
+
+MIN_AGREEMENT = 0.9
+
+
+@pytest.fixture(scope="module")
+def reference_labels() -> list[str]:
+    reference = app.build_pipeline("torch")
+    return [r["label"] for r in reference(SAMPLE_REVIEWS, truncation=True)]
+
+
+@pytest.mark.parametrize("backend", ["int8", "onnx"])
+def test_backend_labels_match_fp32(backend, reference_labels):
+    if backend == "onnx":
+        pytest.importorskip("optimum.onnxruntime")
+    candidate = app.build_pipeline(backend)
+
+    labels = [r["label"] for r in candidate(SAMPLE_REVIEWS, truncation=True)]
+
+    agreement = sum(a == b for a, b in zip(labels, reference_labels)) / len(SAMPLE_REVIEWS)
+    assert agreement >= MIN_AGREEMENT, f"{backend} labels {labels} vs fp32 {reference_labels}"
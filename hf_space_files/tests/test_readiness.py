@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+
+import app
+
+
+client = TestClient(app.app)
+
+
+def test_ready_returns_503_with_retry_hint_while_loading(monkeypatch):
+    monkeypatch.setattr(app, "model_status", "loading")
+    monkeypatch.setattr(app, "sentiment_pipeline", None)
+
+    assert client.get("/").status_code == 200
+    resp = client.get("/ready")
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == str(app.READY_RETRY_AFTER)
+
+    resp = client.post("/analyze", json={"reviews": ["great"]})
+    assert resp.status_code == 503
+    assert resp.json()["detail"]["status"] == "loading"
+
+
+def test_ready_once_model_loaded(monkeypatch):
+    monkeypatch.setattr(app, "model_status", "ready")
+
+    assert client.get("/ready").status_code == 200
+
+
+def test_labels_follow_three_class_order():
+    assert [app.normalize_label(l) for l in ("LABEL_0", "LABEL_1", "LABEL_2", "Positive")] == [
+        "negative", "neutral", "positive", "positive"
+    ]